@@ -113,6 +113,8 @@ from modules.data.sheets import (
     adicionar_linha_sheets, carregar_dados_sob_demanda, 
     carregar_dados_iniciais, carregar_dados_background
 )
+from modules.data.fila import status_fila_gravacoes, descartar_falhas
+from modules.data.agendador import estatisticas_agendador
 
 from modules.pages.dashboard import dashboard
 from modules.pages.transacoes import registrar, registrar_receita, registrar_despesa, salvar_dados
@@ -122,6 +124,7 @@ from modules.pages.funcionarios import funcionarios, registrar_funcionario, calc
 from modules.pages.categorias import registrar_categoria, salvar_categorias
 from modules.pages.fornecedores import registrar_fornecedor
 from modules.pages.relatorios import relatorios
+from modules.pages.busca import busca_global
 
 def main_app():
     """
@@ -134,6 +137,27 @@ def main_app():
         ("Dashboard", "Registrar", "Projetos", "Funcionários", "Relatórios")
     )
 
+    # Indicador das gravações que ainda estão sendo enviadas ao Google Sheets
+    status_gravacoes = status_fila_gravacoes()
+    if status_gravacoes["falhas"]:
+        st.sidebar.error(f"{status_gravacoes['falhas']} gravação(ões) não puderam ser enviadas: {status_gravacoes['ultimo_erro']}")
+        if st.sidebar.button("Descartar gravações com falha", key="descartar_falhas"):
+            descartar_falhas()
+            st.rerun()
+    elif status_gravacoes["pendentes"]:
+        st.sidebar.info(f"⏳ {status_gravacoes['pendentes']} gravação(ões) pendente(s)")
+    
+    # Requisições retidas pela cota da API
+    agendador = estatisticas_agendador()
+    if agendador["na_fila"] or agendador["respostas_429"]:
+        st.sidebar.caption(
+            f"API do Google Sheets: {agendador['na_fila']} requisição(ões) aguardando cota, "
+            f"{agendador['limitadas']} limitadas, {agendador['respostas_429']} respostas 429"
+        )
+
+    # Busca global em projetos, clientes, receitas e despesas
+    busca_global()
+
     # Botão "Sair" na parte inferior da sidebar
     st.sidebar.markdown("---")  # Linha separadora
     if st.sidebar.button("Sair", key="sair"):
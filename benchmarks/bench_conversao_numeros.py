@@ -0,0 +1,65 @@
+"""
+Benchmark da conversão de valores monetários: versão escalar x versão vetorizada.
+
+Uso:
+    python benchmarks/bench_conversao_numeros.py [quantidade]
+"""
+import os
+import sys
+import time
+import random
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_utils import converter_string_para_numero, converter_serie_para_numero
+
+def gerar_valores(quantidade, semente=42):
+    """
+    Gera valores no formato encontrado nas planilhas.
+    
+    Args:
+        quantidade: Número de valores
+        semente: Semente do gerador aleatório
+    
+    Returns:
+        pandas.Series: Série de textos
+    """
+    aleatorio = random.Random(semente)
+    formatos = [
+        lambda: "R$ " + f"{aleatorio.uniform(0, 1e6):,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        lambda: f"{aleatorio.uniform(0, 1e6):,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        lambda: f"{aleatorio.uniform(0, 1e6):.2f}",
+        lambda: "",
+    ]
+    return pd.Series([aleatorio.choice(formatos)() for _ in range(quantidade)])
+
+def medir(funcao, repeticoes=3):
+    """
+    Executa a função algumas vezes e retorna o melhor tempo.
+    
+    Args:
+        funcao: Função sem argumentos
+        repeticoes: Número de execuções
+    
+    Returns:
+        float: Melhor tempo em segundos
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    serie = gerar_valores(quantidade)
+    
+    tempo_escalar = medir(lambda: serie.map(converter_string_para_numero))
+    tempo_vetorizado = medir(lambda: converter_serie_para_numero(serie))
+    
+    print(f"Valores: {quantidade:,}")
+    print(f"Escalar    (converter_string_para_numero): {tempo_escalar:.3f}s  ({quantidade / tempo_escalar:,.0f} valores/s)")
+    print(f"Vetorizado (converter_serie_para_numero):  {tempo_vetorizado:.3f}s  ({quantidade / tempo_vetorizado:,.0f} valores/s)")
+    print(f"Ganho: {tempo_escalar / tempo_vetorizado:.1f}x")
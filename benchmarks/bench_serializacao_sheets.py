@@ -0,0 +1,91 @@
+"""
+Benchmark da serialização de um DataFrame para o Google Sheets: iterrows +
+converter_para_string_segura x serialização por coluna.
+
+Uso:
+    python benchmarks/bench_serializacao_sheets.py [linhas]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_utils import preparar_dados_para_sheets, converter_para_string_segura, dataframe_para_valores_sheets
+
+def gerar_dataframe(linhas, semente=42):
+    """
+    Gera um DataFrame com os tipos encontrados nas despesas (datas, valores, textos e vazios).
+    
+    Args:
+        linhas: Número de linhas
+        semente: Semente do gerador aleatório
+    
+    Returns:
+        pandas.DataFrame: DataFrame gerado
+    """
+    aleatorio = np.random.default_rng(semente)
+    datas = pd.Timestamp("2023-01-01") + pd.to_timedelta(aleatorio.integers(0, 730, linhas), unit="D")
+    valores = np.round(aleatorio.uniform(0, 1e5, linhas), 2)
+    valores[aleatorio.random(linhas) < 0.05] = np.nan
+    return pd.DataFrame({
+        "DataPagamento": pd.Series(datas).where(aleatorio.random(linhas) > 0.02),
+        "Descrição": aleatorio.choice(["Material", "Serviço", "Aluguel", None], linhas),
+        "Categoria": aleatorio.choice(["Fixo", "Variável", "Investimento"], linhas),
+        "ValorTotal": valores,
+        "Parcelas": aleatorio.integers(1, 12, linhas),
+        "FormaPagamento": aleatorio.choice(["Pix", "Boleto", "Cartão"], linhas),
+        "Responsável": aleatorio.choice(["Ana", "Bruno", "Carla"], linhas),
+        "Fornecedor": aleatorio.choice(["Fornecedor A", "Fornecedor B", ""], linhas),
+        "Projeto": aleatorio.choice([f"P{i}" for i in range(50)], linhas),
+        "NF": aleatorio.choice(["Sim", "Não"], linhas),
+    })
+
+def serializar_por_linha(df):
+    """
+    Serialização anterior: prepara o DataFrame e converte célula a célula com iterrows.
+    
+    Args:
+        df: DataFrame com os dados
+    
+    Returns:
+        list: Lista de listas (cabeçalho + linhas)
+    """
+    df_preparado = preparar_dados_para_sheets(df, is_dataframe=True)
+    valores = []
+    for _, linha in df_preparado.iterrows():
+        valores.append([converter_para_string_segura(valor) for valor in linha])
+    return [df_preparado.columns.tolist()] + valores
+
+def medir(funcao, repeticoes=3):
+    """
+    Executa a função algumas vezes e retorna o melhor tempo e o último resultado.
+    
+    Args:
+        funcao: Função sem argumentos
+        repeticoes: Número de execuções
+    
+    Returns:
+        tuple: (melhor tempo em segundos, resultado)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = gerar_dataframe(linhas)
+    
+    tempo_linhas, esperado = medir(lambda: serializar_por_linha(df))
+    tempo_colunas, obtido = medir(lambda: dataframe_para_valores_sheets(df))
+    
+    print(f"Linhas: {linhas:,} x {df.shape[1]} colunas")
+    print(f"Por linha  (iterrows + converter_para_string_segura): {tempo_linhas:.3f}s")
+    print(f"Por coluna (dataframe_para_valores_sheets):            {tempo_colunas:.3f}s")
+    print(f"Ganho: {tempo_linhas / tempo_colunas:.1f}x")
+    print(f"Resultados idênticos: {obtido == esperado}")
@@ -1,7 +1,9 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google.oauth2 import service_account
 import pandas as pd
 import streamlit as st
+from modules.data.conexao import obter_cliente, obter_planilha, obter_aba
+from modules.data.gravacao import gravar_valores
+from utils.data_utils import dataframe_para_valores_sheets
 
 class GoogleSheetsManager:
     def __init__(self):
@@ -13,6 +15,7 @@ class GoogleSheetsManager:
         
         # Inicializa a conexão apenas quando necessário
         self._client = None
+        self._credentials = None
         
     @property
     def client(self):
@@ -20,10 +23,10 @@ class GoogleSheetsManager:
         if self._client is None:
             try:
                 # Carrega as credenciais do arquivo
-                credentials = ServiceAccountCredentials.from_json_keyfile_name('credentials.json', self.scope)
+                self._credentials = service_account.Credentials.from_service_account_file('credentials.json', scopes=self.scope)
                 
-                # Autoriza o cliente
-                self._client = gspread.authorize(credentials)
+                # Usa o cliente compartilhado pelo processo (pool de conexões e agendador de cotas)
+                self._client = obter_cliente(self._credentials)
                 
             except Exception as e:
                 st.error(f"Erro ao conectar com o Google Sheets: {e}")
@@ -47,8 +50,8 @@ class GoogleSheetsManager:
             if not self.client:
                 return None
                 
-            # Abre a planilha pelo ID
-            spreadsheet = self.client.open_by_key(spreadsheet_key)
+            # Abre a planilha pelo ID (metadados em cache no processo)
+            spreadsheet = obter_planilha(self._credentials, spreadsheet_key)
             
             # Obtém a aba pelo índice
             worksheet = spreadsheet.get_worksheet(worksheet_index)
@@ -75,11 +78,11 @@ class GoogleSheetsManager:
             if not self.client:
                 return None
                 
-            # Abre a planilha pelo ID
-            spreadsheet = self.client.open_by_key(spreadsheet_key)
+            # Abre a planilha pelo ID (metadados em cache no processo)
+            spreadsheet = obter_planilha(self._credentials, spreadsheet_key)
             
             # Obtém a aba pelo nome
-            worksheet = spreadsheet.worksheet(worksheet_name)
+            worksheet = obter_aba(spreadsheet, worksheet_name)
             
             return worksheet
             
@@ -122,16 +125,8 @@ class GoogleSheetsManager:
             bool: True se a atualização foi bem-sucedida, False caso contrário
         """
         try:
-            # Limpa a planilha atual
-            worksheet.clear()
-            
-            # Adiciona os cabeçalhos
-            headers = df.columns.tolist()
-            worksheet.append_row(headers)
-            
-            # Adiciona os dados
-            for _, row in df.iterrows():
-                worksheet.append_row(row.tolist())
+            # Grava cabeçalho e dados em blocos de intervalos e limpa o conteúdo antigo que sobrar
+            gravar_valores(worksheet, dataframe_para_valores_sheets(df))
                 
             return True
             
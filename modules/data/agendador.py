@@ -0,0 +1,188 @@
+"""
+Agendador central das requisições à API do Google Sheets.
+
+Todas as chamadas do gspread passam por Client.request; o ClienteAgendado
+substitui esse método para respeitar as cotas por minuto com baldes de tokens
+(um para leituras e outro para escritas, compartilhados por todo o processo) e
+repetir respostas 429/5xx com espera exponencial e variação aleatória.
+
+Um balde com capacidade C e reposição R por segundo libera no máximo
+C + 60 * R requisições em qualquer janela de um minuto; por isso a rajada é
+descontada da reposição, e a soma nunca passa da cota.
+"""
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+import gspread
+from gspread.exceptions import APIError
+from google.auth.transport.requests import Request
+from utils.config import (
+    COTA_LEITURAS_POR_MINUTO, COTA_ESCRITAS_POR_MINUTO, AGENDADOR_RAJADA,
+    AGENDADOR_MAX_TENTATIVAS, AGENDADOR_ESPERA_INICIAL, AGENDADOR_ESPERA_MAXIMA,
+    RENOVACAO_TOKEN_ANTECEDENCIA
+)
+
+# Códigos HTTP que indicam limite de requisições ou falha temporária
+_CODIGOS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+class BaldeTokens:
+    """
+    Balde de tokens: permite rajadas de até `capacidade` requisições e repõe
+    os tokens continuamente com o restante da cota, de modo que nenhuma janela
+    de um minuto passe de `por_minuto` requisições.
+    """
+
+    def __init__(self, por_minuto, rajada=AGENDADOR_RAJADA):
+        """
+        Args:
+            por_minuto: Número de requisições permitidas por minuto
+            rajada: Requisições que podem sair de uma vez (no máximo metade da cota)
+        """
+        self.capacidade = float(min(rajada, por_minuto / 2))
+        self.tokens = self.capacidade
+        self.reposicao = (por_minuto - self.capacidade) / 60.0
+        self.atualizado_em = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self):
+        """
+        Repõe os tokens acumulados desde a última atualização.
+        """
+        agora = time.monotonic()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self.atualizado_em) * self.reposicao)
+        self.atualizado_em = agora
+
+    def consumir(self):
+        """
+        Consome um token, aguardando a reposição se o balde estiver vazio.
+        
+        Returns:
+            float: Tempo aguardado em segundos
+        """
+        aguardado = 0.0
+        while True:
+            with self._lock:
+                self._repor()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return aguardado
+                espera = (1 - self.tokens) / self.reposicao
+            time.sleep(espera)
+            aguardado += espera
+
+# Baldes e contadores compartilhados por todas as sessões do processo
+_baldes = {
+    "leitura": BaldeTokens(COTA_LEITURAS_POR_MINUTO),
+    "escrita": BaldeTokens(COTA_ESCRITAS_POR_MINUTO)
+}
+_lock = threading.Lock()
+_lock_renovacao = threading.Lock()
+_estatisticas = {
+    "na_fila": 0,
+    "requisicoes": 0,
+    "limitadas": 0,
+    "tempo_limitado": 0.0,
+    "respostas_429": 0,
+    "novas_tentativas": 0,
+    "falhas": 0
+}
+
+def _contar(**incrementos):
+    """
+    Atualiza os contadores do agendador.
+    
+    Args:
+        **incrementos: Valor a somar em cada contador
+    """
+    with _lock:
+        for nome, valor in incrementos.items():
+            _estatisticas[nome] += valor
+
+def estatisticas_agendador():
+    """
+    Retorna uma cópia dos contadores do agendador.
+    
+    Returns:
+        dict: Requisições aguardando cota ("na_fila"), total de requisições,
+              requisições retidas pelo balde e tempo total retido, respostas 429,
+              novas tentativas e falhas definitivas
+    """
+    with _lock:
+        return dict(_estatisticas)
+
+def _espera(tentativa):
+    """
+    Calcula a espera exponencial (com variação aleatória) antes de uma nova tentativa.
+    
+    Args:
+        tentativa: Número da tentativa que falhou (a partir de 1)
+    
+    Returns:
+        float: Espera em segundos
+    """
+    espera = min(AGENDADOR_ESPERA_INICIAL * (2 ** (tentativa - 1)), AGENDADOR_ESPERA_MAXIMA)
+    return random.uniform(espera / 2, espera)
+
+def _precisa_renovar(credenciais):
+    """
+    Verifica se o token de acesso está ausente ou perto de expirar.
+    
+    Args:
+        credenciais: Credenciais google-auth
+    
+    Returns:
+        bool: True se o token deve ser renovado
+    """
+    if not credenciais.token or credenciais.expiry is None:
+        return True
+    return credenciais.expiry - datetime.utcnow() < timedelta(seconds=RENOVACAO_TOKEN_ANTECEDENCIA)
+
+class ClienteAgendado(gspread.Client):
+    """
+    Cliente gspread que passa todas as requisições pelo agendador.
+    
+    Uso: gspread.authorize(credentials, client_factory=ClienteAgendado)
+    """
+
+    def _renovar_credenciais(self):
+        """
+        Renova o token de acesso antes que ele expire, para que nenhuma
+        requisição receba um 401 ou espere pela renovação no meio do caminho.
+        """
+        credenciais = getattr(self, "auth", None)
+        if credenciais is None or not hasattr(credenciais, "expiry") or not _precisa_renovar(credenciais):
+            return
+        with _lock_renovacao:
+            # Outra thread pode ter renovado enquanto esta aguardava
+            if _precisa_renovar(credenciais):
+                credenciais.refresh(Request())
+    
+    def request(self, method, endpoint, *args, **kwargs):
+        """
+        Executa uma requisição respeitando a cota e repetindo falhas temporárias.
+        """
+        self._renovar_credenciais()
+        balde = _baldes["leitura"] if method.lower() == "get" else _baldes["escrita"]
+        tentativa = 0
+        while True:
+            # Aguarda um token da cota correspondente
+            _contar(na_fila=1)
+            try:
+                aguardado = balde.consumir()
+            finally:
+                _contar(na_fila=-1)
+            _contar(requisicoes=1, limitadas=int(aguardado > 0), tempo_limitado=aguardado)
+            
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except APIError as e:
+                codigo = getattr(e.response, "status_code", None)
+                tentativa += 1
+                if codigo == 429:
+                    _contar(respostas_429=1)
+                if codigo not in _CODIGOS_TEMPORARIOS or tentativa >= AGENDADOR_MAX_TENTATIVAS:
+                    _contar(falhas=1)
+                    raise
+                _contar(novas_tentativas=1)
+                time.sleep(_espera(tentativa))
@@ -0,0 +1,373 @@
+"""
+Motor de filtros e agregações do dashboard.
+
+Os filtros e todos os totais e agrupamentos usados pelos gráficos são calculados
+de uma só vez e memorizados pela combinação (versões dos dados, filtros
+normalizados). Enquanto nenhum dos dois mudar, as interações com a página
+reaproveitam o resultado sem refazer nenhum groupby.
+"""
+import threading
+from collections import OrderedDict
+import pandas as pd
+from utils.config import MAX_AGREGACOES_CACHE
+from utils.data_utils import normalizar_datas
+from modules.data.cubo import filtrar_cubo, somar_cubo
+from modules.data.indices import mascara_filtros
+
+# Resultados memorizados, compartilhados entre as sessões (as versões são globais ao processo)
+_lock = threading.Lock()
+_agregacoes = OrderedDict()
+_opcoes = {}
+
+# Dimensões agregadas por tipo de dado
+DIMENSOES_RECEITAS = ["Categoria", "Projeto", "FormaPagamento", "MesAno"]
+DIMENSOES_DESPESAS = ["Categoria", "Projeto", "FormaPagamento", "Responsável", "Fornecedor", "MesAno"]
+CONTAGENS_PROJETOS = ["Localizacao", "Status", "Placa", "Post", "Contrato", "Briefing", "Tipo", "Arquiteto", "Pacote"]
+RESPONSAVEIS_PROJETOS = ["ResponsávelElétrico", "ResponsávelHidráulico", "ResponsávelModelagem", "ResponsávelDetalhamento"]
+
+def contar_valores(df, coluna):
+    """
+    Conta as ocorrências de cada valor de uma coluna, ignorando categorias sem registros.
+    
+    Args:
+        df: DataFrame com os dados
+        coluna: Nome da coluna
+    
+    Returns:
+        pandas.DataFrame: DataFrame com as colunas [coluna, "Quantidade"]
+    """
+    contagem = df[coluna].value_counts()
+    contagem = contagem[contagem > 0].reset_index()
+    contagem.columns = [coluna, "Quantidade"]
+    return contagem
+
+def _filtrar_periodo(df, filtros, tipo):
+    """
+    Aplica os filtros de mês e ano de receitas e despesas.
+    
+    Args:
+        df: DataFrame a ser filtrado
+        filtros: Dicionário com os filtros a serem aplicados
+        tipo: Tipo de dados ("receitas", "despesas" ou "projetos")
+    
+    Returns:
+        pandas.DataFrame: DataFrame filtrado
+    """
+    df_filtrado = df.copy()
+    
+    # Converter colunas de data (DataFrames tipados já chegam convertidos)
+    try:
+        if tipo == "receitas" and not pd.api.types.is_datetime64_any_dtype(df_filtrado["DataRecebimento"]):
+            df_filtrado["DataRecebimento"] = normalizar_datas(df_filtrado["DataRecebimento"])
+        elif tipo == "despesas" and not pd.api.types.is_datetime64_any_dtype(df_filtrado["DataPagamento"]):
+            df_filtrado["DataPagamento"] = normalizar_datas(df_filtrado["DataPagamento"])
+    except:
+        pass
+    
+    # Filtrar por mês
+    if filtros["mes"] is not None and len(filtros["mes"]) > 0 and "Todos" not in filtros["mes"]:
+        try:
+            if tipo == "receitas":
+                df_filtrado = df_filtrado[df_filtrado["DataRecebimento"].dt.month.isin(filtros["mes"])]
+            elif tipo == "despesas":
+                df_filtrado = df_filtrado[df_filtrado["DataPagamento"].dt.month.isin(filtros["mes"])]
+        except:
+            pass
+    
+    # Filtrar por ano
+    if filtros["ano"] is not None and len(filtros["ano"]) > 0 and "Todos" not in filtros["ano"]:
+        try:
+            if tipo == "receitas":
+                df_filtrado = df_filtrado[df_filtrado["DataRecebimento"].dt.year.isin(filtros["ano"])]
+            elif tipo == "despesas":
+                df_filtrado = df_filtrado[df_filtrado["DataPagamento"].dt.year.isin(filtros["ano"])]
+        except:
+            pass
+    
+    return df_filtrado
+
+def _filtrar_valores(df, filtros, tipo):
+    """
+    Aplica os filtros de valores (categoria, projeto, responsável etc.) varrendo as colunas com isin.
+    
+    Args:
+        df: DataFrame a ser filtrado
+        filtros: Dicionário com os filtros a serem aplicados
+        tipo: Tipo de dados ("receitas", "despesas" ou "projetos")
+    
+    Returns:
+        pandas.DataFrame: DataFrame filtrado
+    """
+    df_filtrado = df
+    
+    # Filtrar por categoria
+    if filtros["categoria"] is not None and len(filtros["categoria"]) > 0:
+        try:
+            df_filtrado = df_filtrado[df_filtrado["Categoria"].isin(filtros["categoria"])]
+        except:
+            pass
+    
+    # Filtrar por projeto
+    if filtros["projeto"] is not None and len(filtros["projeto"]) > 0:
+        try:
+            df_filtrado = df_filtrado[df_filtrado["Projeto"].isin(filtros["projeto"])]
+        except:
+            pass
+    
+    # Filtrar por responsável (apenas para despesas e projetos)
+    if filtros["responsavel"] is not None and len(filtros["responsavel"]) > 0:
+        try:
+            if tipo == "despesas" and "Responsável" in df_filtrado.columns:
+                df_filtrado = df_filtrado[df_filtrado["Responsável"].isin(filtros["responsavel"])]
+            elif tipo == "projetos":
+                # Filtrar por qualquer um dos campos de responsável
+                mask = (
+                    df_filtrado["ResponsávelElétrico"].isin(filtros["responsavel"]) |
+                    df_filtrado["ResponsávelHidráulico"].isin(filtros["responsavel"]) |
+                    df_filtrado["ResponsávelModelagem"].isin(filtros["responsavel"]) |
+                    df_filtrado["ResponsávelDetalhamento"].isin(filtros["responsavel"])
+                )
+                df_filtrado = df_filtrado[mask]
+        except:
+            pass
+    
+    # Filtrar por fornecedor (apenas para despesas)
+    if tipo == "despesas" and filtros["fornecedor"] is not None and len(filtros["fornecedor"]) > 0:
+        try:
+            df_filtrado = df_filtrado[df_filtrado["Fornecedor"].isin(filtros["fornecedor"])]
+        except:
+            pass
+    
+    # Filtrar por status (apenas para projetos)
+    if tipo == "projetos" and filtros["status"] is not None and len(filtros["status"]) > 0:
+        try:
+            df_filtrado = df_filtrado[df_filtrado["Status"].isin(filtros["status"])]
+        except:
+            pass
+    
+    # Filtrar por arquiteto (apenas para projetos)
+    if tipo == "projetos" and filtros["arquiteto"] is not None and len(filtros["arquiteto"]) > 0:
+        try:
+            df_filtrado = df_filtrado[df_filtrado["Arquiteto"].isin(filtros["arquiteto"])]
+        except:
+            pass
+    
+    return df_filtrado
+
+def aplicar_filtros(df, filtros, tipo="receitas", indice=None):
+    """
+    Aplica os filtros selecionados ao DataFrame.
+    
+    Args:
+        df: DataFrame a ser filtrado
+        filtros: Dicionário com os filtros a serem aplicados
+        tipo: Tipo de dados ("receitas", "despesas" ou "projetos")
+        indice: Índice invertido do DataFrame (opcional); com ele, os filtros de
+                valores viram consultas às posições indexadas em vez de varreduras
+    
+    Returns:
+        pandas.DataFrame: DataFrame filtrado
+    """
+    if indice is not None and indice["linhas"] == len(df):
+        mascara = mascara_filtros(indice, filtros, tipo)
+        df_filtrado = df if mascara.all() else df[mascara]
+    else:
+        df_filtrado = _filtrar_valores(df, filtros, tipo)
+    
+    return _filtrar_periodo(df_filtrado, filtros, tipo)
+
+def normalizar_filtros(filtros):
+    """
+    Converte o dicionário de filtros em uma chave imutável e independente de ordem.
+    
+    Filtros vazios, ou de mês/ano contendo "Todos", não restringem nada e por
+    isso são descartados da chave.
+    
+    Args:
+        filtros: Dicionário com os filtros selecionados
+    
+    Returns:
+        tuple: Tupla ordenada de pares (filtro, valores selecionados)
+    """
+    chave = []
+    for nome, valores in sorted(filtros.items()):
+        if not valores:
+            continue
+        if nome in ("mes", "ano") and "Todos" in valores:
+            continue
+        chave.append((nome, tuple(sorted(set(valores), key=repr))))
+    return tuple(chave)
+
+def _somar_por(df, coluna, valor="ValorTotal"):
+    """
+    Soma uma coluna de valores agrupando por uma dimensão.
+    
+    Args:
+        df: DataFrame filtrado
+        coluna: Coluna de agrupamento
+        valor: Coluna a ser somada
+    
+    Returns:
+        pandas.DataFrame: DataFrame com as colunas [coluna, valor]
+    """
+    if df.empty or coluna not in df.columns or valor not in df.columns:
+        return pd.DataFrame(columns=[coluna, valor])
+    return df.groupby(coluna, observed=True)[valor].sum().reset_index()
+
+def _agregar_financeiro(cubo, filtros, dimensoes):
+    """
+    Calcula o total e os agrupamentos de receitas ou despesas a partir do cubo mensal.
+    
+    Args:
+        cubo: Cubo mensal da planilha
+        filtros: Dicionário com os filtros selecionados
+        dimensoes: Lista de dimensões a agrupar
+    
+    Returns:
+        dict: {"total", "quantidade", "por": {dimensão: DataFrame}}
+    """
+    celulas = filtrar_cubo(cubo, filtros)
+    return {
+        "total": float(celulas["ValorTotal"].sum()),
+        "quantidade": int(celulas["Quantidade"].sum()),
+        "por": {dimensao: somar_cubo(celulas, dimensao) for dimensao in dimensoes},
+    }
+
+def _agregar_projetos(df):
+    """
+    Calcula as contagens e somas de m² dos projetos já filtrados.
+    
+    Args:
+        df: DataFrame filtrado
+    
+    Returns:
+        dict: {"quantidade", "contagens": {coluna: DataFrame}, "m2": {responsável: DataFrame}}
+    """
+    contagens = {coluna: contar_valores(df, coluna) for coluna in CONTAGENS_PROJETOS if coluna in df.columns}
+    m2 = {coluna: _somar_por(df, coluna, "m2") for coluna in RESPONSAVEIS_PROJETOS}
+    return {"quantidade": len(df), "contagens": contagens, "m2": m2}
+
+def _calcular(cubo_receitas, cubo_despesas, df_projetos, filtros, indice_projetos=None):
+    """
+    Calcula todas as agregações do dashboard.
+    
+    Receitas e despesas são agregadas a partir das células dos cubos mensais;
+    os projetos são filtrados uma única vez.
+    
+    Args:
+        cubo_receitas: Cubo mensal de receitas
+        cubo_despesas: Cubo mensal de despesas
+        df_projetos: DataFrame tipado de projetos
+        filtros: Dicionário com os filtros selecionados
+        indice_projetos: Índice invertido dos projetos (opcional)
+    
+    Returns:
+        dict: Agregações de receitas, despesas e projetos, mais o saldo
+    """
+    receitas = _agregar_financeiro(cubo_receitas, filtros, DIMENSOES_RECEITAS)
+    despesas = _agregar_financeiro(cubo_despesas, filtros, DIMENSOES_DESPESAS)
+    projetos = _agregar_projetos(aplicar_filtros(df_projetos, filtros, tipo="projetos", indice=indice_projetos))
+    
+    return {
+        "receitas": receitas,
+        "despesas": despesas,
+        "projetos": projetos,
+        "saldo": receitas["total"] - despesas["total"],
+    }
+
+def calcular_agregacoes(cubo_receitas, cubo_despesas, df_projetos, filtros, versoes=None, indice_projetos=None):
+    """
+    Retorna todas as agregações do dashboard, reaproveitando o último cálculo
+    para a mesma combinação de dados e filtros.
+    
+    O resultado é compartilhado e não deve ser modificado.
+    
+    Args:
+        cubo_receitas: Cubo mensal de receitas
+        cubo_despesas: Cubo mensal de despesas
+        df_projetos: DataFrame tipado de projetos
+        filtros: Dicionário com os filtros selecionados
+        versoes: Tupla com as versões dos dados (sem versão, nada é memorizado)
+        indice_projetos: Índice invertido dos projetos (opcional)
+    
+    Returns:
+        dict: Agregações de receitas, despesas e projetos, mais o saldo
+    """
+    if versoes is None or None in versoes:
+        return _calcular(cubo_receitas, cubo_despesas, df_projetos, filtros, indice_projetos)
+    
+    chave = (tuple(versoes), normalizar_filtros(filtros))
+    with _lock:
+        resultado = _agregacoes.get(chave)
+        if resultado is not None:
+            _agregacoes.move_to_end(chave)
+            return resultado
+    
+    resultado = _calcular(cubo_receitas, cubo_despesas, df_projetos, filtros, indice_projetos)
+    
+    with _lock:
+        _agregacoes[chave] = resultado
+        # Descarta os resultados usados há mais tempo
+        while len(_agregacoes) > MAX_AGREGACOES_CACHE:
+            _agregacoes.popitem(last=False)
+    return resultado
+
+def _valores_distintos(*fontes):
+    """
+    Reúne os valores distintos de colunas de um ou mais DataFrames.
+    
+    Colunas categóricas já trazem o dicionário de valores (cat.categories) e
+    não precisam ser percorridas; as demais usam unique().
+    
+    Args:
+        *fontes: Pares (DataFrame, lista de colunas)
+    
+    Returns:
+        list: Valores distintos, ordenados
+    """
+    valores = set()
+    for df, colunas in fontes:
+        for coluna in colunas:
+            if coluna not in df.columns:
+                continue
+            serie = df[coluna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                valores.update(serie.cat.categories)
+            else:
+                valores.update(serie.dropna().unique())
+    return sorted(valores, key=str)
+
+def opcoes_filtros(df_receitas, df_despesas, df_projetos, versoes=None):
+    """
+    Retorna as listas de opções dos filtros da sidebar, calculadas uma única vez por versão dos dados.
+    
+    O resultado é compartilhado e não deve ser modificado.
+    
+    Args:
+        df_receitas: DataFrame tipado de receitas
+        df_despesas: DataFrame tipado de despesas
+        df_projetos: DataFrame tipado de projetos
+        versoes: Tupla com as versões dos dados (sem versão, nada é memorizado)
+    
+    Returns:
+        dict: {filtro: lista de opções}
+    """
+    chave = tuple(versoes) if versoes is not None and None not in versoes else None
+    with _lock:
+        if chave is not None and _opcoes.get("chave") == chave:
+            return _opcoes["opcoes"]
+    
+    opcoes = {
+        "categoria": _valores_distintos((df_receitas, ["Categoria"]), (df_despesas, ["Categoria"])),
+        "projeto": _valores_distintos((df_projetos, ["Projeto"])),
+        "responsavel": _valores_distintos((df_despesas, ["Responsável"]), (df_projetos, RESPONSAVEIS_PROJETOS)),
+        "fornecedor": _valores_distintos((df_despesas, ["Fornecedor"])),
+        "status": _valores_distintos((df_projetos, ["Status"])),
+        "arquiteto": _valores_distintos((df_projetos, ["Arquiteto"])),
+    }
+    
+    if chave is not None:
+        with _lock:
+            _opcoes["chave"] = chave
+            _opcoes["opcoes"] = opcoes
+    return opcoes
@@ -0,0 +1,241 @@
+"""
+Índice invertido de busca textual.
+
+O texto das colunas pesquisáveis é normalizado (minúsculas e sem acentos, de
+modo que "Sao Jose" encontra "São José") e dividido em termos. Cada termo
+aponta para as linhas que o contêm, com o peso da coluna onde aparece. Uma
+consulta procura cada termo digitado como prefixo no vocabulário ordenado,
+exige que todos os termos sejam encontrados e ordena as linhas pela soma dos
+pesos ponderados pela raridade de cada termo.
+
+Os índices das planilhas são construídos no carregamento dos dados e
+estendidos quando linhas são adicionadas, sem reindexar a planilha.
+"""
+import bisect
+import hashlib
+import math
+import re
+import threading
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Colunas pesquisáveis de cada planilha e o peso de cada uma na ordenação
+COLUNAS_BUSCA = {
+    "Projetos": {"Projeto": 3.0, "Cliente": 2.0, "Localizacao": 1.0},
+    "Clientes": {"Nome": 3.0, "CPF": 1.0},
+    "Receitas": {"Descrição": 1.0},
+    "Despesas": {"Descrição": 1.0, "Fornecedor": 2.0},
+}
+
+# Peso de um termo encontrado apenas como prefixo, em relação ao termo exato
+PESO_PREFIXO = 0.5
+
+_TERMO = re.compile(r"[0-9a-z]+")
+
+def normalizar_texto(texto):
+    """
+    Converte o texto para minúsculas e remove os acentos.
+    
+    Args:
+        texto: Texto original
+    
+    Returns:
+        str: Texto normalizado
+    """
+    decomposto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+
+def tokenizar(texto):
+    """
+    Divide o texto normalizado em termos (sequências de letras e números).
+    
+    Args:
+        texto: Texto original
+    
+    Returns:
+        list: Termos do texto
+    """
+    return _TERMO.findall(normalizar_texto(texto))
+
+def _pesos_colunas(colunas):
+    """
+    Aceita uma lista de colunas (peso 1) ou um dicionário {coluna: peso}.
+    """
+    return dict(colunas) if isinstance(colunas, dict) else dict.fromkeys(colunas, 1.0)
+
+def _indexar(postagens, df, pesos, deslocamento):
+    """
+    Acrescenta as linhas do DataFrame às postagens, numeradas a partir de `deslocamento`.
+    
+    Cada valor distinto de uma coluna é tokenizado uma única vez.
+    
+    Args:
+        postagens: Dicionário {termo: {linha: peso}} atualizado no lugar
+        df: DataFrame com as linhas
+        pesos: Dicionário {coluna: peso}
+        deslocamento: Número da primeira linha
+    """
+    # Colunas em ordem crescente de peso: a última atribuição a uma linha é a de maior peso
+    for coluna, peso in sorted(pesos.items(), key=lambda item: item[1]):
+        if coluna not in df.columns:
+            continue
+        codigos, valores = pd.factorize(df[coluna])
+        if not len(valores):
+            continue
+        
+        # Linhas de cada valor distinto: ordena os códigos e corta nos limites de cada grupo
+        ordem = np.argsort(codigos, kind="stable") + deslocamento
+        limites = np.searchsorted(np.sort(codigos), np.arange(len(valores) + 1))
+        linhas_termo = {}
+        for codigo, valor in enumerate(valores):
+            for termo in set(tokenizar(valor)):
+                linhas_termo.setdefault(termo, []).append(ordem[limites[codigo]:limites[codigo + 1]])
+        
+        for termo, blocos in linhas_termo.items():
+            postagens.setdefault(termo, {}).update(dict.fromkeys(np.concatenate(blocos).tolist(), peso))
+
+def construir_indice_textual(df, colunas):
+    """
+    Constrói o índice invertido das colunas pesquisáveis.
+    
+    Args:
+        df: DataFrame com os dados
+        colunas: Lista de colunas ou dicionário {coluna: peso}
+    
+    Returns:
+        dict: {"linhas": int, "rotulos": índice do DataFrame, "pesos": dict,
+               "postagens": {termo: {linha: peso}}, "vocabulario": lista ordenada de termos}
+    """
+    pesos = _pesos_colunas(colunas)
+    postagens = {}
+    _indexar(postagens, df, pesos, 0)
+    return {
+        "linhas": len(df),
+        "rotulos": df.index,
+        "pesos": pesos,
+        "postagens": postagens,
+        "vocabulario": sorted(postagens),
+    }
+
+def estender_indice_textual(indice, novas):
+    """
+    Acrescenta linhas ao final de um índice, sem modificar o original (que é compartilhado).
+    
+    Args:
+        indice: Índice das linhas existentes
+        novas: DataFrame com as linhas adicionadas
+    
+    Returns:
+        dict: Novo índice com as linhas existentes e as adicionadas
+    """
+    novas_postagens = {}
+    _indexar(novas_postagens, novas, indice["pesos"], indice["linhas"])
+    
+    # Só as listas dos termos afetados são copiadas
+    postagens = dict(indice["postagens"])
+    for termo, linhas in novas_postagens.items():
+        postagens[termo] = {**postagens.get(termo, {}), **linhas}
+    
+    linhas = indice["linhas"] + len(novas)
+    return {
+        "linhas": linhas,
+        "rotulos": pd.RangeIndex(linhas),
+        "pesos": indice["pesos"],
+        "postagens": postagens,
+        "vocabulario": sorted(postagens),
+    }
+
+def _termos_com_prefixo(vocabulario, prefixo):
+    """
+    Retorna os termos do vocabulário ordenado que começam com o prefixo.
+    """
+    inicio = bisect.bisect_left(vocabulario, prefixo)
+    fim = inicio
+    while fim < len(vocabulario) and vocabulario[fim].startswith(prefixo):
+        fim += 1
+    return vocabulario[inicio:fim]
+
+def pesquisar(indice, consulta, limite=None):
+    """
+    Busca as linhas que contêm todos os termos da consulta (cada um como termo exato ou prefixo).
+    
+    Args:
+        indice: Índice textual
+        consulta: Texto digitado
+        limite: Número máximo de resultados (None para todos)
+    
+    Returns:
+        list: Tuplas (linha, pontuação) em ordem decrescente de pontuação
+    """
+    termos_consulta = list(dict.fromkeys(tokenizar(consulta)))
+    if not termos_consulta or not indice["linhas"]:
+        return []
+    
+    pontuacao = None
+    for termo_consulta in termos_consulta:
+        # Melhor pontuação de cada linha para este termo da consulta
+        melhores = {}
+        for termo in _termos_com_prefixo(indice["vocabulario"], termo_consulta):
+            linhas = indice["postagens"][termo]
+            raridade = math.log(1 + indice["linhas"] / len(linhas))
+            fator = raridade * (1.0 if termo == termo_consulta else PESO_PREFIXO)
+            for linha, peso in linhas.items():
+                valor = peso * fator
+                if valor > melhores.get(linha, 0.0):
+                    melhores[linha] = valor
+        
+        if pontuacao is None:
+            pontuacao = melhores
+        else:
+            pontuacao = {linha: total + melhores[linha] for linha, total in pontuacao.items() if linha in melhores}
+        if not pontuacao:
+            return []
+    
+    resultados = sorted(pontuacao.items(), key=lambda item: (-item[1], item[0]))
+    return resultados[:limite] if limite is not None else resultados
+
+def buscar(indice, consulta):
+    """
+    Seleciona as linhas que atendem à consulta.
+    
+    Args:
+        indice: Índice textual
+        consulta: Texto digitado (vazio seleciona todas as linhas)
+    
+    Returns:
+        pandas.Series: Máscara booleana com o mesmo índice do DataFrame indexado
+    """
+    if not tokenizar(consulta or ""):
+        return pd.Series(True, index=indice["rotulos"])
+    mascara = np.zeros(indice["linhas"], dtype=bool)
+    mascara[[linha for linha, _ in pesquisar(indice, consulta)]] = True
+    return pd.Series(mascara, index=indice["rotulos"])
+
+# Índices de listagens avulsas compartilhados entre as sessões: nome -> (impressão digital, índice)
+_lock = threading.Lock()
+_indices = {}
+
+def obter_indice_busca(nome, df, colunas):
+    """
+    Retorna o índice textual de uma listagem, reconstruindo-o só quando as colunas pesquisáveis mudam.
+    
+    Args:
+        nome: Nome da listagem (por exemplo, "Projetos")
+        df: DataFrame com os dados
+        colunas: Lista de colunas ou dicionário {coluna: peso}
+    
+    Returns:
+        dict: Índice textual (não deve ser modificado)
+    """
+    presentes = [coluna for coluna in _pesos_colunas(colunas) if coluna in df.columns]
+    digital = hashlib.blake2b(pd.util.hash_pandas_object(df[presentes], index=True).values.tobytes(), digest_size=16).hexdigest()
+    with _lock:
+        entrada = _indices.get(nome)
+        if entrada is not None and entrada[0] == digital:
+            return entrada[1]
+    
+    indice = construir_indice_textual(df, colunas)
+    with _lock:
+        _indices[nome] = (digital, indice)
+    return indice
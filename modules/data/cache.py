@@ -0,0 +1,214 @@
+"""
+Cache de dados compartilhado entre todas as sessões do Streamlit no mesmo processo.
+"""
+import time
+import threading
+from utils.config import CACHE_TTL, CACHE_TTL_PADRAO
+
+# Estado em nível de módulo: é o mesmo objeto para todas as sessões do servidor
+_lock = threading.RLock()
+_entradas = {}
+_versoes = {}
+# Dados derivados de cada planilha: (tipo, planilha) -> (versão, dado)
+_derivados = {}
+_fixadas = set()
+
+def _copiar_valores(valores):
+    """
+    Copia a lista de linhas para que sessões diferentes não compartilhem listas mutáveis.
+    
+    Args:
+        valores: Lista de listas (cabeçalho + linhas)
+    
+    Returns:
+        list: Cópia da lista de listas
+    """
+    return [list(linha) for linha in valores]
+
+def _expirada(sheet_name, entrada):
+    """
+    Verifica se a entrada do cache ultrapassou o TTL da planilha.
+    
+    Args:
+        sheet_name: Nome da planilha
+        entrada: Entrada do cache
+    
+    Returns:
+        bool: True se a entrada expirou
+    """
+    # Planilhas com gravações na fila não expiram: a planilha remota ainda não as contém
+    if sheet_name in _fixadas:
+        return False
+    ttl = CACHE_TTL.get(sheet_name, CACHE_TTL_PADRAO)
+    return time.time() - entrada["carregado_em"] > ttl
+
+def versao_cache(sheet_name):
+    """
+    Retorna a versão atual dos dados de uma planilha.
+    
+    A versão aumenta a cada carregamento, gravação ou invalidação, e é usada
+    pelas sessões para saber se o DataFrame que possuem ainda é o mais recente.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        int: Versão atual (0 se a planilha nunca foi carregada)
+    """
+    with _lock:
+        return _versoes.get(sheet_name, 0)
+
+def cache_valido(sheet_name):
+    """
+    Verifica, sem copiar os dados, se existe snapshot compartilhado dentro do TTL.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se o snapshot existe e não expirou
+    """
+    with _lock:
+        entrada = _entradas.get(sheet_name)
+        return entrada is not None and not _expirada(sheet_name, entrada)
+
+def obter_cache_compartilhado(sheet_name):
+    """
+    Retorna o snapshot compartilhado de uma planilha, se existir e não tiver expirado.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        dict: {"valores": lista de listas, "versao": int} ou None
+    """
+    with _lock:
+        entrada = _entradas.get(sheet_name)
+        if entrada is None or _expirada(sheet_name, entrada):
+            return None
+        return {"valores": _copiar_valores(entrada["valores"]), "versao": entrada["versao"]}
+
+def publicar_cache(sheet_name, valores):
+    """
+    Publica um snapshot recém-lido do Google Sheets para todas as sessões.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas)
+    
+    Returns:
+        int: Nova versão dos dados
+    """
+    with _lock:
+        versao = _versoes.get(sheet_name, 0) + 1
+        _versoes[sheet_name] = versao
+        _entradas[sheet_name] = {
+            "valores": _copiar_valores(valores),
+            "versao": versao,
+            "carregado_em": time.time()
+        }
+        return versao
+
+def atualizar_cache(sheet_name, valores, versao_base):
+    """
+    Atualiza o snapshot compartilhado após uma gravação (write-through).
+    
+    Se outra sessão gravou desde a versão em que esta gravação se baseou, o
+    snapshot compartilhado é invalidado para que o próximo leitor recarregue
+    a planilha em vez de receber dados inconsistentes.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas) após a gravação
+        versao_base: Versão dos dados que a sessão tinha antes de gravar
+    
+    Returns:
+        int: Nova versão dos dados
+    """
+    with _lock:
+        if _versoes.get(sheet_name, 0) == versao_base and sheet_name in _entradas:
+            return publicar_cache(sheet_name, valores)
+        return invalidar_cache(sheet_name)
+
+def invalidar_cache(sheet_name=None):
+    """
+    Remove o snapshot compartilhado de uma planilha (ou de todas).
+    
+    Args:
+        sheet_name: Nome da planilha; se None, invalida todas
+    
+    Returns:
+        int: Nova versão da planilha invalidada (0 se todas foram invalidadas)
+    """
+    with _lock:
+        nomes = [sheet_name] if sheet_name is not None else list(set(_entradas) | set(_versoes))
+        for nome in nomes:
+            _entradas.pop(nome, None)
+            _versoes[nome] = _versoes.get(nome, 0) + 1
+        return _versoes[sheet_name] if sheet_name is not None else 0
+
+def fixar_cache(sheet_name, fixado=True):
+    """
+    Impede (ou volta a permitir) que o snapshot compartilhado de uma planilha expire.
+    
+    Usado enquanto há gravações pendentes na fila, para que um recarregamento
+    não traga da planilha remota dados sem essas gravações.
+    
+    Args:
+        sheet_name: Nome da planilha
+        fixado: True para fixar, False para liberar
+    """
+    with _lock:
+        if fixado:
+            _fixadas.add(sheet_name)
+        else:
+            _fixadas.discard(sheet_name)
+
+def cache_fixado(sheet_name):
+    """
+    Verifica se o snapshot compartilhado de uma planilha está fixado.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se o snapshot está fixado
+    """
+    with _lock:
+        return sheet_name in _fixadas
+
+def obter_derivado(tipo, sheet_name, versao):
+    """
+    Retorna um dado derivado de uma planilha, se já foi gerado para a versão informada.
+    
+    Dados derivados são estruturas construídas a partir dos valores de uma
+    planilha (DataFrame tipado, cubo mensal, índices, matriz de
+    produtividade). O objeto retornado é compartilhado entre sessões e não
+    deve ser modificado.
+    
+    Args:
+        tipo: Tipo do dado derivado (por exemplo, "tipado" ou "cubo")
+        sheet_name: Nome da planilha
+        versao: Versão dos dados
+    
+    Returns:
+        object: Dado derivado ou None
+    """
+    with _lock:
+        entrada = _derivados.get((tipo, sheet_name))
+        if entrada is not None and entrada[0] == versao:
+            return entrada[1]
+        return None
+
+def guardar_derivado(tipo, sheet_name, versao, derivado):
+    """
+    Guarda um dado derivado de uma planilha para a versão informada.
+    
+    Args:
+        tipo: Tipo do dado derivado
+        sheet_name: Nome da planilha
+        versao: Versão dos dados
+        derivado: Dado derivado
+    """
+    with _lock:
+        _derivados[(tipo, sheet_name)] = (versao, derivado)
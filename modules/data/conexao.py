@@ -0,0 +1,115 @@
+"""
+Conexão com o Google Sheets compartilhada por todo o processo.
+
+Um único cliente autorizado por conta de serviço, com um pool de conexões HTTP
+mantidas abertas (keep-alive), atende todas as sessões do Streamlit. As
+planilhas e abas abertas também ficam em cache, de modo que os metadados
+(open_by_key, worksheet) são buscados uma única vez por processo.
+"""
+import threading
+from requests.adapters import HTTPAdapter
+from google.auth.transport.requests import AuthorizedSession
+from utils.config import SHEET_GIDS, POOL_CONEXOES, POOL_TAMANHO_MAXIMO
+from modules.data.agendador import ClienteAgendado
+
+# Estado compartilhado por todas as sessões do processo
+_lock = threading.RLock()
+_clientes = {}
+_planilhas = {}
+_abas = {}
+
+def _criar_sessao(credenciais):
+    """
+    Cria a sessão HTTP autorizada com um pool de conexões ajustado.
+    
+    Args:
+        credenciais: Credenciais google-auth da conta de serviço
+    
+    Returns:
+        google.auth.transport.requests.AuthorizedSession: Sessão autorizada
+    """
+    sessao = AuthorizedSession(credenciais)
+    adaptador = HTTPAdapter(pool_connections=POOL_CONEXOES, pool_maxsize=POOL_TAMANHO_MAXIMO)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+def obter_cliente(credenciais):
+    """
+    Retorna o cliente autorizado do processo para a conta de serviço informada.
+    
+    Args:
+        credenciais: Credenciais google-auth da conta de serviço
+    
+    Returns:
+        ClienteAgendado: Cliente gspread compartilhado
+    """
+    chave = getattr(credenciais, "service_account_email", None) or id(credenciais)
+    with _lock:
+        cliente = _clientes.get(chave)
+        if cliente is None:
+            cliente = ClienteAgendado(credenciais, session=_criar_sessao(credenciais))
+            _clientes[chave] = cliente
+        return cliente
+
+def obter_planilha(credenciais, sheet_id):
+    """
+    Retorna a planilha aberta pelo ID, buscando seus metadados apenas na primeira vez.
+    
+    Args:
+        credenciais: Credenciais google-auth da conta de serviço
+        sheet_id: ID da planilha
+    
+    Returns:
+        gspread.Spreadsheet: Planilha aberta
+    """
+    cliente = obter_cliente(credenciais)
+    chave = (id(cliente), sheet_id)
+    with _lock:
+        planilha = _planilhas.get(chave)
+        if planilha is None:
+            planilha = cliente.open_by_key(sheet_id)
+            _planilhas[chave] = planilha
+        return planilha
+
+def obter_aba(spreadsheet, sheet_name):
+    """
+    Retorna uma aba pelo nome (ou, se falhar, pelo ID configurado), buscando
+    seus metadados apenas na primeira vez.
+    
+    Args:
+        spreadsheet: Planilha aberta
+        sheet_name: Nome da aba
+    
+    Returns:
+        gspread.Worksheet: Aba encontrada
+    
+    Raises:
+        ValueError: Se a aba não for encontrada
+    """
+    chave = (spreadsheet.id, sheet_name)
+    with _lock:
+        aba = _abas.get(chave)
+    if aba is not None:
+        return aba
+    
+    try:
+        aba = spreadsheet.worksheet(sheet_name)
+    except Exception:
+        if sheet_name not in SHEET_GIDS:
+            raise ValueError(f"Planilha '{sheet_name}' não encontrada.")
+        aba = spreadsheet.get_worksheet_by_id(int(SHEET_GIDS[sheet_name]))
+    
+    with _lock:
+        _abas[chave] = aba
+    return aba
+
+def descartar_conexoes():
+    """
+    Descarta os clientes, planilhas e abas em cache (usado ao forçar uma reconexão).
+    """
+    with _lock:
+        for cliente in _clientes.values():
+            cliente.session.close()
+        _clientes.clear()
+        _planilhas.clear()
+        _abas.clear()
@@ -0,0 +1,134 @@
+"""
+Cubo mensal pré-agregado de receitas e despesas.
+
+Cada célula do cubo guarda a soma e a quantidade de lançamentos de um mês para
+uma combinação de dimensões (categoria, projeto, forma de pagamento, etc.). As
+consultas do dashboard e dos relatórios percorrem apenas as células, em vez de
+todos os lançamentos.
+"""
+import pandas as pd
+from utils.config import DIMENSOES_CUBO
+
+# Coluna de data que define o mês de cada lançamento
+COLUNAS_DATA_CUBO = {
+    "Receitas": "DataRecebimento",
+    "Despesas": "DataPagamento"
+}
+
+# Filtros do dashboard -> dimensão do cubo
+FILTROS_CUBO = {
+    "categoria": "Categoria",
+    "projeto": "Projeto",
+    "responsavel": "Responsável",
+    "fornecedor": "Fornecedor"
+}
+
+def construir_cubo(df, sheet_name):
+    """
+    Agrega os lançamentos tipados por mês e por todas as dimensões do cubo.
+    
+    Args:
+        df: DataFrame tipado de receitas ou despesas
+        sheet_name: "Receitas" ou "Despesas"
+    
+    Returns:
+        pandas.DataFrame: Colunas ["MesAno", dimensões..., "ValorTotal", "Quantidade"]
+    """
+    dimensoes = [d for d in DIMENSOES_CUBO.get(sheet_name, []) if d in df.columns]
+    coluna_data = COLUNAS_DATA_CUBO.get(sheet_name)
+    
+    if coluna_data in df.columns:
+        mes_ano = df[coluna_data].dt.to_period("M").dt.to_timestamp()
+    else:
+        mes_ano = pd.Series(pd.NaT, index=df.index)
+    valores = df["ValorTotal"] if "ValorTotal" in df.columns else pd.Series(0.0, index=df.index)
+    
+    # Dimensões como texto simples para que cubos de versões diferentes possam ser combinados
+    base = df[dimensoes].astype(object)
+    base.insert(0, "MesAno", mes_ano)
+    base["ValorTotal"] = valores.astype("float64")
+    
+    return (
+        base.groupby(["MesAno"] + dimensoes, dropna=False, sort=True)
+        .agg(ValorTotal=("ValorTotal", "sum"), Quantidade=("ValorTotal", "size"))
+        .reset_index()
+    )
+
+def combinar_cubos(cubo, cubo_novo):
+    """
+    Soma as células de um cubo parcial (por exemplo, das linhas recém-adicionadas) a um cubo existente.
+    
+    Args:
+        cubo: Cubo existente
+        cubo_novo: Cubo com os novos lançamentos
+    
+    Returns:
+        pandas.DataFrame: Novo cubo com as células combinadas
+    """
+    chaves = [c for c in cubo.columns if c not in ("ValorTotal", "Quantidade")]
+    return (
+        pd.concat([cubo, cubo_novo[cubo.columns]], ignore_index=True)
+        .groupby(chaves, dropna=False, sort=True)[["ValorTotal", "Quantidade"]]
+        .sum()
+        .reset_index()
+    )
+
+def filtrar_cubo(cubo, filtros):
+    """
+    Seleciona as células do cubo que atendem aos filtros do dashboard.
+    
+    Filtros de dimensões que o cubo não possui são ignorados, como em aplicar_filtros.
+    
+    Args:
+        cubo: Cubo mensal
+        filtros: Dicionário com os filtros selecionados
+    
+    Returns:
+        pandas.DataFrame: Células selecionadas
+    """
+    mascara = pd.Series(True, index=cubo.index)
+    
+    mes = filtros.get("mes")
+    if mes and "Todos" not in mes:
+        mascara &= cubo["MesAno"].dt.month.isin(mes)
+    ano = filtros.get("ano")
+    if ano and "Todos" not in ano:
+        mascara &= cubo["MesAno"].dt.year.isin(ano)
+    
+    for filtro, dimensao in FILTROS_CUBO.items():
+        valores = filtros.get(filtro)
+        if valores and dimensao in cubo.columns:
+            mascara &= cubo[dimensao].isin(valores)
+    
+    return cubo[mascara]
+
+def somar_cubo(cubo, dimensao):
+    """
+    Soma os valores das células agrupando por uma dimensão.
+    
+    Args:
+        cubo: Cubo (ou células filtradas)
+        dimensao: Dimensão de agrupamento (ou "MesAno")
+    
+    Returns:
+        pandas.DataFrame: DataFrame com as colunas [dimensao, "ValorTotal"]
+    """
+    if cubo.empty or dimensao not in cubo.columns:
+        return pd.DataFrame(columns=[dimensao, "ValorTotal"])
+    return cubo.groupby(dimensao)["ValorTotal"].sum().reset_index()
+
+def total_periodo(cubo, mes, ano):
+    """
+    Retorna a soma dos valores de um mês.
+    
+    Args:
+        cubo: Cubo mensal
+        mes: Mês (1 a 12)
+        ano: Ano
+    
+    Returns:
+        float: Soma dos valores do mês
+    """
+    if cubo.empty:
+        return 0.0
+    return float(cubo.loc[cubo["MesAno"] == pd.Timestamp(year=ano, month=mes, day=1), "ValorTotal"].sum())
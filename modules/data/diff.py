@@ -0,0 +1,294 @@
+"""
+Motor de diferenças entre o snapshot carregado de uma planilha e os dados editados.
+"""
+from difflib import SequenceMatcher
+
+
+def _normalizar_linhas(linhas, largura):
+    """
+    Ajusta todas as linhas para a mesma largura e as converte em tuplas comparáveis.
+
+    Args:
+        linhas: Lista de listas com os valores das linhas
+        largura: Número de colunas esperado
+
+    Returns:
+        list: Lista de tuplas com exatamente `largura` valores
+    """
+    return [tuple((list(linha) + [""] * largura)[:largura]) for linha in linhas]
+
+def _intervalos_contiguos(indices):
+    """
+    Agrupa índices ordenados em intervalos contíguos [inicio, fim).
+
+    Args:
+        indices: Lista ordenada de índices
+
+    Returns:
+        list: Lista de tuplas (inicio, fim)
+    """
+    intervalos = []
+    for indice in indices:
+        if intervalos and intervalos[-1][1] == indice:
+            intervalos[-1][1] = indice + 1
+        else:
+            intervalos.append([indice, indice + 1])
+    return [tuple(intervalo) for intervalo in intervalos]
+
+def _requisicao_atualizar_celulas(sheet_id, linha_inicio, coluna_inicio, linhas):
+    """
+    Monta uma requisição updateCells para um bloco retangular de valores.
+
+    Args:
+        sheet_id: ID (gid) da aba
+        linha_inicio: Índice da primeira linha na planilha (base 0, cabeçalho é a linha 0)
+        coluna_inicio: Índice da primeira coluna (base 0)
+        linhas: Lista de listas com os valores do bloco
+
+    Returns:
+        dict: Requisição no formato da API spreadsheets.batchUpdate
+    """
+    return {
+        "updateCells": {
+            "range": {
+                "sheetId": sheet_id,
+                "startRowIndex": linha_inicio,
+                "endRowIndex": linha_inicio + len(linhas),
+                "startColumnIndex": coluna_inicio,
+                "endColumnIndex": coluna_inicio + len(linhas[0]),
+            },
+            "rows": [
+                {"values": [{"userEnteredValue": {"stringValue": valor}} for valor in linha]}
+                for linha in linhas
+            ],
+            "fields": "userEnteredValue",
+        }
+    }
+
+def _requisicao_dimensao(tipo, sheet_id, inicio, fim):
+    """
+    Monta uma requisição de inserção ou exclusão de linhas.
+
+    Args:
+        tipo: "insertDimension" ou "deleteDimension"
+        sheet_id: ID (gid) da aba
+        inicio: Índice da primeira linha afetada (base 0)
+        fim: Índice final exclusivo
+
+    Returns:
+        dict: Requisição no formato da API spreadsheets.batchUpdate
+    """
+    faixa = {"sheetId": sheet_id, "dimension": "ROWS", "startIndex": inicio, "endIndex": fim}
+    if tipo == "insertDimension":
+        return {"insertDimension": {"range": faixa, "inheritFromBefore": False}}
+    return {"deleteDimension": {"range": faixa}}
+
+def gerar_requisicoes_diff(linhas_antigas, linhas_novas, sheet_id, largura):
+    """
+    Compara as linhas do snapshot com as linhas editadas e gera apenas as
+    requisições necessárias para levar a planilha ao novo estado.
+
+    As linhas são alinhadas com SequenceMatcher, de modo que inserções e
+    exclusões no meio da tabela viram operações de faixa contíguas em vez de
+    marcar todas as linhas seguintes como alteradas. As operações são emitidas
+    de baixo para cima para que os índices das operações anteriores continuem válidos.
+
+    Args:
+        linhas_antigas: Linhas de dados do snapshot (sem o cabeçalho)
+        linhas_novas: Linhas de dados editadas (sem o cabeçalho)
+        sheet_id: ID (gid) da aba
+        largura: Número de colunas do cabeçalho
+
+    Returns:
+        list: Requisições para spreadsheet.batch_update (vazia se nada mudou)
+    """
+    antigas = _normalizar_linhas(linhas_antigas, largura)
+    novas = _normalizar_linhas(linhas_novas, largura)
+
+    matcher = SequenceMatcher(None, antigas, novas, autojunk=False)
+    requisicoes = []
+
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+
+        # Linhas pareadas (substituição) são comparadas célula a célula
+        comum = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+
+        # Linhas antigas excedentes são removidas em uma única faixa
+        if i2 - i1 > comum:
+            requisicoes.append(_requisicao_dimensao("deleteDimension", sheet_id, i1 + comum + 1, i2 + 1))
+
+        # Linhas novas excedentes são inseridas e preenchidas em uma única faixa
+        if j2 - j1 > comum:
+            inicio = i1 + comum + 1
+            requisicoes.append(_requisicao_dimensao("insertDimension", sheet_id, inicio, inicio + (j2 - j1 - comum)))
+            requisicoes.append(_requisicao_atualizar_celulas(sheet_id, inicio, 0, [list(linha) for linha in novas[j1 + comum:j2]]))
+
+        # Apenas as células alteradas das linhas pareadas são regravadas
+        for k in range(comum):
+            antiga, nova = antigas[i1 + k], novas[j1 + k]
+            colunas_alteradas = [c for c in range(largura) if antiga[c] != nova[c]]
+            for inicio, fim in _intervalos_contiguos(colunas_alteradas):
+                requisicoes.append(_requisicao_atualizar_celulas(sheet_id, i1 + k + 1, inicio, [list(nova[inicio:fim])]))
+
+    return requisicoes
+
+def gerar_requisicoes_linhas(alteracoes, sheet_id, largura):
+    """
+    Gera as requisições para regravar apenas as células alteradas de linhas conhecidas.
+
+    Args:
+        alteracoes: Lista de tuplas (posição, linha_antiga, linha_nova), com a posição
+                    da linha de dados (base 0, sem o cabeçalho)
+        sheet_id: ID (gid) da aba
+        largura: Número de colunas do cabeçalho
+
+    Returns:
+        list: Requisições para spreadsheet.batch_update
+    """
+    requisicoes = []
+    for posicao, linha_antiga, linha_nova in alteracoes:
+        antiga, nova = _normalizar_linhas([linha_antiga, linha_nova], largura)
+        colunas_alteradas = [c for c in range(largura) if antiga[c] != nova[c]]
+        for inicio, fim in _intervalos_contiguos(colunas_alteradas):
+            requisicoes.append(_requisicao_atualizar_celulas(sheet_id, posicao + 1, inicio, [list(nova[inicio:fim])]))
+    return requisicoes
+
+def gerar_requisicoes_coluna(valores, sheet_id, coluna):
+    """
+    Gera as requisições para gravar valores em uma coluna, um bloco por faixa contígua de linhas.
+
+    Args:
+        valores: Dicionário {linha na planilha (base 0, cabeçalho é a linha 0): valor}
+        sheet_id: ID (gid) da aba
+        coluna: Índice da coluna (base 0)
+
+    Returns:
+        list: Requisições para spreadsheet.batch_update
+    """
+    return [
+        _requisicao_atualizar_celulas(sheet_id, inicio, coluna, [[valores[linha]] for linha in range(inicio, fim)])
+        for inicio, fim in _intervalos_contiguos(sorted(valores))
+    ]
+
+def gerar_requisicoes_exclusao(posicoes, sheet_id):
+    """
+    Gera as requisições para excluir linhas, uma faixa por intervalo contíguo,
+    de baixo para cima para que os índices das faixas seguintes continuem válidos.
+
+    Args:
+        posicoes: Posições das linhas de dados (base 0, sem o cabeçalho)
+        sheet_id: ID (gid) da aba
+
+    Returns:
+        list: Requisições para spreadsheet.batch_update
+    """
+    return [
+        _requisicao_dimensao("deleteDimension", sheet_id, inicio + 1, fim + 1)
+        for inicio, fim in reversed(_intervalos_contiguos(sorted(set(posicoes))))
+    ]
+
+def gerar_requisicoes_coluna_oculta(sheet_id, coluna, colunas_existentes):
+    """
+    Gera as requisições para criar (se preciso) e ocultar uma coluna.
+
+    Args:
+        sheet_id: ID (gid) da aba
+        coluna: Índice da coluna (base 0)
+        colunas_existentes: Número de colunas que a aba possui
+
+    Returns:
+        list: Requisições para spreadsheet.batch_update
+    """
+    requisicoes = []
+    if coluna >= colunas_existentes:
+        requisicoes.append({
+            "appendDimension": {"sheetId": sheet_id, "dimension": "COLUMNS", "length": coluna + 1 - colunas_existentes}
+        })
+    requisicoes.append({
+        "updateDimensionProperties": {
+            "range": {"sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": coluna, "endIndex": coluna + 1},
+            "properties": {"hiddenByUser": True},
+            "fields": "hiddenByUser",
+        }
+    })
+    return requisicoes
+
+def remover_vazios_finais(linha):
+    """
+    Remove as células vazias do final de uma linha (a API não as retorna).
+
+    Args:
+        linha: Lista com os valores da linha
+
+    Returns:
+        list: Linha sem as células vazias finais
+    """
+    linha = list(linha)
+    while linha and linha[-1] == "":
+        linha.pop()
+    return linha
+
+def gerar_requisicoes_por_id(operacoes, ids, linhas, sheet_id):
+    """
+    Converte operações por identificador em requisições posicionais, usando as
+    posições lidas da planilha no momento do envio.
+
+    As operações são aplicadas na ordem: em cada uma, primeiro os
+    identificadores novos são gravados ("identificar", só se a linha ainda não
+    tem identificador e continua com o conteúdo esperado), depois as linhas
+    são atualizadas ("atualizar") e por fim excluídas ("excluir"). Operações
+    cuja linha não é encontrada (alterada ou excluída em outra sessão) são
+    descartadas e contadas como conflitos.
+
+    Args:
+        operacoes: Lista de dicionários com "coluna", "largura" e as listas
+                   "identificar" ([posição, id, linha esperada]), "atualizar"
+                   ([id, linha antiga, linha nova]) e "excluir" ([id])
+        ids: Identificadores atuais das linhas de dados, na ordem da planilha
+        linhas: Linhas de dados atuais completas (necessárias só para "identificar"), ou None
+        sheet_id: ID (gid) da aba
+
+    Returns:
+        tuple: (requisições para spreadsheet.batch_update, número de conflitos)
+    """
+    ids = list(ids)
+    linhas = list(linhas) if linhas is not None else None
+    requisicoes = []
+    conflitos = 0
+
+    for operacao in operacoes:
+        coluna = operacao["coluna"]
+
+        novos = {}
+        for posicao, identificador, esperada in operacao.get("identificar", []):
+            atual = linhas[posicao] if linhas is not None and posicao < len(linhas) else None
+            ocupado = posicao < len(ids) and ids[posicao]
+            if atual is None or ocupado or remover_vazios_finais(atual) != remover_vazios_finais(esperada):
+                conflitos += 1
+                continue
+            ids.extend([""] * (posicao + 1 - len(ids)))
+            ids[posicao] = identificador
+            novos[posicao + 1] = identificador
+        requisicoes.extend(gerar_requisicoes_coluna(novos, sheet_id, coluna))
+
+        posicoes = {identificador: posicao for posicao, identificador in enumerate(ids) if identificador}
+        alteracoes = []
+        for identificador, antiga, nova in operacao.get("atualizar", []):
+            if identificador in posicoes:
+                alteracoes.append((posicoes[identificador], antiga, nova))
+            else:
+                conflitos += 1
+        requisicoes.extend(gerar_requisicoes_linhas(alteracoes, sheet_id, operacao["largura"]))
+
+        pedidos = set(operacao.get("excluir", []))
+        excluir = {posicoes[identificador] for identificador in pedidos if identificador in posicoes}
+        conflitos += len(pedidos) - len(excluir)
+        if excluir:
+            requisicoes.extend(gerar_requisicoes_exclusao(excluir, sheet_id))
+            ids = [identificador for posicao, identificador in enumerate(ids) if posicao not in excluir]
+            if linhas is not None:
+                linhas = [linha for posicao, linha in enumerate(linhas) if posicao not in excluir]
+
+    return requisicoes, conflitos
@@ -0,0 +1,219 @@
+"""
+Espelho local (SQLite) das planilhas do Google Sheets.
+
+Cada planilha de COLUNAS_ESPERADAS tem uma tabela no arquivo local com uma
+linha por linha da planilha e o hash do seu conteúdo. As leituras a frio são
+servidas pelo espelho, e a planilha passa a ser sincronizada em segundo plano:
+a cada carregamento ou gravação, apenas as linhas cujo hash mudou são regravadas.
+A comparação dos hashes roda em uma thread própria, fora das requisições das
+sessões; se várias versões de uma planilha chegam antes de a thread gravá-las,
+só a mais recente é sincronizada.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from utils.config import COLUNAS_ESPERADAS, ESPELHO_ATIVO, ESPELHO_IDADE_MAXIMA
+
+# Serializa as gravações feitas pelas sessões e pelas threads de carregamento
+_lock = threading.Lock()
+
+# Versões aguardando a thread de sincronização: planilha -> valores
+_condicao = threading.Condition()
+_pendentes = {}
+_estado = {"thread": None}
+
+def _arquivo_espelho():
+    """
+    Retorna o caminho do arquivo SQLite do espelho, criando o diretório se necessário.
+    
+    Returns:
+        str: Caminho do arquivo
+    """
+    diretorio = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "dados")
+    os.makedirs(diretorio, exist_ok=True)
+    return os.path.join(diretorio, "espelho.sqlite3")
+
+def _conectar():
+    """
+    Abre uma conexão com o espelho (uma por operação, para uso seguro entre threads).
+    
+    Returns:
+        sqlite3.Connection: Conexão aberta
+    """
+    conexao = sqlite3.connect(_arquivo_espelho(), timeout=30)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS _espelho_metadados ("
+        "planilha TEXT PRIMARY KEY, cabecalho TEXT NOT NULL, sincronizado_em REAL NOT NULL)"
+    )
+    return conexao
+
+def _tabela(sheet_name):
+    """
+    Retorna o nome (já entre aspas) da tabela de uma planilha.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        str: Nome da tabela
+    """
+    return '"espelho_' + sheet_name.replace('"', '""') + '"'
+
+def _hash_linha(linha):
+    """
+    Calcula o hash do conteúdo de uma linha.
+    
+    Args:
+        linha: Lista de valores
+    
+    Returns:
+        str: Hash hexadecimal
+    """
+    return hashlib.sha1("\x1f".join(linha).encode("utf-8")).hexdigest()
+
+def espelho_habilitado(sheet_name):
+    """
+    Verifica se a planilha é mantida no espelho local.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se a planilha é espelhada
+    """
+    return ESPELHO_ATIVO and sheet_name in COLUNAS_ESPERADAS
+
+def sincronizar_espelho(sheet_name, valores):
+    """
+    Atualiza o espelho com os valores atuais da planilha, regravando apenas as linhas alteradas.
+    
+    As colunas são guardadas por posição (c0, c1, ...) e o cabeçalho fica nos
+    metadados; se o cabeçalho mudar, a tabela é recriada.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas)
+    
+    Returns:
+        tuple: (linhas gravadas, linhas removidas) ou None se o espelho não foi atualizado
+    """
+    if not espelho_habilitado(sheet_name):
+        return None
+    
+    cabecalho = list(valores[0]) if valores else []
+    largura = len(cabecalho)
+    tabela = _tabela(sheet_name)
+    
+    try:
+        with _lock:
+            conexao = _conectar()
+            try:
+                with conexao:
+                    linha_meta = conexao.execute(
+                        "SELECT cabecalho FROM _espelho_metadados WHERE planilha = ?", (sheet_name,)
+                    ).fetchone()
+                    
+                    if linha_meta is None or json.loads(linha_meta[0]) != cabecalho:
+                        # Estrutura nova ou alterada: recria a tabela
+                        colunas = "".join(f", c{i} TEXT" for i in range(largura))
+                        conexao.execute(f"DROP TABLE IF EXISTS {tabela}")
+                        conexao.execute(f"CREATE TABLE {tabela} (_linha INTEGER PRIMARY KEY, _hash TEXT NOT NULL{colunas})")
+                        hashes = {}
+                    else:
+                        hashes = dict(conexao.execute(f"SELECT _linha, _hash FROM {tabela}"))
+                    
+                    # Compara os hashes linha a linha e separa o que mudou
+                    gravar = []
+                    for indice, linha in enumerate(valores[1:]):
+                        linha = [str(valor) for valor in (list(linha) + [""] * largura)[:largura]]
+                        hash_linha = _hash_linha(linha)
+                        if hashes.get(indice) != hash_linha:
+                            gravar.append((indice, hash_linha, *linha))
+                    remover = [(indice,) for indice in hashes if indice >= len(valores) - 1]
+                    
+                    if gravar:
+                        marcadores = ", ".join(["?"] * (largura + 2))
+                        conexao.executemany(f"INSERT OR REPLACE INTO {tabela} VALUES ({marcadores})", gravar)
+                    if remover:
+                        conexao.executemany(f"DELETE FROM {tabela} WHERE _linha = ?", remover)
+                    
+                    conexao.execute(
+                        "INSERT OR REPLACE INTO _espelho_metadados VALUES (?, ?, ?)",
+                        (sheet_name, json.dumps(cabecalho, ensure_ascii=False), time.time())
+                    )
+            finally:
+                conexao.close()
+        return len(gravar), len(remover)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Erro ao sincronizar o espelho da planilha '{sheet_name}': {e}")
+        return None
+
+def agendar_sincronizacao(sheet_name, valores):
+    """
+    Entrega os valores de uma planilha à thread de sincronização do espelho e retorna imediatamente.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas); não deve ser modificada depois
+    """
+    if not espelho_habilitado(sheet_name):
+        return
+    with _condicao:
+        _pendentes[sheet_name] = valores
+        if _estado["thread"] is None:
+            _estado["thread"] = threading.Thread(target=_processar_pendentes, name="sincronizacao_espelho", daemon=True)
+            _estado["thread"].start()
+        _condicao.notify_all()
+
+def _processar_pendentes():
+    """
+    Laço da thread de sincronização: grava no espelho a versão mais recente de cada planilha pendente.
+    """
+    while True:
+        with _condicao:
+            while not _pendentes:
+                _condicao.wait()
+            sheet_name = next(iter(_pendentes))
+            valores = _pendentes.pop(sheet_name)
+        sincronizar_espelho(sheet_name, valores)
+
+def ler_espelho(sheet_name, idade_maxima=ESPELHO_IDADE_MAXIMA):
+    """
+    Lê os valores de uma planilha a partir do espelho local.
+    
+    Args:
+        sheet_name: Nome da planilha
+        idade_maxima: Idade máxima (em segundos) da última sincronização aceita
+    
+    Returns:
+        tuple: (lista de listas com cabeçalho + linhas, momento da última sincronização)
+               ou None se não houver espelho recente
+    """
+    if not espelho_habilitado(sheet_name):
+        return None
+    
+    try:
+        conexao = _conectar()
+        try:
+            linha_meta = conexao.execute(
+                "SELECT cabecalho, sincronizado_em FROM _espelho_metadados WHERE planilha = ?", (sheet_name,)
+            ).fetchone()
+            if linha_meta is None or time.time() - linha_meta[1] > idade_maxima:
+                return None
+            
+            cabecalho = json.loads(linha_meta[0])
+            if not cabecalho:
+                return [], linha_meta[1]
+            
+            colunas = ", ".join(f"c{i}" for i in range(len(cabecalho)))
+            linhas = conexao.execute(f"SELECT {colunas} FROM {_tabela(sheet_name)} ORDER BY _linha").fetchall()
+            return [cabecalho] + [list(linha) for linha in linhas], linha_meta[1]
+        finally:
+            conexao.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Erro ao ler o espelho da planilha '{sheet_name}': {e}")
+        return None
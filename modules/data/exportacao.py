@@ -0,0 +1,130 @@
+"""
+Exportação de DataFrames para arquivos (Excel, CSV e Parquet).
+
+Os arquivos são gravados em disco (arquivos temporários) em vez de montados
+em memória: o Excel usa o modo constant_memory do xlsxwriter, em que cada
+linha é descarregada no arquivo assim que é escrita, e as linhas do DataFrame
+são convertidas em blocos, sem materializar a planilha inteira em objetos
+Python. O arquivo gerado é servido por st.download_button a partir do seu
+handle e removido em seguida.
+"""
+import os
+import tempfile
+import xlsxwriter
+from utils.config import EXPORTACAO_LINHAS_POR_BLOCO
+
+# Formatos disponíveis: extensão e tipo MIME
+FORMATOS_EXPORTACAO = {
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+def _arquivo_temporario(extensao):
+    """
+    Cria um arquivo temporário vazio e retorna seu caminho.
+    
+    Args:
+        extensao: Extensão do arquivo (com o ponto)
+    
+    Returns:
+        str: Caminho do arquivo
+    """
+    descritor, caminho = tempfile.mkstemp(prefix="vrz_relatorio_", suffix=extensao)
+    os.close(descritor)
+    return caminho
+
+def _linhas_em_blocos(df):
+    """
+    Percorre as linhas do DataFrame em blocos, convertidas para valores Python (ausentes viram None).
+    
+    Args:
+        df: DataFrame com os dados
+    
+    Yields:
+        list: Linhas do bloco (listas de valores)
+    """
+    for inicio in range(0, len(df), EXPORTACAO_LINHAS_POR_BLOCO):
+        bloco = df.iloc[inicio:inicio + EXPORTACAO_LINHAS_POR_BLOCO].astype(object)
+        yield bloco.where(bloco.notna(), None).values.tolist()
+
+def exportar_excel(planilhas):
+    """
+    Grava um arquivo Excel com uma aba por DataFrame, linha a linha e com memória constante.
+    
+    Args:
+        planilhas: Dicionário {nome da aba: DataFrame}
+    
+    Returns:
+        str: Caminho do arquivo temporário gerado
+    """
+    caminho = _arquivo_temporario(".xlsx")
+    workbook = xlsxwriter.Workbook(caminho, {
+        "constant_memory": True,
+        "default_date_format": "dd/mm/yyyy",
+        "remove_timezone": True,
+    })
+    try:
+        formato_cabecalho = workbook.add_format({"bold": True})
+        for nome, df in planilhas.items():
+            # Nomes de abas no Excel têm no máximo 31 caracteres
+            worksheet = workbook.add_worksheet(str(nome)[:31])
+            worksheet.write_row(0, 0, [str(coluna) for coluna in df.columns], formato_cabecalho)
+            
+            # No modo constant_memory as linhas precisam ser escritas em ordem
+            linha = 1
+            for bloco in _linhas_em_blocos(df):
+                for valores in bloco:
+                    worksheet.write_row(linha, 0, valores)
+                    linha += 1
+    finally:
+        workbook.close()
+    return caminho
+
+def exportar_csv(df):
+    """
+    Grava um arquivo CSV (UTF-8 com BOM, para abrir corretamente no Excel).
+    
+    Args:
+        df: DataFrame com os dados
+    
+    Returns:
+        str: Caminho do arquivo temporário gerado
+    """
+    caminho = _arquivo_temporario(".csv")
+    df.to_csv(caminho, index=False, encoding="utf-8-sig", date_format="%d/%m/%Y", chunksize=EXPORTACAO_LINHAS_POR_BLOCO)
+    return caminho
+
+def exportar_parquet(df):
+    """
+    Grava um arquivo Parquet preservando os tipos das colunas.
+    
+    Args:
+        df: DataFrame com os dados
+    
+    Returns:
+        str: Caminho do arquivo temporário gerado
+    """
+    caminho = _arquivo_temporario(".parquet")
+    # Colunas de texto podem misturar tipos vindos da planilha; o Parquet exige um tipo por coluna
+    colunas_texto = df.select_dtypes(include="object").columns
+    df.astype({coluna: "string" for coluna in colunas_texto}).to_parquet(caminho, index=False)
+    return caminho
+
+def exportar_dataframe(df, formato, nome_aba="Dados"):
+    """
+    Exporta um DataFrame no formato escolhido.
+    
+    Args:
+        df: DataFrame com os dados
+        formato: Chave de FORMATOS_EXPORTACAO ("Excel", "CSV" ou "Parquet")
+        nome_aba: Nome da aba (apenas para Excel)
+    
+    Returns:
+        str: Caminho do arquivo temporário gerado
+    """
+    if formato == "CSV":
+        return exportar_csv(df)
+    if formato == "Parquet":
+        return exportar_parquet(df)
+    return exportar_excel({nome_aba: df})
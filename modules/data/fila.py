@@ -0,0 +1,410 @@
+"""
+Fila de gravações em segundo plano (write-behind) para o Google Sheets.
+
+As gravações são registradas em um diário local (SQLite) e a função que as
+enfileira retorna imediatamente; os caches já são atualizados pela sessão que
+gravou. Uma thread de trabalho envia as gravações na ordem em que chegaram,
+juntando as consecutivas da mesma planilha e do mesmo tipo em uma única
+requisição. Em caso de limite de requisições (429), falha temporária do
+servidor ou queda da rede, a gravação é repetida com espera exponencial; antes
+de repetir uma adição, a planilha é consultada para não gravar as linhas duas vezes.
+
+Como o diário fica em disco, gravações que não foram enviadas antes de o
+processo terminar são reenviadas quando a próxima sessão se conecta.
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+import requests
+from gspread.exceptions import APIError
+from gspread.utils import absolute_range_name, rowcol_to_a1
+from utils.config import FILA_MAX_TENTATIVAS, FILA_ESPERA_INICIAL, FILA_ESPERA_MAXIMA
+from modules.data.diff import (
+    gerar_requisicoes_diff, gerar_requisicoes_por_id, gerar_requisicoes_coluna, gerar_requisicoes_coluna_oculta, remover_vazios_finais
+)
+from modules.data.cache import fixar_cache, invalidar_cache
+from modules.data.gravacao import dimensoes_da_aba
+
+# Estado da fila compartilhado por todas as sessões do processo
+_condicao = threading.Condition()
+_estado = {"spreadsheet": None, "thread": None, "ultimo_erro": None}
+
+# Códigos HTTP que indicam falha temporária
+_CODIGOS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+def _arquivo_fila():
+    """
+    Retorna o caminho do diário da fila, criando o diretório se necessário.
+    
+    Returns:
+        str: Caminho do arquivo
+    """
+    diretorio = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "dados")
+    os.makedirs(diretorio, exist_ok=True)
+    return os.path.join(diretorio, "fila_gravacoes.sqlite3")
+
+def _conectar():
+    """
+    Abre uma conexão com o diário da fila.
+    
+    Returns:
+        sqlite3.Connection: Conexão aberta
+    """
+    conexao = sqlite3.connect(_arquivo_fila(), timeout=30)
+    conexao.row_factory = sqlite3.Row
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS gravacoes ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, planilha TEXT NOT NULL, titulo TEXT NOT NULL, "
+        "gid INTEGER NOT NULL, tipo TEXT NOT NULL, dados TEXT NOT NULL, criado_em REAL NOT NULL, "
+        "tentativas INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL DEFAULT 'pendente', erro TEXT)"
+    )
+    return conexao
+
+def _executar(sql, parametros=()):
+    """
+    Executa um comando no diário da fila em uma transação própria.
+    
+    Args:
+        sql: Comando SQL
+        parametros: Parâmetros do comando
+    
+    Returns:
+        list: Linhas retornadas
+    """
+    conexao = _conectar()
+    try:
+        with conexao:
+            return conexao.execute(sql, parametros).fetchall()
+    finally:
+        conexao.close()
+
+def _planilhas_pendentes():
+    """
+    Retorna as planilhas que têm gravações pendentes.
+    
+    Returns:
+        set: Nomes das planilhas
+    """
+    return {linha["planilha"] for linha in _executar("SELECT DISTINCT planilha FROM gravacoes WHERE status = 'pendente'")}
+
+def definir_conexao(spreadsheet):
+    """
+    Informa a planilha conectada usada pela thread de trabalho e a inicia, se necessário.
+    
+    Na primeira chamada do processo, as gravações pendentes de uma execução
+    anterior voltam a ser enviadas.
+    
+    Args:
+        spreadsheet: Planilha conectada (gspread.Spreadsheet)
+    """
+    with _condicao:
+        _estado["spreadsheet"] = spreadsheet
+        if _estado["thread"] is None:
+            for sheet_name in _planilhas_pendentes():
+                fixar_cache(sheet_name)
+            _estado["thread"] = threading.Thread(target=_processar_fila, name="fila_gravacoes", daemon=True)
+            _estado["thread"].start()
+        _condicao.notify_all()
+
+def _enfileirar(sheet_name, worksheet, tipo, dados):
+    """
+    Registra uma gravação no diário e acorda a thread de trabalho.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba de destino
+        tipo: "anexar", "substituir" ou "por_id"
+        dados: Dicionário serializável com os dados da gravação
+    """
+    with _condicao:
+        _executar(
+            "INSERT INTO gravacoes (planilha, titulo, gid, tipo, dados, criado_em) VALUES (?, ?, ?, ?, ?, ?)",
+            (sheet_name, worksheet.title, worksheet.id, tipo, json.dumps(dados, ensure_ascii=False), time.time())
+        )
+        fixar_cache(sheet_name)
+        _condicao.notify_all()
+
+def enfileirar_anexacao(sheet_name, worksheet, linhas):
+    """
+    Enfileira a adição de linhas ao final de uma aba.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba de destino
+        linhas: Lista de listas com os valores das novas linhas
+    """
+    _enfileirar(sheet_name, worksheet, "anexar", {"linhas": linhas})
+
+def enfileirar_substituicao(sheet_name, worksheet, valores_base, valores_novos):
+    """
+    Enfileira a substituição do conteúdo de uma aba, gravada como diferença em relação à base.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba de destino
+        valores_base: Lista de listas (cabeçalho + linhas) que a aba terá quando esta gravação for enviada
+        valores_novos: Lista de listas (cabeçalho + linhas) desejada
+    """
+    _enfileirar(sheet_name, worksheet, "substituir", {"base": valores_base, "novos": valores_novos})
+
+def enfileirar_operacoes_por_id(sheet_name, worksheet, operacoes):
+    """
+    Enfileira gravações endereçadas pelo identificador das linhas.
+    
+    As posições não são resolvidas aqui: a thread de trabalho lê a coluna de
+    identificadores logo antes do envio, de modo que linhas inseridas ou
+    excluídas por outra sessão não desviam a gravação para a linha errada.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba de destino
+        operacoes: Dicionário com "coluna" (índice da coluna de identificadores),
+                   "largura", "criar_coluna" (nome da coluna a criar, ou None) e
+                   as listas "identificar", "atualizar" e "excluir"
+                   (ver diff.gerar_requisicoes_por_id)
+    """
+    _enfileirar(sheet_name, worksheet, "por_id", operacoes)
+
+def _encadeada(anterior, gravacao):
+    """
+    Verifica se uma substituição parte exatamente do resultado da anterior.
+    
+    Args:
+        anterior: Gravação anterior do lote
+        gravacao: Gravação candidata
+    
+    Returns:
+        bool: True se a base da candidata é o conteúdo gravado pela anterior
+    """
+    return json.loads(gravacao["dados"])["base"] == json.loads(anterior["dados"])["novos"]
+
+def _proximo_lote():
+    """
+    Retorna a gravação pendente mais antiga e as seguintes da mesma planilha e do mesmo tipo.
+    
+    Só entram no lote gravações com o mesmo número de tentativas, de modo que
+    uma nova tentativa reenvia exatamente o lote que falhou. Substituições só
+    são juntadas quando cada uma parte do resultado da anterior; bases
+    divergentes (duas sessões editando a partir do mesmo snapshot) são enviadas
+    separadamente, sem que uma descarte a outra.
+    
+    Returns:
+        list: Linhas do diário que serão enviadas juntas (vazia se não houver pendências)
+    """
+    pendentes = _executar("SELECT * FROM gravacoes WHERE status = 'pendente' ORDER BY id LIMIT 200")
+    lote = []
+    for gravacao in pendentes:
+        if lote:
+            chave = (gravacao["planilha"], gravacao["tipo"], gravacao["tentativas"])
+            if chave != (lote[0]["planilha"], lote[0]["tipo"], lote[0]["tentativas"]):
+                break
+            if gravacao["tipo"] == "substituir" and not _encadeada(lote[-1], gravacao):
+                break
+        lote.append(gravacao)
+    return lote
+
+def _adicao_ja_gravada(spreadsheet, titulo, linhas):
+    """
+    Verifica se as linhas de uma adição já estão no final da aba.
+    
+    Usada antes de repetir uma adição que falhou: values:append não é
+    idempotente e a falha pode ter ocorrido depois de o servidor gravar.
+    
+    Args:
+        spreadsheet: Planilha conectada
+        titulo: Título da aba
+        linhas: Linhas da adição
+    
+    Returns:
+        bool: True se as últimas linhas da aba são as linhas da adição
+    """
+    valores = spreadsheet.values_get(absolute_range_name(titulo)).get("values", [])
+    if len(valores) < len(linhas):
+        return False
+    finais = valores[len(valores) - len(linhas):]
+    return [remover_vazios_finais(linha) for linha in finais] == [remover_vazios_finais(linha) for linha in linhas]
+
+def _enviar_por_id(spreadsheet, lote):
+    """
+    Resolve as gravações por identificador com as posições atuais da planilha e as envia em um único batchUpdate.
+    
+    Só a coluna de identificadores é lida, a menos que o lote precise criar a
+    coluna ou identificar linhas, quando a aba é lida inteira para conferir o
+    conteúdo de cada linha.
+    
+    Args:
+        spreadsheet: Planilha conectada
+        lote: Gravações do lote
+    
+    Returns:
+        int: Número de operações descartadas porque a linha não foi encontrada
+    """
+    primeira = lote[0]
+    titulo, gid = primeira["titulo"], primeira["gid"]
+    operacoes = [json.loads(gravacao["dados"]) for gravacao in lote]
+    coluna = operacoes[0]["coluna"]
+    requisicoes = []
+    
+    if any(operacao.get("criar_coluna") or operacao.get("identificar") for operacao in operacoes):
+        valores = spreadsheet.values_get(absolute_range_name(titulo)).get("values", [])
+        cabecalho = valores[0] if valores else []
+        linhas = valores[1:]
+        ids = [linha[coluna] if len(linha) > coluna else "" for linha in linhas]
+        
+        nome = next((operacao["criar_coluna"] for operacao in operacoes if operacao.get("criar_coluna")), None)
+        if nome and (len(cabecalho) <= coluna or cabecalho[coluna] != nome):
+            if len(cabecalho) > coluna and cabecalho[coluna]:
+                raise ValueError(f"A coluna {coluna + 1} de '{titulo}' já está ocupada por '{cabecalho[coluna]}'.")
+            requisicoes.extend(gerar_requisicoes_coluna_oculta(gid, coluna, dimensoes_da_aba(spreadsheet, gid)[1]))
+            requisicoes.extend(gerar_requisicoes_coluna({0: nome}, gid, coluna))
+    else:
+        letra = rowcol_to_a1(1, coluna + 1)[:-1]
+        valores = spreadsheet.values_get(absolute_range_name(titulo, f"{letra}2:{letra}")).get("values", [])
+        ids = [linha[0] if linha else "" for linha in valores]
+        linhas = None
+    
+    requisicoes_linhas, conflitos = gerar_requisicoes_por_id(operacoes, ids, linhas, gid)
+    requisicoes.extend(requisicoes_linhas)
+    if requisicoes:
+        spreadsheet.batch_update({"requests": requisicoes})
+    return conflitos
+
+def _enviar_lote(spreadsheet, lote):
+    """
+    Envia um lote de gravações como uma única requisição.
+    
+    Adições consecutivas viram um único values:append (repetido só se as
+    linhas ainda não estiverem na aba); substituições encadeadas viram um único
+    batchUpdate com a diferença entre a base da primeira e o conteúdo da
+    última; gravações por identificador consecutivas são resolvidas e
+    enviadas, na ordem, em um único batchUpdate.
+    
+    Args:
+        spreadsheet: Planilha conectada
+        lote: Gravações do lote
+    
+    Returns:
+        int: Número de gravações por identificador descartadas por conflito
+    """
+    primeira = lote[0]
+    if primeira["tipo"] == "anexar":
+        linhas = [linha for gravacao in lote for linha in json.loads(gravacao["dados"])["linhas"]]
+        if primeira["tentativas"] and _adicao_ja_gravada(spreadsheet, primeira["titulo"], linhas):
+            return
+        spreadsheet.values_append(
+            absolute_range_name(primeira["titulo"]),
+            params={"valueInputOption": "RAW"},
+            body={"values": linhas}
+        )
+        return
+    
+    if primeira["tipo"] == "por_id":
+        return _enviar_por_id(spreadsheet, lote)
+    
+    base = json.loads(primeira["dados"])["base"]
+    novos = json.loads(lote[-1]["dados"])["novos"]
+    requisicoes = gerar_requisicoes_diff(base[1:], novos[1:], primeira["gid"], len(novos[0]))
+    if requisicoes:
+        spreadsheet.batch_update({"requests": requisicoes})
+
+def _erro_temporario(erro):
+    """
+    Verifica se o erro indica limite de requisições, falha temporária do servidor ou da rede.
+    
+    Args:
+        erro: Exceção lançada ao enviar o lote
+    
+    Returns:
+        bool: True se vale a pena tentar novamente
+    """
+    if isinstance(erro, (APIError, requests.exceptions.HTTPError)):
+        return getattr(erro.response, "status_code", None) in _CODIGOS_TEMPORARIOS
+    # Quedas de conexão e tempos esgotados do requests (usado pelo gspread) não herdam das exceções nativas
+    return isinstance(erro, (requests.exceptions.RequestException, ConnectionError, TimeoutError))
+
+def _espera(tentativas):
+    """
+    Calcula a espera exponencial (com variação aleatória) antes da próxima tentativa.
+    
+    Args:
+        tentativas: Número de tentativas já feitas
+    
+    Returns:
+        float: Espera em segundos
+    """
+    espera = min(FILA_ESPERA_INICIAL * (2 ** (tentativas - 1)), FILA_ESPERA_MAXIMA)
+    return espera + random.uniform(0, espera / 2)
+
+def _processar_fila():
+    """
+    Laço da thread de trabalho: envia os lotes pendentes até a fila esvaziar e aguarda novas gravações.
+    """
+    while True:
+        with _condicao:
+            while _estado["spreadsheet"] is None or not _proximo_lote():
+                _condicao.wait(timeout=5)
+            spreadsheet = _estado["spreadsheet"]
+        
+        lote = _proximo_lote()
+        if not lote:
+            continue
+        sheet_name = lote[0]["planilha"]
+        ids = [gravacao["id"] for gravacao in lote]
+        marcadores = ", ".join("?" * len(ids))
+        
+        try:
+            conflitos = _enviar_lote(spreadsheet, lote)
+        except Exception as e:
+            tentativas = lote[0]["tentativas"] + 1
+            _estado["ultimo_erro"] = f"{sheet_name}: {e}"
+            if _erro_temporario(e) and tentativas < FILA_MAX_TENTATIVAS:
+                _executar(f"UPDATE gravacoes SET tentativas = ?, erro = ? WHERE id IN ({marcadores})", (tentativas, str(e), *ids))
+                time.sleep(_espera(tentativas))
+                continue
+            
+            # Falha definitiva: o cache deixa de refletir a gravação e é recarregado da planilha
+            _executar(f"UPDATE gravacoes SET status = 'falha', tentativas = ?, erro = ? WHERE id IN ({marcadores})", (tentativas, str(e), *ids))
+            invalidar_cache(sheet_name)
+        else:
+            _executar(f"DELETE FROM gravacoes WHERE id IN ({marcadores})", ids)
+            _estado["ultimo_erro"] = None
+            if conflitos:
+                # Linhas alteradas em outra sessão: o cache é recarregado da planilha
+                _estado["ultimo_erro"] = f"{sheet_name}: {conflitos} alteração(ões) descartada(s) porque a linha foi modificada em outra sessão"
+                invalidar_cache(sheet_name)
+        
+        # Sem mais pendências para a planilha, o cache volta a expirar normalmente
+        with _condicao:
+            if sheet_name not in _planilhas_pendentes():
+                fixar_cache(sheet_name, False)
+
+def status_fila_gravacoes():
+    """
+    Retorna a situação da fila de gravações.
+    
+    Returns:
+        dict: {"pendentes": int, "falhas": int, "ultimo_erro": str ou None}
+    """
+    try:
+        contagens = dict(
+            (linha["status"], linha["quantidade"])
+            for linha in _executar("SELECT status, COUNT(*) AS quantidade FROM gravacoes GROUP BY status")
+        )
+    except sqlite3.Error:
+        contagens = {}
+    return {
+        "pendentes": contagens.get("pendente", 0),
+        "falhas": contagens.get("falha", 0),
+        "ultimo_erro": _estado["ultimo_erro"]
+    }
+
+def descartar_falhas():
+    """
+    Remove do diário as gravações que falharam definitivamente.
+    """
+    _executar("DELETE FROM gravacoes WHERE status = 'falha'")
+    _estado["ultimo_erro"] = None
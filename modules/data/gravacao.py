@@ -0,0 +1,123 @@
+"""
+Gravação em massa de valores em uma aba do Google Sheets.
+
+Substitui as gravações linha a linha (uma requisição por linha) por gravações
+de intervalos: os valores são divididos em blocos de linhas consecutivas que
+respeitam o limite de tamanho da requisição e, como cada bloco ocupa um
+intervalo disjunto dos demais, os blocos são enviados em paralelo.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from gspread.utils import absolute_range_name, rowcol_to_a1
+from utils.config import GRAVACAO_MAX_CARACTERES_POR_BLOCO, MAX_THREADS_GRAVACAO
+
+def dividir_em_blocos(valores, max_caracteres=GRAVACAO_MAX_CARACTERES_POR_BLOCO):
+    """
+    Divide as linhas em blocos consecutivos cujo tamanho estimado não passa do limite.
+    
+    Args:
+        valores: Lista de listas de strings
+        max_caracteres: Tamanho máximo estimado de cada bloco
+    
+    Returns:
+        list: Lista de blocos (cada bloco é uma lista de linhas)
+    """
+    blocos = []
+    bloco = []
+    tamanho = 0
+    for linha in valores:
+        # Aspas e vírgulas do JSON somam cerca de 3 caracteres por célula
+        tamanho_linha = sum(len(valor) for valor in linha) + 3 * len(linha)
+        if bloco and tamanho + tamanho_linha > max_caracteres:
+            blocos.append(bloco)
+            bloco = []
+            tamanho = 0
+        bloco.append(linha)
+        tamanho += tamanho_linha
+    if bloco:
+        blocos.append(bloco)
+    return blocos
+
+def dimensoes_da_aba(spreadsheet, gid):
+    """
+    Lê o número atual de linhas e colunas de uma aba.
+    
+    Os metadados guardados no gspread.Worksheet são os do momento em que a
+    aba foi aberta e ficam desatualizados quando a grade muda.
+    
+    Args:
+        spreadsheet: Planilha conectada
+        gid: ID (gid) da aba
+    
+    Returns:
+        tuple: (número de linhas, número de colunas)
+    
+    Raises:
+        ValueError: Se a aba não for encontrada
+    """
+    metadados = spreadsheet.fetch_sheet_metadata(params={"fields": "sheets.properties"})
+    for aba in metadados.get("sheets", []):
+        if aba["properties"]["sheetId"] == gid:
+            grade = aba["properties"]["gridProperties"]
+            return grade["rowCount"], grade["columnCount"]
+    raise ValueError(f"Aba {gid} não encontrada.")
+
+def gravar_valores(worksheet, valores, linha_inicial=1):
+    """
+    Grava as linhas a partir de `linha_inicial` e limpa o que sobrar da aba abaixo e à direita delas.
+    
+    Args:
+        worksheet: Aba de destino (gspread.Worksheet)
+        valores: Lista de listas de strings
+        linha_inicial: Linha (a partir de 1) onde a gravação começa
+    
+    Returns:
+        int: Número de requisições enviadas
+    """
+    spreadsheet = worksheet.spreadsheet
+    num_colunas = max((len(linha) for linha in valores), default=0)
+    ultima_linha = linha_inicial + len(valores) - 1
+    
+    # Tamanho atual da grade (o da aba em cache pode ter mudado desde que ela foi aberta)
+    total_linhas, total_colunas = dimensoes_da_aba(spreadsheet, worksheet.id)
+    
+    # Garante que a grade da aba comporte todas as linhas antes das gravações paralelas
+    if ultima_linha > total_linhas:
+        worksheet.add_rows(ultima_linha - total_linhas)
+        total_linhas = ultima_linha
+    
+    # Um intervalo por bloco de linhas
+    requisicoes = []
+    linha = linha_inicial
+    for bloco in dividir_em_blocos(valores):
+        fim = linha + len(bloco) - 1
+        intervalo = absolute_range_name(worksheet.title, f"A{linha}:{rowcol_to_a1(fim, num_colunas)}")
+        requisicoes.append((spreadsheet.values_update, intervalo, {"params": {"valueInputOption": "RAW"}, "body": {"values": bloco}}))
+        linha = fim + 1
+    
+    # Conteúdo antigo que fica fora do que foi gravado: linhas abaixo e colunas à direita
+    intervalos_limpar = []
+    if total_linhas > ultima_linha:
+        intervalos_limpar.append(f"A{ultima_linha + 1}:{rowcol_to_a1(total_linhas, total_colunas)}")
+    if valores and total_colunas > num_colunas:
+        intervalos_limpar.append(f"{rowcol_to_a1(linha_inicial, num_colunas + 1)}:{rowcol_to_a1(ultima_linha, total_colunas)}")
+    if intervalos_limpar:
+        requisicoes.append((
+            spreadsheet.values_batch_clear,
+            None,
+            {"body": {"ranges": [absolute_range_name(worksheet.title, intervalo) for intervalo in intervalos_limpar]}}
+        ))
+    
+    def enviar(requisicao):
+        metodo, intervalo, argumentos = requisicao
+        return metodo(intervalo, **argumentos) if intervalo is not None else metodo(**argumentos)
+    
+    # Intervalos disjuntos: a ordem de envio não importa
+    if len(requisicoes) <= 1:
+        for requisicao in requisicoes:
+            enviar(requisicao)
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_THREADS_GRAVACAO) as executor:
+            # list() propaga a primeira exceção, se houver
+            list(executor.map(enviar, requisicoes))
+    
+    return len(requisicoes)
@@ -0,0 +1,137 @@
+"""
+Índices invertidos das colunas usadas nos filtros do dashboard.
+
+Em cada coluna indexada, cada valor distinto aponta para o vetor ordenado
+(NumPy) das posições das linhas que o contêm; a memória é proporcional ao
+número de linhas, mesmo em colunas com valores quase todos distintos. Os
+filtros deixam de varrer as colunas com isin: os valores selecionados em um
+filtro são combinados com OU e os filtros entre si com E. O índice é
+construído uma vez por versão dos dados e estendido quando linhas são
+adicionadas, sem reindexar a planilha.
+"""
+import numpy as np
+import pandas as pd
+
+# Colunas consultadas por cada filtro, por tipo de dado (como em aplicar_filtros)
+COLUNAS_FILTROS = {
+    "receitas": {
+        "categoria": ["Categoria"],
+        "projeto": ["Projeto"],
+    },
+    "despesas": {
+        "categoria": ["Categoria"],
+        "projeto": ["Projeto"],
+        "responsavel": ["Responsável"],
+        "fornecedor": ["Fornecedor"],
+    },
+    "projetos": {
+        "projeto": ["Projeto"],
+        "responsavel": ["ResponsávelElétrico", "ResponsávelHidráulico", "ResponsávelModelagem", "ResponsávelDetalhamento"],
+        "status": ["Status"],
+        "arquiteto": ["Arquiteto"],
+    },
+}
+
+# Planilhas indexadas e o tipo de dado correspondente (receitas e despesas são filtradas pelo cubo mensal)
+PLANILHAS_INDEXADAS = {"Projetos": "projetos"}
+
+def colunas_indexadas(sheet_name):
+    """
+    Retorna as colunas indexadas de uma planilha.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        list: Nomes das colunas
+    """
+    filtros = COLUNAS_FILTROS.get(PLANILHAS_INDEXADAS.get(sheet_name), {})
+    return [coluna for colunas in filtros.values() for coluna in colunas]
+
+def _indexar_coluna(serie):
+    """
+    Monta as listas de posições de uma coluna em uma única passada.
+    
+    Args:
+        serie: pandas.Series com os valores
+    
+    Returns:
+        dict: {valor: numpy.ndarray ordenado com as posições das linhas}
+    """
+    codigos, valores = pd.factorize(serie, use_na_sentinel=False)
+    # Ordena as linhas pelo código e corta nos limites de cada valor
+    ordem = np.argsort(codigos, kind="stable")
+    limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+    return {valor: ordem[limites[codigo]:limites[codigo + 1]] for codigo, valor in enumerate(valores)}
+
+def construir_indice(df, sheet_name):
+    """
+    Constrói o índice invertido das colunas de filtro de uma planilha.
+    
+    Args:
+        df: DataFrame tipado da planilha
+        sheet_name: Nome da planilha
+    
+    Returns:
+        dict: {"linhas": int, "colunas": {coluna: {valor: posições}}}
+    """
+    return {
+        "linhas": len(df),
+        "colunas": {coluna: _indexar_coluna(df[coluna]) for coluna in colunas_indexadas(sheet_name) if coluna in df.columns},
+    }
+
+def estender_indice(indice, novas, sheet_name):
+    """
+    Acrescenta linhas ao final de um índice, sem modificar o original (que é compartilhado).
+    
+    Args:
+        indice: Índice das linhas existentes
+        novas: DataFrame tipado com as linhas adicionadas
+        sheet_name: Nome da planilha
+    
+    Returns:
+        dict: Novo índice com as linhas existentes e as adicionadas
+    """
+    indice_novas = construir_indice(novas, sheet_name)
+    linhas = indice["linhas"]
+    colunas = {}
+    for coluna, posicoes in indice["colunas"].items():
+        # Só os valores presentes nas novas linhas ganham um vetor novo; os demais são compartilhados
+        posicoes = dict(posicoes)
+        for valor, posicoes_novas in indice_novas["colunas"].get(coluna, {}).items():
+            existentes = posicoes.get(valor)
+            deslocadas = posicoes_novas + linhas
+            posicoes[valor] = deslocadas if existentes is None else np.concatenate([existentes, deslocadas])
+        colunas[coluna] = posicoes
+    return {"linhas": linhas + indice_novas["linhas"], "colunas": colunas}
+
+def mascara_filtros(indice, filtros, tipo):
+    """
+    Combina as posições dos valores selecionados: OU dentro de cada filtro e E entre os filtros.
+    
+    Filtros vazios, ou de colunas que a planilha não possui, não restringem nada.
+    
+    Args:
+        indice: Índice invertido da planilha
+        filtros: Dicionário com os filtros selecionados
+        tipo: Tipo de dados ("receitas", "despesas" ou "projetos")
+    
+    Returns:
+        numpy.ndarray: Vetor booleano com as linhas que passam nos filtros
+    """
+    mascara = np.ones(indice["linhas"], dtype=bool)
+    for filtro, colunas in COLUNAS_FILTROS[tipo].items():
+        selecionados = filtros.get(filtro)
+        colunas = [coluna for coluna in colunas if coluna in indice["colunas"]]
+        if not selecionados or not colunas:
+            continue
+        
+        selecao = np.zeros(indice["linhas"], dtype=bool)
+        for coluna in colunas:
+            posicoes = indice["colunas"][coluna]
+            for valor in selecionados:
+                linhas = posicoes.get(valor)
+                if linhas is not None:
+                    selecao[linhas] = True
+        mascara &= selecao
+    return mascara
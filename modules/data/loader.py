@@ -0,0 +1,172 @@
+"""
+Carregamento concorrente das planilhas do Google Sheets.
+
+As threads deste módulo não têm acesso ao st.session_state; elas apenas buscam
+os valores e os publicam no cache compartilhado. Cada sessão monta seus
+DataFrames a partir dali.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from gspread.utils import absolute_range_name, fill_gaps
+from utils.config import MAX_THREADS_CARREGAMENTO
+from modules.data.cache import publicar_cache, cache_fixado, obter_cache_compartilhado
+from modules.data.espelho import agendar_sincronizacao
+from modules.data.conexao import obter_aba
+
+# Pool limitado compartilhado por todas as sessões do processo
+_executor = ThreadPoolExecutor(max_workers=MAX_THREADS_CARREGAMENTO, thread_name_prefix="carregamento_sheets")
+_lock = threading.Lock()
+_futuros = {}
+
+def _entrada_fixada(sheet_name):
+    """
+    Retorna a entrada do cache compartilhado se ela estiver fixada por gravações pendentes.
+
+    Args:
+        sheet_name: Nome da planilha
+
+    Returns:
+        dict: Entrada do cache compartilhado ou None
+    """
+    return obter_cache_compartilhado(sheet_name) if cache_fixado(sheet_name) else None
+
+def _carregar(spreadsheet, sheet_name, worksheet=None):
+    """
+    Busca os valores de uma aba e os publica no cache compartilhado e no espelho local.
+
+    Args:
+        spreadsheet: Planilha conectada
+        sheet_name: Nome da aba
+        worksheet: Aba já aberta (opcional)
+
+    Returns:
+        tuple: (worksheet, valores, versao)
+    """
+    if worksheet is None:
+        worksheet = obter_aba(spreadsheet, sheet_name)
+    
+    # Com gravações ainda na fila, a planilha remota está atrasada em relação ao cache
+    # e não precisa ser lida
+    entrada = _entrada_fixada(sheet_name)
+    if entrada is not None:
+        return worksheet, entrada["valores"], entrada["versao"]
+    
+    data = worksheet.get_all_values()
+    versao = publicar_cache(sheet_name, data)
+    agendar_sincronizacao(sheet_name, data)
+    return worksheet, data, versao
+
+def _carregar_lote(spreadsheet, futuros):
+    """
+    Busca várias abas com uma única requisição values:batchGet e conclui o Future de cada uma.
+
+    Args:
+        spreadsheet: Planilha conectada
+        futuros: Dicionário nome -> Future a concluir com (worksheet, valores, versao)
+    """
+    try:
+        # A aba pode ter sido aberta pelo ID, então o intervalo usa o título real
+        abas = {nome: obter_aba(spreadsheet, nome) for nome in futuros}
+        
+        # Planilhas fixadas por gravações pendentes ficam fora da requisição
+        lidas = []
+        for sheet_name, futuro in futuros.items():
+            entrada = _entrada_fixada(sheet_name)
+            if entrada is not None:
+                futuro.set_result((abas[sheet_name], entrada["valores"], entrada["versao"]))
+            else:
+                lidas.append(sheet_name)
+        if not lidas:
+            return
+        
+        resposta = spreadsheet.values_batch_get([absolute_range_name(abas[nome].title) for nome in lidas])
+        for sheet_name, value_range in zip(lidas, resposta.get("valueRanges", [])):
+            data = fill_gaps(value_range.get("values", []))
+            versao = publicar_cache(sheet_name, data)
+            agendar_sincronizacao(sheet_name, data)
+            futuros[sheet_name].set_result((abas[sheet_name], data, versao))
+    except Exception as e:
+        for futuro in futuros.values():
+            if not futuro.done():
+                futuro.set_exception(e)
+
+def _finalizar(sheet_name, futuro):
+    """
+    Remove o carregamento concluído da lista de carregamentos em andamento.
+
+    Args:
+        sheet_name: Nome da planilha
+        futuro: Future concluído
+    """
+    with _lock:
+        if _futuros.get(sheet_name) is futuro:
+            del _futuros[sheet_name]
+
+def iniciar_carregamento(spreadsheet, sheet_names, worksheets=None):
+    """
+    Dispara o carregamento concorrente das planilhas informadas.
+
+    Planilhas que já estão sendo carregadas reaproveitam o carregamento em
+    andamento em vez de gerar uma nova requisição.
+
+    Args:
+        spreadsheet: Planilha conectada
+        sheet_names: Lista com os nomes das abas
+        worksheets: Dicionário opcional nome -> aba já aberta
+
+    Returns:
+        dict: Dicionário nome -> Future com o resultado de cada carregamento
+    """
+    worksheets = worksheets or {}
+    futuros = {}
+    with _lock:
+        for sheet_name in sheet_names:
+            futuro = _futuros.get(sheet_name)
+            if futuro is None:
+                futuro = _executor.submit(_carregar, spreadsheet, sheet_name, worksheets.get(sheet_name))
+                _futuros[sheet_name] = futuro
+                futuro.add_done_callback(lambda f, nome=sheet_name: _finalizar(nome, f))
+            futuros[sheet_name] = futuro
+    return futuros
+
+def iniciar_carregamento_em_lote(spreadsheet, sheet_names):
+    """
+    Dispara, em segundo plano, uma única requisição values:batchGet para as planilhas informadas.
+
+    Cada planilha recebe seu próprio Future, de modo que carregamento_em_andamento
+    e quem aguarda uma planilha específica funcionam como no carregamento individual.
+
+    Args:
+        spreadsheet: Planilha conectada
+        sheet_names: Lista com os nomes das abas
+
+    Returns:
+        dict: Dicionário nome -> Future com o resultado de cada carregamento
+    """
+    futuros = {}
+    novos = {}
+    with _lock:
+        for sheet_name in sheet_names:
+            futuro = _futuros.get(sheet_name)
+            if futuro is None:
+                futuro = Future()
+                _futuros[sheet_name] = futuro
+                futuro.add_done_callback(lambda f, nome=sheet_name: _finalizar(nome, f))
+                novos[sheet_name] = futuro
+            futuros[sheet_name] = futuro
+        if novos:
+            _executor.submit(_carregar_lote, spreadsheet, novos)
+    return futuros
+
+def carregamento_em_andamento(sheet_name):
+    """
+    Retorna o carregamento em andamento de uma planilha, se houver.
+
+    Args:
+        sheet_name: Nome da planilha
+
+    Returns:
+        concurrent.futures.Future: Carregamento em andamento ou None
+    """
+    with _lock:
+        return _futuros.get(sheet_name)
@@ -0,0 +1,98 @@
+"""
+Matriz de produtividade dos funcionários.
+
+As quatro colunas Responsável* dos projetos são empilhadas (melt) em uma tabela
+longa com uma linha por projeto e disciplina, e um único groupby soma o m² e o
+valor a receber (pelas taxas de FUNCIONARIOS) por funcionário, mês e
+disciplina. A matriz é construída uma vez por versão dos projetos; qualquer
+intervalo de meses é consultado sobre ela, sem percorrer os projetos de novo.
+"""
+import pandas as pd
+from utils.config import FUNCIONARIOS, DISCIPLINAS_REMUNERADAS
+
+# Coluna de responsável -> disciplina
+DISCIPLINAS = {
+    "ResponsávelElétrico": "Elétrico",
+    "ResponsávelHidráulico": "Hidráulico",
+    "ResponsávelModelagem": "Modelagem",
+    "ResponsávelDetalhamento": "Detalhamento",
+}
+
+COLUNAS_MATRIZ = ["Funcionário", "MesAno", "Disciplina", "m2", "Valor", "Projetos"]
+
+def construir_matriz_produtividade(df_projetos):
+    """
+    Agrega o m² e o valor a receber por funcionário, mês (DataInicio) e disciplina.
+
+    Args:
+        df_projetos: DataFrame tipado dos projetos
+
+    Returns:
+        pandas.DataFrame: Colunas ["Funcionário", "MesAno", "Disciplina", "m2", "Valor", "Projetos"]
+    """
+    colunas = [coluna for coluna in DISCIPLINAS if coluna in df_projetos.columns]
+    if not colunas or "DataInicio" not in df_projetos.columns:
+        return pd.DataFrame(columns=COLUNAS_MATRIZ)
+
+    # Sem alterar o DataFrame recebido (compartilhado entre sessões)
+    base = df_projetos[colunas].astype(object)
+    base["MesAno"] = df_projetos["DataInicio"].dt.to_period("M").dt.to_timestamp()
+    base["m2"] = df_projetos["m2"].astype("float64").fillna(0.0) if "m2" in df_projetos.columns else 0.0
+
+    longa = base.melt(id_vars=["MesAno", "m2"], value_vars=colunas, var_name="Disciplina", value_name="Funcionário")
+    longa = longa[longa["Funcionário"].notna() & (longa["Funcionário"] != "") & longa["MesAno"].notna()]
+    longa["Disciplina"] = longa["Disciplina"].map(DISCIPLINAS)
+
+    # Só as disciplinas remuneradas por m² geram valor a receber
+    taxa = longa["Funcionário"].map(FUNCIONARIOS).astype("float64").fillna(0.0)
+    longa["Valor"] = longa["m2"] * taxa.where(longa["Disciplina"].isin(DISCIPLINAS_REMUNERADAS), 0.0)
+
+    return (
+        longa.groupby(["Funcionário", "MesAno", "Disciplina"], sort=True)
+        .agg(m2=("m2", "sum"), Valor=("Valor", "sum"), Projetos=("m2", "size"))
+        .reset_index()[COLUNAS_MATRIZ]
+    )
+
+def combinar_matrizes(matriz, matriz_nova):
+    """
+    Soma a matriz das linhas recém-adicionadas a uma matriz existente.
+
+    Args:
+        matriz: Matriz existente
+        matriz_nova: Matriz com os novos projetos
+
+    Returns:
+        pandas.DataFrame: Nova matriz com as células combinadas
+    """
+    return (
+        pd.concat([matriz, matriz_nova], ignore_index=True)
+        .groupby(["Funcionário", "MesAno", "Disciplina"], sort=True)[["m2", "Valor", "Projetos"]]
+        .sum()
+        .reset_index()[COLUNAS_MATRIZ]
+    )
+
+def consultar_produtividade(matriz, inicio, fim, disciplinas=None):
+    """
+    Totaliza a produtividade de cada funcionário de FUNCIONARIOS em um intervalo de meses.
+
+    Args:
+        matriz: Matriz de produtividade
+        inicio: Primeiro mês do intervalo (pandas.Timestamp do dia 1)
+        fim: Último mês do intervalo (pandas.Timestamp do dia 1)
+        disciplinas: Disciplinas consideradas (padrão: DISCIPLINAS_REMUNERADAS)
+
+    Returns:
+        pandas.DataFrame: Colunas ["Funcionário", "m2", "Valor"], uma linha por funcionário
+    """
+    disciplinas = DISCIPLINAS_REMUNERADAS if disciplinas is None else disciplinas
+    celulas = matriz[
+        matriz["MesAno"].between(inicio, fim)
+        & matriz["Disciplina"].isin(disciplinas)
+        & matriz["Funcionário"].isin(list(FUNCIONARIOS))
+    ]
+    return (
+        celulas.groupby("Funcionário")[["m2", "Valor"]].sum()
+        .reindex(list(FUNCIONARIOS), fill_value=0.0)
+        .rename_axis("Funcionário")
+        .reset_index()
+    )
@@ -0,0 +1,55 @@
+"""
+Conversão dos dados carregados (todos em texto) para colunas tipadas.
+"""
+import pandas as pd
+from utils.config import TIPOS_COLUNAS
+from utils.data_utils import converter_serie_para_numero, normalizar_datas
+
+def converter_coluna(serie, tipo):
+    """
+    Converte uma coluna de texto para o tipo indicado no esquema.
+    
+    Args:
+        serie: pandas.Series com os valores em texto
+        tipo: "data", "moeda", "numero" ou "categoria"
+    
+    Returns:
+        pandas.Series: Série convertida (datetime64, float64 ou category)
+    """
+    if tipo == "data":
+        return normalizar_datas(serie)
+    if tipo in ("moeda", "numero"):
+        if pd.api.types.is_float_dtype(serie):
+            return serie
+        numeros, _ = converter_serie_para_numero(serie)
+        return numeros
+    if tipo == "categoria":
+        return serie.astype("category")
+    return serie
+
+def aplicar_tipos(df, sheet_name):
+    """
+    Gera uma cópia tipada do DataFrame de acordo com TIPOS_COLUNAS.
+    
+    Args:
+        df: DataFrame com os dados em texto
+        sheet_name: Nome da planilha
+    
+    Returns:
+        pandas.DataFrame: Novo DataFrame com as colunas convertidas
+    """
+    df_tipado = df.copy()
+    erros_conversao = {}
+    for coluna, tipo in TIPOS_COLUNAS.get(sheet_name, {}).items():
+        if coluna not in df_tipado.columns:
+            continue
+        if tipo in ("moeda", "numero") and not pd.api.types.is_float_dtype(df_tipado[coluna]):
+            df_tipado[coluna], erros = converter_serie_para_numero(df_tipado[coluna])
+            if erros.any():
+                erros_conversao[coluna] = int(erros.sum())
+        else:
+            df_tipado[coluna] = converter_coluna(df_tipado[coluna], tipo)
+    
+    # Quantidade de valores que não puderam ser convertidos, por coluna
+    df_tipado.attrs["erros_conversao"] = erros_conversao
+    return df_tipado
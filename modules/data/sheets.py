@@ -1,11 +1,43 @@
 import time
+import uuid
 import streamlit as st
 import pandas as pd
-import gspread
+from gspread.utils import absolute_range_name, fill_gaps
 from google.oauth2 import service_account
-from random import uniform
-from utils.config import SHEET_ID, SHEET_GIDS, COLUNAS_ESPERADAS
-from utils.data_utils import preparar_dados_para_sheets, converter_para_string_segura
+from concurrent.futures import as_completed
+from utils.config import SHEET_ID, SHEET_GIDS, COLUNAS_ESPERADAS, COLUNA_ID
+from utils.data_utils import preparar_dados_para_sheets, converter_para_string_segura, dataframe_para_valores_sheets
+from modules.data.cache import (
+    obter_cache_compartilhado, cache_valido, versao_cache, publicar_cache,
+    atualizar_cache, invalidar_cache, obter_derivado, guardar_derivado
+)
+from modules.data.schema import aplicar_tipos
+from modules.data.cubo import construir_cubo, combinar_cubos
+from modules.data.indices import construir_indice, estender_indice
+from modules.data.produtividade import construir_matriz_produtividade, combinar_matrizes
+from modules.data.busca import COLUNAS_BUSCA, construir_indice_textual, estender_indice_textual
+from modules.data.loader import iniciar_carregamento, iniciar_carregamento_em_lote, carregamento_em_andamento
+from modules.data.espelho import ler_espelho, agendar_sincronizacao
+from modules.data.fila import definir_conexao, enfileirar_anexacao, enfileirar_substituicao, enfileirar_operacoes_por_id
+from modules.data.conexao import obter_planilha, obter_aba, descartar_conexoes
+
+# Prefixo dos identificadores provisórios de linhas que ainda não têm COLUNA_ID na planilha
+_PREFIXO_PROVISORIO = "~"
+
+# Dados derivados de cada planilha: como construí-los a partir do DataFrame tipado
+# e como estendê-los com as linhas recém-adicionadas
+_CONSTRUTORES = {
+    "cubo": construir_cubo,
+    "indice": construir_indice,
+    "indice_textual": lambda df, sheet_name: construir_indice_textual(df, COLUNAS_BUSCA[sheet_name]),
+    "matriz": lambda df, sheet_name: construir_matriz_produtividade(df),
+}
+_EXTENSOES = {
+    "cubo": lambda cubo, novas, sheet_name: combinar_cubos(cubo, construir_cubo(novas, sheet_name)),
+    "indice": estender_indice,
+    "indice_textual": lambda indice, novas, sheet_name: estender_indice_textual(indice, novas),
+    "matriz": lambda matriz, novas, sheet_name: combinar_matrizes(matriz, construir_matriz_produtividade(novas)),
+}
 
 def conectar_sheets(force_reconnect=False):
     """
@@ -21,6 +53,11 @@ def conectar_sheets(force_reconnect=False):
     if not force_reconnect and st.session_state.spreadsheet is not None:
         return st.session_state.spreadsheet
     
+    # Uma reconexão forçada também descarta o cliente e os metadados compartilhados
+    if force_reconnect:
+        descartar_conexoes()
+        st.session_state.worksheets_cache = {}
+    
     try:
         # Tenta carregar as credenciais do arquivo de secrets
         credentials = service_account.Credentials.from_service_account_info(
@@ -31,16 +68,17 @@ def conectar_sheets(force_reconnect=False):
             ],
         )
         
-        # Conecta ao serviço do Google Sheets
-        gc = gspread.authorize(credentials)
-        
-        # Abre a planilha pelo ID
+        # Abre a planilha pelo ID com o cliente compartilhado pelo processo
+        # (pool de conexões mantidas abertas e requisições passando pelo agendador de cotas)
         sheet_id = st.secrets.get("sheet_id", SHEET_ID)
-        spreadsheet = gc.open_by_key(sheet_id)
+        spreadsheet = obter_planilha(credentials, sheet_id)
         
         # Armazena a planilha no estado da sessão
         st.session_state.spreadsheet = spreadsheet
         
+        # A fila de gravações em segundo plano usa a conexão mais recente
+        definir_conexao(spreadsheet)
+        
         return spreadsheet
     
     except Exception as e:
@@ -49,8 +87,7 @@ def conectar_sheets(force_reconnect=False):
         try:
             if "sheet_id" in st.secrets and st.secrets["sheet_id"] != SHEET_ID:
                 # Tenta com o ID padrão
-                gc = gspread.authorize(credentials)
-                spreadsheet = gc.open_by_key(SHEET_ID)
+                spreadsheet = obter_planilha(credentials, SHEET_ID)
                 st.session_state.spreadsheet = spreadsheet
                 return spreadsheet
         except:
@@ -58,6 +95,86 @@ def conectar_sheets(force_reconnect=False):
         
         return None
 
+def _obter_snapshot(sheet_name):
+    """
+    Retorna os valores brutos da planilha no último carregamento ou gravação.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        list: Lista de listas (cabeçalho + linhas) ou None se não houver snapshot
+    """
+    return st.session_state.get("sheets_snapshot", {}).get(sheet_name)
+
+def _salvar_snapshot(sheet_name, valores):
+    """
+    Guarda os valores brutos da planilha para comparação na próxima gravação.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas) como estão no Google Sheets
+    """
+    if "sheets_snapshot" not in st.session_state:
+        st.session_state.sheets_snapshot = {}
+    st.session_state.sheets_snapshot[sheet_name] = [list(linha) for linha in valores]
+    
+    # O índice de identificadores é reconstruído a partir do novo snapshot quando for consultado
+    st.session_state.get("sheets_ids", {}).pop(sheet_name, None)
+    
+    # O cabeçalho lido da planilha passa a ser o esquema conhecido
+    if valores:
+        if "sheets_schema" not in st.session_state:
+            st.session_state.sheets_schema = {}
+        st.session_state.sheets_schema[sheet_name] = list(valores[0])
+
+def _obter_cabecalho(sheet_name, nova_linha=None):
+    """
+    Retorna o cabeçalho da planilha a partir do cache de esquema local.
+    
+    O cache é alimentado a cada carregamento ou gravação; antes disso usa
+    COLUNAS_ESPERADAS e, em último caso, as chaves da nova linha.
+    
+    Args:
+        sheet_name: Nome da planilha
+        nova_linha: Dicionário com os dados da linha a ser adicionada
+    
+    Returns:
+        list: Lista com os nomes das colunas
+    """
+    schema = st.session_state.get("sheets_schema", {})
+    if sheet_name in schema:
+        return list(schema[sheet_name])
+    if sheet_name in COLUNAS_ESPERADAS:
+        return list(COLUNAS_ESPERADAS[sheet_name])
+    return list(nova_linha.keys()) if nova_linha else []
+
+def _anexar_ao_cache(sheet_name, headers, linhas):
+    """
+    Acrescenta linhas já gravadas no Google Sheets ao snapshot e ao DataFrame em cache.
+    
+    Args:
+        sheet_name: Nome da planilha
+        headers: Cabeçalho usado para montar as linhas
+        linhas: Lista de listas com os valores gravados
+    """
+    # Mantém o snapshot alinhado com a planilha para as gravações incrementais
+    snapshot = _obter_snapshot(sheet_name)
+    if snapshot:
+        snapshot.extend(list(linha) for linha in linhas)
+        st.session_state.get("sheets_ids", {}).pop(sheet_name, None)
+    
+    # Só atualiza o DataFrame se ele já foi carregado; caso contrário o próximo carregamento o trará completo
+    df = st.session_state.local_data.get(sheet_name)
+    if df is None or (df.empty and len(df.columns) == 0):
+        return
+    
+    novas = pd.DataFrame(linhas, columns=headers)
+    for col in df.columns:
+        if col not in novas.columns:
+            novas[col] = ""
+    st.session_state.local_data[sheet_name] = pd.concat([df, novas[df.columns]], ignore_index=True)
+
 def carregar_dados_sheets(sheet_name, force_reload=False):
     """
     Carrega dados de uma planilha específica do Google Sheets.
@@ -70,61 +187,281 @@ def carregar_dados_sheets(sheet_name, force_reload=False):
         pandas.DataFrame: DataFrame com os dados carregados
     """
     # Verifica se já temos os dados em cache e não estamos forçando recarregamento
-    if not force_reload and sheet_name in st.session_state.local_data and not st.session_state.local_data[sheet_name].empty:
+    if not force_reload and _cache_local_valido(sheet_name):
         return st.session_state.local_data[sheet_name]
     
+    # Reaproveita o snapshot carregado por outra sessão, se ainda estiver válido
+    if not force_reload:
+        entrada = obter_cache_compartilhado(sheet_name)
+        if entrada is not None:
+            return _publicar_na_sessao(sheet_name, entrada["valores"], entrada["versao"])
+    
+    # Sem dados em memória, serve o espelho local (sem esperar pela rede) e sincroniza
+    # com a planilha em segundo plano
+    if not force_reload:
+        df = _servir_do_espelho(sheet_name)
+        if df is not None:
+            _sincronizar_em_segundo_plano([sheet_name])
+            return df
+    
+    # Se a planilha já está sendo carregada em segundo plano, aguarda esse carregamento
+    futuro = carregamento_em_andamento(sheet_name)
+    if futuro is not None:
+        try:
+            worksheet, data, versao = futuro.result()
+            st.session_state.worksheets_cache[sheet_name] = worksheet
+            return _publicar_na_sessao(sheet_name, data, versao)
+        except Exception:
+            # Em caso de falha, tenta novamente de forma síncrona
+            pass
+    
     # Tenta carregar os dados do Google Sheets
     try:
-        # Conecta ao Google Sheets
-        spreadsheet = conectar_sheets()
-        if spreadsheet is None:
-            st.error("Não foi possível conectar ao Google Sheets.")
+        # Abre a aba (do cache da sessão ou pelo nome/ID, com os metadados compartilhados pelo processo)
+        worksheet = _aba_para_gravacao(sheet_name)
+        if worksheet is None:
             return pd.DataFrame()
         
-        # Verifica se a planilha está em cache
-        if sheet_name in st.session_state.worksheets_cache:
-            worksheet = st.session_state.worksheets_cache[sheet_name]
-        else:
-            # Tenta abrir a planilha pelo nome
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except:
-                # Se falhar, tenta abrir pelo ID (gid)
-                if sheet_name in SHEET_GIDS:
-                    worksheet = spreadsheet.get_worksheet_by_id(int(SHEET_GIDS[sheet_name]))
-                else:
-                    st.error(f"Planilha '{sheet_name}' não encontrada.")
-                    return pd.DataFrame()
-            
-            # Armazena a planilha em cache
-            st.session_state.worksheets_cache[sheet_name] = worksheet
-        
         # Obtém todos os valores da planilha
         data = worksheet.get_all_values()
         
-        # Verifica se há dados
-        if not data:
-            return pd.DataFrame(columns=COLUNAS_ESPERADAS.get(sheet_name, []))
-        
-        # Cria um DataFrame com os dados
-        headers = data[0]
-        df = pd.DataFrame(data[1:], columns=headers)
-        
-        # Verifica se as colunas esperadas estão presentes
-        if sheet_name in COLUNAS_ESPERADAS:
-            missing_cols = [col for col in COLUNAS_ESPERADAS[sheet_name] if col not in df.columns]
-            for col in missing_cols:
-                df[col] = ""
-        
-        # Armazena os dados em cache
-        st.session_state.local_data[sheet_name] = df
-        
-        return df
+        # Publica os valores para as demais sessões e monta o DataFrame desta sessão
+        versao = publicar_cache(sheet_name, data)
+        agendar_sincronizacao(sheet_name, data)
+        return _publicar_na_sessao(sheet_name, data, versao)
     
     except Exception as e:
         st.error(f"Erro ao carregar dados da planilha '{sheet_name}': {e}")
         return pd.DataFrame()
 
+def _servir_do_espelho(sheet_name):
+    """
+    Monta o DataFrame desta sessão a partir do espelho local, somente para leitura.
+    
+    Os valores do espelho podem estar defasados: não são publicados no cache
+    compartilhado e a sessão os marca como servidos pelo espelho, o que faz
+    as gravações esperarem (ou recusarem) até a planilha chegar. A versão é
+    uma marca própria do espelho, para que os dados derivados não se
+    confundam com os da planilha.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        pandas.DataFrame: DataFrame com os dados do espelho ou None se não houver espelho
+    """
+    espelho = ler_espelho(sheet_name)
+    if espelho is None:
+        return None
+    
+    data, sincronizado_em = espelho
+    df = _publicar_na_sessao(sheet_name, data, f"espelho:{sincronizado_em}")
+    if "sheets_espelho" not in st.session_state:
+        st.session_state.sheets_espelho = set()
+    st.session_state.sheets_espelho.add(sheet_name)
+    return df
+
+def _sincronizar_em_segundo_plano(sheet_names):
+    """
+    Busca em segundo plano, com uma única requisição em lote, as planilhas servidas pelo espelho.
+    
+    Quando a planilha chega, a versão publicada substitui a do espelho na próxima leitura.
+    
+    Args:
+        sheet_names: Lista com os nomes das planilhas
+    """
+    if not sheet_names:
+        return
+    spreadsheet = conectar_sheets()
+    if spreadsheet is not None:
+        iniciar_carregamento_em_lote(spreadsheet, sheet_names)
+
+def _servido_pelo_espelho(sheet_name):
+    """
+    Verifica se os dados desta sessão vieram do espelho local e a planilha ainda não chegou.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se os dados da sessão são do espelho
+    """
+    return sheet_name in st.session_state.get("sheets_espelho", set())
+
+def _dados_gravaveis(sheet_name, aguardar=False):
+    """
+    Verifica se os dados da sessão podem servir de base para uma gravação.
+    
+    Dados servidos pelo espelho podem estar defasados e não são usados como
+    base: com `aguardar`, espera a planilha chegar e recarrega os dados; sem
+    ele, a gravação é recusada.
+    
+    Args:
+        sheet_name: Nome da planilha
+        aguardar: Se True, espera o carregamento em segundo plano da planilha
+    
+    Returns:
+        bool: True se a gravação pode prosseguir
+    """
+    if not _servido_pelo_espelho(sheet_name):
+        return True
+    
+    if aguardar:
+        futuro = carregamento_em_andamento(sheet_name)
+        if futuro is not None:
+            try:
+                worksheet, data, versao = futuro.result()
+                st.session_state.worksheets_cache[sheet_name] = worksheet
+                _publicar_na_sessao(sheet_name, data, versao)
+            except Exception:
+                pass
+        if not _servido_pelo_espelho(sheet_name):
+            return True
+    
+    st.error(f"Os dados de '{sheet_name}' ainda estão sendo sincronizados com o Google Sheets. Aguarde alguns segundos e tente novamente.")
+    return False
+
+def _cache_local_valido(sheet_name):
+    """
+    Verifica se o DataFrame desta sessão ainda corresponde à versão compartilhada mais recente.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se o DataFrame em cache pode ser usado sem recarregar
+    """
+    if sheet_name not in st.session_state.local_data or st.session_state.local_data[sheet_name].empty:
+        return False
+    # Dados do espelho valem até a planilha chegar em segundo plano
+    if _servido_pelo_espelho(sheet_name):
+        return carregamento_em_andamento(sheet_name) is not None
+    versao_local = st.session_state.get("sheets_versao", {}).get(sheet_name)
+    if versao_local != versao_cache(sheet_name):
+        return False
+    # Respeita o TTL do cache compartilhado
+    return cache_valido(sheet_name)
+
+def _publicar_na_sessao(sheet_name, data, versao):
+    """
+    Monta o DataFrame a partir dos valores brutos e o armazena no cache da sessão.
+    
+    Args:
+        sheet_name: Nome da planilha
+        data: Lista de listas (cabeçalho + linhas)
+        versao: Versão compartilhada correspondente aos valores
+    
+    Returns:
+        pandas.DataFrame: DataFrame com os dados
+    """
+    # Guarda os valores brutos para gravações incrementais
+    _salvar_snapshot(sheet_name, data)
+    _salvar_versao(sheet_name, versao)
+    st.session_state.get("sheets_espelho", set()).discard(sheet_name)
+    
+    # Verifica se há dados
+    if not data:
+        return pd.DataFrame(columns=COLUNAS_ESPERADAS.get(sheet_name, []))
+    
+    # Cria um DataFrame com os dados
+    headers = data[0]
+    df = pd.DataFrame(data[1:], columns=headers)
+    
+    # Verifica se as colunas esperadas estão presentes
+    if sheet_name in COLUNAS_ESPERADAS:
+        missing_cols = [col for col in COLUNAS_ESPERADAS[sheet_name] if col not in df.columns]
+        for col in missing_cols:
+            df[col] = ""
+    
+    # Armazena os dados em cache
+    st.session_state.local_data[sheet_name] = df
+    
+    return df
+
+def _salvar_versao(sheet_name, versao):
+    """
+    Registra a versão compartilhada dos dados que esta sessão possui.
+    
+    Args:
+        sheet_name: Nome da planilha
+        versao: Versão compartilhada
+    """
+    if "sheets_versao" not in st.session_state:
+        st.session_state.sheets_versao = {}
+    st.session_state.sheets_versao[sheet_name] = versao
+
+def _propagar_gravacao(sheet_name):
+    """
+    Propaga o snapshot desta sessão para o cache compartilhado e o espelho local após uma gravação.
+    
+    Args:
+        sheet_name: Nome da planilha
+    """
+    snapshot = _obter_snapshot(sheet_name)
+    versao_base = st.session_state.get("sheets_versao", {}).get(sheet_name)
+    if snapshot is None or versao_base is None:
+        invalidar_cache(sheet_name)
+        return
+    _salvar_versao(sheet_name, atualizar_cache(sheet_name, snapshot, versao_base))
+    # O espelho é atualizado pela sua própria thread, fora da requisição
+    agendar_sincronizacao(sheet_name, list(snapshot))
+
+def carregar_varias_planilhas(sheet_names, force_reload=False):
+    """
+    Carrega várias planilhas com uma única requisição values:batchGet.
+    
+    Planilhas já válidas no cache (da sessão ou compartilhado) não entram na
+    requisição; se a requisição em lote falhar, cada planilha é carregada individualmente.
+    
+    Args:
+        sheet_names: Lista com os nomes das planilhas
+        force_reload: Se True, busca todas as planilhas no Google Sheets
+    
+    Returns:
+        dict: Dicionário nome -> pandas.DataFrame
+    """
+    # Separa as planilhas que realmente precisam ir à rede
+    pendentes = []
+    for sheet_name in sheet_names:
+        if force_reload:
+            pendentes.append(sheet_name)
+        elif not _cache_local_valido(sheet_name) and not cache_valido(sheet_name) and carregamento_em_andamento(sheet_name) is None:
+            pendentes.append(sheet_name)
+    
+    # Planilhas presentes no espelho local são servidas por ele e sincronizadas em segundo plano,
+    # todas com uma única requisição em lote
+    if not force_reload:
+        espelhadas = [nome for nome in pendentes if _servir_do_espelho(nome) is not None]
+        _sincronizar_em_segundo_plano(espelhadas)
+        pendentes = [nome for nome in pendentes if nome not in espelhadas]
+    
+    if pendentes:
+        try:
+            # Conecta ao Google Sheets
+            spreadsheet = conectar_sheets()
+            if spreadsheet is None:
+                raise ConnectionError("Não foi possível conectar ao Google Sheets.")
+            
+            # Uma única requisição para todas as abas pendentes
+            resposta = spreadsheet.values_batch_get([absolute_range_name(nome) for nome in pendentes])
+            
+            # Separa a resposta em uma lista de valores por aba, na mesma ordem da requisição
+            for sheet_name, value_range in zip(pendentes, resposta.get("valueRanges", [])):
+                data = fill_gaps(value_range.get("values", []))
+                versao = publicar_cache(sheet_name, data)
+                agendar_sincronizacao(sheet_name, data)
+                _publicar_na_sessao(sheet_name, data, versao)
+            pendentes = []
+        except Exception:
+            # Sem a requisição em lote, o carregamento individual abaixo assume
+            pass
+    
+    # Monta o resultado a partir do cache (planilhas que falharam são carregadas individualmente)
+    return {
+        sheet_name: carregar_dados_sheets(sheet_name, force_reload=sheet_name in pendentes)
+        for sheet_name in sheet_names
+    }
+
 def salvar_dados_sheets(df, sheet_name):
     """
     Salva um DataFrame no Google Sheets.
@@ -136,47 +473,32 @@ def salvar_dados_sheets(df, sheet_name):
     Returns:
         bool: True se os dados foram salvos com sucesso, False caso contrário
     """
+    # Dados do espelho podem estar defasados e não servem de base para regravar a planilha
+    if not _dados_gravaveis(sheet_name):
+        return False
+    
     try:
-        # Prepara os dados para serialização segura
-        df_preparado = preparar_dados_para_sheets(df, is_dataframe=True)
-        
-        # Conecta ao Google Sheets
-        spreadsheet = conectar_sheets()
-        if spreadsheet is None:
-            st.error("Não foi possível conectar ao Google Sheets.")
+        # Abre a aba (do cache da sessão ou pelo nome/ID, com os metadados compartilhados pelo processo)
+        worksheet = _aba_para_gravacao(sheet_name)
+        if worksheet is None:
             return False
         
-        # Verifica se a planilha está em cache
-        if sheet_name in st.session_state.worksheets_cache:
-            worksheet = st.session_state.worksheets_cache[sheet_name]
-        else:
-            # Tenta abrir a planilha pelo nome
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except:
-                # Se falhar, tenta abrir pelo ID (gid)
-                if sheet_name in SHEET_GIDS:
-                    worksheet = spreadsheet.get_worksheet_by_id(int(SHEET_GIDS[sheet_name]))
-                else:
-                    st.error(f"Planilha '{sheet_name}' não encontrada.")
-                    return False
-            
-            # Armazena a planilha em cache
-            st.session_state.worksheets_cache[sheet_name] = worksheet
-        
-        # Prepara os dados para salvar
-        headers = df_preparado.columns.tolist()
+        # Serializa o DataFrame coluna a coluna (cabeçalho + linhas como strings)
+        all_values = dataframe_para_valores_sheets(df)
+        headers = all_values[0]
         
-        # Converte todos os valores para string para evitar problemas de serialização
-        values = []
-        for _, row in df_preparado.iterrows():
-            row_values = []
-            for val in row:
-                # Usa a função de conversão segura
-                row_values.append(converter_para_string_segura(val))
-            values.append(row_values)
-        
-        all_values = [headers] + values
+        # Se o snapshot carregado tem o mesmo cabeçalho, enfileira apenas as diferenças
+        # (a gravação segue em segundo plano e a interface não espera a planilha)
+        snapshot = _obter_snapshot(sheet_name)
+        if snapshot and snapshot[0] == headers:
+            if snapshot != all_values:
+                enfileirar_substituicao(sheet_name, worksheet, snapshot, all_values)
+            
+            # Atualiza o snapshot, o cache local e o cache compartilhado
+            _salvar_snapshot(sheet_name, all_values)
+            st.session_state.local_data[sheet_name] = df
+            _propagar_gravacao(sheet_name)
+            return True
         
         # Verifica se a planilha está vazia
         current_data = worksheet.get_all_values()
@@ -190,9 +512,6 @@ def salvar_dados_sheets(df, sheet_name):
                 # Cria um backup dos dados atuais antes de qualquer modificação
                 backup_data = current_data.copy()
                 
-                # Adiciona um pequeno atraso para evitar problemas de rate limit
-                time.sleep(uniform(0.5, 1.0))
-                
                 # Sempre sobrescreve toda a planilha para garantir exclusão correta
                 try:
                     worksheet.clear()
@@ -229,8 +548,10 @@ def salvar_dados_sheets(df, sheet_name):
                 except Exception as e:
                     st.error(f"Erro ao atualizar dados com novos cabeçalhos: {e}")
         
-        # Atualiza o cache local
+        # Atualiza o snapshot, o cache local e o cache compartilhado
+        _salvar_snapshot(sheet_name, all_values)
         st.session_state.local_data[sheet_name] = df
+        _propagar_gravacao(sheet_name)
         
         return True
     
@@ -238,6 +559,29 @@ def salvar_dados_sheets(df, sheet_name):
         st.error(f"Erro ao salvar dados na planilha '{sheet_name}': {e}")
         return False
 
+def _atualizar_derivados(sheet_name, headers, linhas, versao_anterior):
+    """
+    Estende o cubo mensal, os índices invertidos e a matriz de produtividade da versão
+    anterior com as linhas recém-adicionadas, sem reagregar nem reindexar a planilha.
+    
+    Args:
+        sheet_name: Nome da planilha
+        headers: Cabeçalhos da planilha
+        linhas: Linhas adicionadas (listas de valores na ordem dos cabeçalhos)
+        versao_anterior: Versão dos dados antes da gravação
+    """
+    anteriores = {tipo: obter_derivado(tipo, sheet_name, versao_anterior) for tipo in _EXTENSOES}
+    anteriores = {tipo: derivado for tipo, derivado in anteriores.items() if derivado is not None}
+    
+    # Sem estruturas anteriores, ou se outra sessão gravou no meio, elas são reconstruídas na próxima leitura
+    if not anteriores or not cache_valido(sheet_name):
+        return
+    
+    novas = aplicar_tipos(pd.DataFrame(linhas, columns=headers), sheet_name)
+    versao = obter_versao_dados(sheet_name)
+    for tipo, derivado in anteriores.items():
+        guardar_derivado(tipo, sheet_name, versao, _EXTENSOES[tipo](derivado, novas, sheet_name))
+
 def adicionar_linha_sheets(nova_linha, sheet_name):
     """
     Adiciona uma nova linha de dados ao Google Sheets.
@@ -249,74 +593,405 @@ def adicionar_linha_sheets(nova_linha, sheet_name):
     Returns:
         bool: True se os dados foram adicionados com sucesso, False caso contrário
     """
+    return adicionar_linhas_sheets([nova_linha], sheet_name)
+
+def adicionar_linhas_sheets(novas_linhas, sheet_name):
+    """
+    Adiciona várias linhas ao Google Sheets com uma única chamada append_rows.
+    
+    Args:
+        novas_linhas: Lista de dicionários com os dados a serem adicionados
+        sheet_name: Nome da planilha onde os dados serão adicionados
+    
+    Returns:
+        bool: True se os dados foram adicionados com sucesso, False caso contrário
+    """
+    if not novas_linhas:
+        return True
+    
+    # Uma adição não depende dos dados atuais, mas o snapshot local deve ser o da planilha
+    if not _dados_gravaveis(sheet_name, aguardar=True):
+        return False
+    
     try:
         # Prepara os dados para serialização segura
-        nova_linha = preparar_dados_para_sheets(nova_linha, is_dataframe=False)
+        novas_linhas = [preparar_dados_para_sheets(linha, is_dataframe=False) for linha in novas_linhas]
         
-        # Conecta ao Google Sheets
-        spreadsheet = conectar_sheets()
-        if spreadsheet is None:
-            st.error("Não foi possível conectar ao Google Sheets.")
+        # Abre a aba (do cache da sessão ou pelo nome/ID, com os metadados compartilhados pelo processo)
+        worksheet = _aba_para_gravacao(sheet_name)
+        if worksheet is None:
             return False
         
-        # Verifica se a planilha está em cache
-        if sheet_name in st.session_state.worksheets_cache:
-            worksheet = st.session_state.worksheets_cache[sheet_name]
-        else:
-            # Tenta abrir a planilha pelo nome
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-            except:
-                # Se falhar, tenta abrir pelo ID (gid)
-                if sheet_name in SHEET_GIDS:
-                    worksheet = spreadsheet.get_worksheet_by_id(int(SHEET_GIDS[sheet_name]))
-                else:
-                    st.error(f"Planilha '{sheet_name}' não encontrada.")
-                    return False
-            
-            # Armazena a planilha em cache
-            st.session_state.worksheets_cache[sheet_name] = worksheet
+        # Cabeçalho vem do cache de esquema, sem baixar a planilha
+        headers = _obter_cabecalho(sheet_name, novas_linhas[0])
         
-        # Verifica se a planilha está vazia
-        current_data = worksheet.get_all_values()
-        if not current_data:
-            # Se estiver vazia, cria com as colunas esperadas
-            if sheet_name in COLUNAS_ESPERADAS:
-                headers = COLUNAS_ESPERADAS[sheet_name]
-            else:
-                headers = list(nova_linha.keys())
-            
-            # Prepara os valores da nova linha
-            row_values = []
-            for col in headers:
-                val = nova_linha.get(col, "")
-                row_values.append(converter_para_string_segura(val))
-            
-            # Atualiza a planilha com o cabeçalho e a nova linha
-            worksheet.update([headers, row_values])
+        # Em planilhas com identificador, cada linha nova recebe um UUID
+        if COLUNA_ID in headers:
+            novas_linhas = [linha if linha.get(COLUNA_ID) else {**linha, COLUNA_ID: uuid.uuid4().hex} for linha in novas_linhas]
+        
+        # Prepara os valores das novas linhas na ordem correta dos cabeçalhos
+        rows_values = []
+        for linha in novas_linhas:
+            rows_values.append([converter_para_string_segura(linha.get(col, "")) for col in headers])
+        
+        snapshot = _obter_snapshot(sheet_name)
+        if snapshot is not None and not snapshot:
+            # Planilha sabidamente vazia: grava o cabeçalho junto com as novas linhas
+            worksheet.update([headers] + rows_values)
+            _salvar_snapshot(sheet_name, [headers])
         else:
-            # Se não estiver vazia, adiciona a nova linha
-            headers = current_data[0]
-            
-            # Prepara os valores da nova linha na ordem correta dos cabeçalhos
-            row_values = []
-            for col in headers:
-                val = nova_linha.get(col, "")
-                row_values.append(converter_para_string_segura(val))
-            
-            # Adiciona a nova linha ao final da planilha
-            worksheet.append_row(row_values)
+            # Enfileira as novas linhas; a gravação na planilha segue em segundo plano
+            enfileirar_anexacao(sheet_name, worksheet, rows_values)
         
-        # Atualiza o cache local
-        df = carregar_dados_sheets(sheet_name, force_reload=True)
-        st.session_state.local_data[sheet_name] = df
+        # Atualiza o cache local e o compartilhado sem recarregar a planilha
+        versao_anterior = obter_versao_dados(sheet_name)
+        _anexar_ao_cache(sheet_name, headers, rows_values)
+        _propagar_gravacao(sheet_name)
+        _atualizar_derivados(sheet_name, headers, rows_values, versao_anterior)
         
         return True
     
     except Exception as e:
-        st.error(f"Erro ao adicionar linha na planilha '{sheet_name}': {e}")
+        st.error(f"Erro ao adicionar linhas na planilha '{sheet_name}': {e}")
+        return False
+
+def _aba_para_gravacao(sheet_name):
+    """
+    Retorna a aba de uma planilha, usando o cache de abas da sessão.
+    
+    Usada por todos os caminhos que leem ou gravam uma aba; os erros de
+    conexão e de aba inexistente são exibidos aqui.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        gspread.Worksheet: Aba da planilha ou None se não foi possível abri-la
+    """
+    if sheet_name in st.session_state.worksheets_cache:
+        return st.session_state.worksheets_cache[sheet_name]
+    
+    spreadsheet = conectar_sheets()
+    if spreadsheet is None:
+        st.error("Não foi possível conectar ao Google Sheets.")
+        return None
+    
+    try:
+        worksheet = obter_aba(spreadsheet, sheet_name)
+    except ValueError as e:
+        st.error(str(e))
+        return None
+    st.session_state.worksheets_cache[sheet_name] = worksheet
+    return worksheet
+
+def _gravar_valores(sheet_name, valores):
+    """
+    Publica na sessão, no cache compartilhado e no espelho os valores resultantes de uma gravação por identificador.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Lista de listas (cabeçalho + linhas) após a gravação
+    """
+    _publicar_na_sessao(sheet_name, valores, st.session_state.get("sheets_versao", {}).get(sheet_name))
+    _propagar_gravacao(sheet_name)
+
+def _garantir_ids(sheet_name, worksheet):
+    """
+    Garante que a planilha tenha a coluna oculta COLUNA_ID preenchida em todas as linhas.
+    
+    Na primeira vez a coluna é criada após a última coluna e ocultada; linhas
+    sem identificador (adicionadas fora do sistema) recebem um UUID. Só a
+    coluna de identificadores é gravada, e cada identificador só é gravado se
+    a linha ainda tiver o conteúdo visto por esta sessão. Chamada apenas pelos
+    caminhos de gravação.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba da planilha
+    
+    Returns:
+        list: Snapshot (cabeçalho + linhas) com os identificadores, ou lista vazia se a planilha está vazia
+    """
+    snapshot = _obter_snapshot(sheet_name)
+    if snapshot is None:
+        carregar_dados_sheets(sheet_name)
+        snapshot = _obter_snapshot(sheet_name) or []
+    if not snapshot:
+        return snapshot
+    
+    valores = [list(linha) for linha in snapshot]
+    criar_coluna = COLUNA_ID not in valores[0]
+    if criar_coluna:
+        valores[0].append(COLUNA_ID)
+    
+    coluna = valores[0].index(COLUNA_ID)
+    largura = len(valores[0])
+    identificar = []
+    for posicao, linha in enumerate(valores[1:]):
+        if len(linha) < largura:
+            linha.extend([""] * (largura - len(linha)))
+        if not linha[coluna]:
+            identificador = uuid.uuid4().hex
+            identificar.append([posicao, identificador, list(linha)])
+            linha[coluna] = identificador
+    
+    if not criar_coluna and not identificar:
+        return snapshot
+    
+    enfileirar_operacoes_por_id(sheet_name, worksheet, {
+        "coluna": coluna,
+        "largura": largura,
+        "criar_coluna": COLUNA_ID if criar_coluna else None,
+        "identificar": identificar,
+    })
+    _gravar_valores(sheet_name, valores)
+    return _obter_snapshot(sheet_name)
+
+def _preparar_ids(sheet_name, worksheet, ids=()):
+    """
+    Garante os identificadores da planilha e traduz os identificadores provisórios para os definitivos.
+    
+    Args:
+        sheet_name: Nome da planilha
+        worksheet: Aba da planilha
+        ids: Identificadores recebidos da interface (definitivos ou provisórios)
+    
+    Returns:
+        tuple: (snapshot com os identificadores, {provisório: definitivo})
+    
+    Raises:
+        ValueError: Se os dados mudaram desde que os identificadores provisórios foram gerados
+    """
+    versao = str(st.session_state.get("sheets_versao", {}).get(sheet_name))
+    provisorios = [identificador for identificador in ids if isinstance(identificador, str) and identificador.startswith(_PREFIXO_PROVISORIO)]
+    for identificador in provisorios:
+        if identificador[len(_PREFIXO_PROVISORIO):].rsplit(":", 1)[0] != versao:
+            raise ValueError(f"Os dados de '{sheet_name}' foram alterados desde que a tabela foi exibida. Recarregue a página e refaça a edição.")
+    
+    valores = _garantir_ids(sheet_name, worksheet)
+    if not provisorios:
+        return valores, {}
+    
+    coluna = valores[0].index(COLUNA_ID)
+    return valores, {
+        identificador: valores[int(identificador.rsplit(":", 1)[1]) + 1][coluna]
+        for identificador in provisorios
+    }
+
+def _indice_ids(sheet_name, valores):
+    """
+    Retorna o índice identificador -> posição da linha de dados (base 0, sem o cabeçalho) no snapshot da sessão.
+    
+    O índice é mantido na sessão e reconstruído quando o snapshot muda de forma.
+    
+    Args:
+        sheet_name: Nome da planilha
+        valores: Snapshot (cabeçalho + linhas) com a coluna COLUNA_ID
+    
+    Returns:
+        dict: {identificador: posição}
+    """
+    if "sheets_ids" not in st.session_state:
+        st.session_state.sheets_ids = {}
+    indice = st.session_state.sheets_ids.get(sheet_name)
+    if indice is None:
+        coluna = valores[0].index(COLUNA_ID)
+        indice = {linha[coluna]: posicao for posicao, linha in enumerate(valores[1:]) if linha[coluna]}
+        st.session_state.sheets_ids[sheet_name] = indice
+    return indice
+
+def carregar_dados_identificados(sheet_name):
+    """
+    Carrega os dados de uma planilha com a coluna COLUNA_ID preenchida em todas as linhas.
+    
+    Não grava nada: linhas que ainda não têm identificador na planilha recebem
+    um identificador provisório (ligado à versão dos dados e à posição da
+    linha), trocado pelo definitivo na primeira gravação por identificador.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        pandas.DataFrame: DataFrame com os dados e a coluna COLUNA_ID
+    """
+    df = carregar_dados_sob_demanda(sheet_name)
+    ids = df[COLUNA_ID].fillna("").tolist() if COLUNA_ID in df.columns else [""] * len(df)
+    if all(ids):
+        return df
+    
+    versao = st.session_state.get("sheets_versao", {}).get(sheet_name)
+    df = df.copy()
+    df[COLUNA_ID] = [
+        identificador or f"{_PREFIXO_PROVISORIO}{versao}:{posicao}"
+        for posicao, identificador in enumerate(ids)
+    ]
+    return df
+
+def upsert_rows(registros, sheet_name):
+    """
+    Atualiza as linhas identificadas por COLUNA_ID e adiciona as demais.
+    
+    Só as células alteradas são gravadas, de modo que o custo acompanha o
+    tamanho da alteração e não o da planilha. A posição de cada linha na
+    planilha é resolvida pela fila logo antes do envio, lendo a coluna de
+    identificadores. Colunas ausentes de um registro mantêm o valor atual;
+    registros sem identificador, ou com identificador desconhecido, são
+    adicionados ao final.
+    
+    Args:
+        registros: Lista de dicionários {coluna: valor}
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se as gravações foram enfileiradas com sucesso, False caso contrário
+    """
+    if not registros:
+        return True
+    if not _dados_gravaveis(sheet_name):
+        return False
+    
+    try:
+        registros = [preparar_dados_para_sheets(registro, is_dataframe=False) for registro in registros]
+        worksheet = _aba_para_gravacao(sheet_name)
+        if worksheet is None:
+            return False
+        
+        valores, traducao = _preparar_ids(sheet_name, worksheet, [registro.get(COLUNA_ID) for registro in registros])
+        if traducao:
+            registros = [{**registro, COLUNA_ID: traducao.get(registro.get(COLUNA_ID), registro.get(COLUNA_ID))} for registro in registros]
+        
+        if not valores:
+            # Planilha vazia: o cabeçalho é gravado com a coluna de identificadores junto com as linhas
+            headers = _obter_cabecalho(sheet_name, registros[0])
+            if COLUNA_ID not in headers:
+                if "sheets_schema" not in st.session_state:
+                    st.session_state.sheets_schema = {}
+                st.session_state.sheets_schema[sheet_name] = headers + [COLUNA_ID]
+            return adicionar_linhas_sheets(registros, sheet_name)
+        
+        headers = valores[0]
+        indice = _indice_ids(sheet_name, valores)
+        alteracoes = []
+        novos = []
+        for registro in registros:
+            identificador = registro.get(COLUNA_ID, "")
+            posicao = indice.get(identificador)
+            if posicao is None:
+                novos.append(registro)
+                continue
+            antiga = valores[posicao + 1]
+            atual = antiga + [""] * (len(headers) - len(antiga))
+            nova = [converter_para_string_segura(registro[col]) if col in registro else atual[i] for i, col in enumerate(headers)]
+            if nova != antiga:
+                alteracoes.append((posicao, identificador, antiga, nova))
+        
+        if alteracoes:
+            enfileirar_operacoes_por_id(sheet_name, worksheet, {
+                "coluna": headers.index(COLUNA_ID),
+                "largura": len(headers),
+                "atualizar": [[identificador, antiga, nova] for _, identificador, antiga, nova in alteracoes],
+            })
+            valores = list(valores)
+            for posicao, _, _, nova in alteracoes:
+                valores[posicao + 1] = nova
+            _gravar_valores(sheet_name, valores)
+            # As posições não mudaram: o índice continua válido
+            st.session_state.sheets_ids[sheet_name] = indice
+        
+        return adicionar_linhas_sheets(novos, sheet_name)
+    
+    except Exception as e:
+        st.error(f"Erro ao gravar linhas na planilha '{sheet_name}': {e}")
         return False
 
+def delete_rows(ids, sheet_name):
+    """
+    Exclui as linhas com os identificadores informados.
+    
+    A fila resolve as posições lendo a coluna de identificadores logo antes
+    do envio, e cada faixa contígua de linhas vira uma única exclusão, sem
+    regravar o restante da planilha.
+    
+    Args:
+        ids: Identificadores (COLUNA_ID) das linhas a excluir
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se as exclusões foram enfileiradas com sucesso, False caso contrário
+    """
+    ids = [identificador for identificador in ids if identificador]
+    if not ids:
+        return True
+    if not _dados_gravaveis(sheet_name):
+        return False
+    
+    try:
+        worksheet = _aba_para_gravacao(sheet_name)
+        if worksheet is None:
+            return False
+        
+        valores, traducao = _preparar_ids(sheet_name, worksheet, ids)
+        if not valores:
+            return True
+        
+        indice = _indice_ids(sheet_name, valores)
+        ids = [traducao.get(identificador, identificador) for identificador in ids]
+        posicoes = {indice[identificador] for identificador in ids if identificador in indice}
+        if not posicoes:
+            return True
+        
+        enfileirar_operacoes_por_id(sheet_name, worksheet, {
+            "coluna": valores[0].index(COLUNA_ID),
+            "largura": len(valores[0]),
+            "excluir": [identificador for identificador in ids if identificador in indice],
+        })
+        _gravar_valores(sheet_name, [valores[0]] + [linha for posicao, linha in enumerate(valores[1:]) if posicao not in posicoes])
+        return True
+    
+    except Exception as e:
+        st.error(f"Erro ao excluir linhas da planilha '{sheet_name}': {e}")
+        return False
+
+def sincronizar_edicoes(df_original, df_editado, sheet_name):
+    """
+    Grava as edições feitas em um st.data_editor por identificador de linha.
+    
+    Linhas que sumiram do editor são excluídas; as demais passam por
+    upsert_rows, que grava só as alteradas e adiciona as novas.
+    
+    Args:
+        df_original: DataFrame exibido no editor (de carregar_dados_identificados)
+        df_editado: DataFrame retornado pelo editor
+        sheet_name: Nome da planilha
+    
+    Returns:
+        bool: True se as gravações foram enfileiradas com sucesso, False caso contrário
+    """
+    ids_originais = set(df_original[COLUNA_ID].dropna()) if COLUNA_ID in df_original.columns else set()
+    ids_editados = set(df_editado[COLUNA_ID].dropna()) if COLUNA_ID in df_editado.columns else set()
+    if not _dados_gravaveis(sheet_name):
+        return False
+    
+    worksheet = _aba_para_gravacao(sheet_name)
+    if worksheet is None:
+        return False
+    
+    # Os identificadores provisórios são traduzidos uma única vez, antes de qualquer gravação
+    try:
+        _, traducao = _preparar_ids(sheet_name, worksheet, ids_originais | ids_editados)
+    except ValueError as e:
+        st.error(str(e))
+        return False
+    
+    valores = dataframe_para_valores_sheets(df_editado)
+    registros = [dict(zip(valores[0], linha)) for linha in valores[1:]]
+    for registro in registros:
+        if registro.get(COLUNA_ID) in traducao:
+            registro[COLUNA_ID] = traducao[registro[COLUNA_ID]]
+    
+    removidos = [traducao.get(identificador, identificador) for identificador in ids_originais - ids_editados]
+    return delete_rows(removidos, sheet_name) and upsert_rows(registros, sheet_name)
+
 def carregar_dados_sob_demanda(sheet_name, force_reload=False):
     """
     Carrega dados de uma planilha específica apenas quando necessário.
@@ -329,7 +1004,7 @@ def carregar_dados_sob_demanda(sheet_name, force_reload=False):
         pandas.DataFrame: DataFrame com os dados carregados
     """
     # Verifica se já temos os dados em cache e não estamos forçando recarregamento
-    if not force_reload and sheet_name in st.session_state.local_data and not st.session_state.local_data[sheet_name].empty:
+    if not force_reload and _cache_local_valido(sheet_name):
         return st.session_state.local_data[sheet_name]
     
     # Se não temos os dados em cache ou estamos forçando recarregamento, carrega do Google Sheets
@@ -340,17 +1015,142 @@ def carregar_dados_sob_demanda(sheet_name, force_reload=False):
     
     return df
 
-def carregar_dados_iniciais():
+def obter_versao_dados(sheet_name):
     """
-    Carrega dados iniciais (chamada após login bem-sucedido).
+    Retorna a versão dos dados de uma planilha que a sessão atual está usando.
+    
+    Args:
+        sheet_name: Nome da planilha
+    
+    Returns:
+        int: Versão dos dados ou None se a planilha ainda não foi carregada
+    """
+    return st.session_state.get("sheets_versao", {}).get(sheet_name)
+
+def carregar_dados_tipados(sheet_name):
     """
-    # Lista de planilhas a serem carregadas inicialmente
-    planilhas_iniciais = ["Receitas", "Despesas", "Projetos"]
+    Carrega uma planilha com as colunas já convertidas (datas, valores e categorias).
     
-    # Carrega cada planilha
-    for sheet_name in planilhas_iniciais:
-        df = carregar_dados_sheets(sheet_name)
-        st.session_state.local_data[sheet_name] = df
+    A conversão acontece uma única vez por versão dos dados e o resultado é
+    compartilhado entre as sessões. O DataFrame retornado não deve ser
+    modificado; use .copy() antes de alterá-lo.
+    
+    Args:
+        sheet_name: Nome da planilha a ser carregada
+    
+    Returns:
+        pandas.DataFrame: DataFrame tipado
+    """
+    df = carregar_dados_sob_demanda(sheet_name)
+    versao = obter_versao_dados(sheet_name)
+    if versao is None:
+        return aplicar_tipos(df, sheet_name)
+    
+    df_tipado = obter_derivado("tipado", sheet_name, versao)
+    if df_tipado is None:
+        df_tipado = aplicar_tipos(df, sheet_name)
+        guardar_derivado("tipado", sheet_name, versao, df_tipado)
+    return df_tipado
+
+def carregar_derivado(tipo, sheet_name):
+    """
+    Carrega um dado derivado de uma planilha, construído a partir do DataFrame tipado.
+    
+    O dado é construído uma única vez por versão dos dados e estendido
+    quando novas linhas são adicionadas. Os tipos são:
+    
+    - "cubo": cubo mensal pré-agregado ("Receitas" ou "Despesas")
+    - "indice": índice invertido das colunas de filtro (PLANILHAS_INDEXADAS)
+    - "indice_textual": índice de busca das colunas de COLUNAS_BUSCA; suas
+      linhas correspondem às posições do DataFrame de carregar_dados_tipados
+    - "matriz": matriz de produtividade por funcionário, mês e disciplina ("Projetos")
+    
+    Args:
+        tipo: Tipo do dado derivado
+        sheet_name: Nome da planilha
+    
+    Returns:
+        object: Dado derivado (não deve ser modificado)
+    """
+    df_tipado = carregar_dados_tipados(sheet_name)
+    versao = obter_versao_dados(sheet_name)
+    construir = _CONSTRUTORES[tipo]
+    if versao is None:
+        return construir(df_tipado, sheet_name)
+    
+    derivado = obter_derivado(tipo, sheet_name, versao)
+    if derivado is None:
+        derivado = construir(df_tipado, sheet_name)
+        guardar_derivado(tipo, sheet_name, versao, derivado)
+    return derivado
+
+# Planilhas necessárias logo após o login
+PLANILHAS_INICIAIS = ["Receitas", "Despesas", "Projetos"]
+
+def carregar_planilhas_em_paralelo(sheet_names, aguardar=True):
+    """
+    Carrega várias planilhas simultaneamente com um pool de threads limitado.
+    
+    Cada DataFrame é publicado no cache da sessão assim que sua planilha chega,
+    sem esperar pelas demais.
+    
+    Args:
+        sheet_names: Lista com os nomes das planilhas
+        aguardar: Se False, apenas dispara os carregamentos e retorna imediatamente
+    """
+    # Planilhas ainda válidas no cache compartilhado não precisam ir à rede
+    pendentes = [nome for nome in sheet_names if not cache_valido(nome)]
+    
+    # Se for preciso aguardar, as planilhas presentes no espelho local são servidas por ele
+    # (a sincronização com a planilha continua em segundo plano, em uma única requisição)
+    if aguardar:
+        espelhadas = [nome for nome in pendentes if _servir_do_espelho(nome) is not None]
+        _sincronizar_em_segundo_plano(espelhadas)
+        pendentes = [nome for nome in pendentes if nome not in espelhadas]
+    
+    futuros = {}
+    if pendentes:
+        spreadsheet = conectar_sheets()
+        if spreadsheet is None:
+            st.error("Não foi possível conectar ao Google Sheets.")
+            return
+        
+        # Sem aguardar, todas as planilhas vão em uma única requisição em lote
+        if not aguardar:
+            iniciar_carregamento_em_lote(spreadsheet, pendentes)
+            return
+        futuros = iniciar_carregamento(spreadsheet, pendentes, st.session_state.worksheets_cache)
+    
+    if not aguardar:
+        return
+    
+    # Publica cada planilha na sessão à medida que ela chega
+    nomes_por_futuro = {futuro: nome for nome, futuro in futuros.items()}
+    for futuro in as_completed(nomes_por_futuro):
+        sheet_name = nomes_por_futuro[futuro]
+        try:
+            worksheet, data, versao = futuro.result()
+            st.session_state.worksheets_cache[sheet_name] = worksheet
+            _publicar_na_sessao(sheet_name, data, versao)
+        except Exception as e:
+            st.error(f"Erro ao carregar dados da planilha '{sheet_name}': {e}")
+    
+    # As planilhas que já estavam no cache compartilhado são montadas diretamente
+    for sheet_name in sheet_names:
+        if sheet_name not in futuros:
+            carregar_dados_sheets(sheet_name)
+
+def carregar_dados_iniciais():
+    """
+    Dispara o carregamento das planilhas (chamada após login bem-sucedido).
+    
+    Nada é aguardado aqui: cada página espera apenas pelas planilhas que usa
+    (carregar_dados_sob_demanda), servidas pelo espelho local quando houver,
+    e os cubos e índices são construídos na primeira consulta de cada página.
+    """
+    # As planilhas iniciais vão em um lote próprio, para chegarem antes das demais
+    carregar_planilhas_em_paralelo(PLANILHAS_INICIAIS, aguardar=False)
+    carregar_dados_background()
     
     # Marca que os dados foram carregados
     st.session_state.dados_carregados = True
@@ -359,13 +1159,9 @@ def carregar_dados_background():
     """
     Carrega dados em segundo plano.
     """
-    # Lista de planilhas a serem carregadas em segundo plano
-    planilhas_background = ["Categorias_Receitas", "Categorias_Despesas", "Fornecedor_Despesas", "Clientes"]
-    
-    # Carrega cada planilha
-    for sheet_name in planilhas_background:
-        df = carregar_dados_sheets(sheet_name)
-        st.session_state.local_data[sheet_name] = df
+    # Planilhas já em carregamento (por exemplo, as servidas pelo espelho) não são pedidas de novo
+    pendentes = [nome for nome in SHEET_GIDS if not _cache_local_valido(nome) and carregamento_em_andamento(nome) is None]
+    carregar_planilhas_em_paralelo(pendentes, aguardar=False)
 
 def verificar_estrutura_planilha(sheet_name):
     """
@@ -378,18 +1174,21 @@ def verificar_estrutura_planilha(sheet_name):
         bool: True se a estrutura está correta ou foi restaurada, False caso contrário
     """
     try:
-        # Carrega os dados da planilha
-        df = carregar_dados_sheets(sheet_name, force_reload=True)
+        # Carrega os dados da planilha (usa o cache compartilhado se ainda estiver válido)
+        df = carregar_dados_sheets(sheet_name)
         
         # Verifica se a planilha está vazia ou não tem as colunas esperadas
         if df.empty or not all(col in df.columns for col in COLUNAS_ESPERADAS.get(sheet_name, [])):
-            # Cria um DataFrame vazio com as colunas esperadas
-            df_novo = pd.DataFrame(columns=COLUNAS_ESPERADAS.get(sheet_name, []))
+            # Cria um DataFrame vazio com as colunas esperadas (e os identificadores, se a planilha os tem)
+            colunas = list(COLUNAS_ESPERADAS.get(sheet_name, []))
+            if COLUNA_ID in df.columns:
+                colunas.append(COLUNA_ID)
+            df_novo = pd.DataFrame(columns=colunas)
             
             # Se a planilha não está vazia, tenta preservar os dados existentes
             if not df.empty:
                 # Para cada coluna esperada, verifica se existe na planilha atual
-                for col in COLUNAS_ESPERADAS.get(sheet_name, []):
+                for col in colunas:
                     if col in df.columns:
                         df_novo[col] = df[col]
             
@@ -417,6 +1216,9 @@ def verificar_todas_planilhas():
     # Lista de todas as planilhas
     todas_planilhas = list(COLUNAS_ESPERADAS.keys())
     
+    # Carrega todas as planilhas em paralelo antes de verificá-las
+    carregar_planilhas_em_paralelo(todas_planilhas)
+    
     # Verifica cada planilha
     resultados = []
     for sheet_name in todas_planilhas:
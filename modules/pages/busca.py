@@ -0,0 +1,86 @@
+import time
+import streamlit as st
+import pandas as pd
+from modules.data.sheets import carregar_dados_tipados, carregar_derivado
+from modules.data.busca import COLUNAS_BUSCA, pesquisar
+from utils.config import BUSCA_MAX_RESULTADOS
+
+# Colunas exibidas junto com as pesquisáveis em cada resultado
+COLUNAS_CONTEXTO = {
+    "Projetos": ["Status"],
+    "Clientes": ["Contato"],
+    "Receitas": ["DataRecebimento", "ValorTotal"],
+    "Despesas": ["DataPagamento", "ValorTotal"],
+}
+
+def _resumo(linha, colunas):
+    """
+    Junta os valores preenchidos de uma linha em um texto curto.
+    
+    Args:
+        linha: pandas.Series com a linha
+        colunas: Colunas usadas no resumo
+    
+    Returns:
+        str: Valores separados por " · "
+    """
+    partes = []
+    for coluna in colunas:
+        valor = linha.get(coluna)
+        if valor is None or pd.isna(valor) or valor == "":
+            continue
+        if isinstance(valor, pd.Timestamp):
+            valor = valor.strftime("%d/%m/%Y")
+        elif isinstance(valor, float):
+            valor = f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        partes.append(str(valor))
+    return " · ".join(partes)
+
+def buscar_em_tudo(consulta, limite=BUSCA_MAX_RESULTADOS):
+    """
+    Busca a consulta nos índices de todas as planilhas de COLUNAS_BUSCA.
+    
+    Args:
+        consulta: Texto digitado
+        limite: Número máximo de resultados
+    
+    Returns:
+        pandas.DataFrame: Colunas ["Planilha", "Resultado", "Pontuação"], em ordem decrescente de pontuação
+    """
+    resultados = []
+    for sheet_name, pesos in COLUNAS_BUSCA.items():
+        encontrados = pesquisar(carregar_derivado("indice_textual", sheet_name), consulta, limite)
+        if not encontrados:
+            continue
+        
+        df = carregar_dados_tipados(sheet_name)
+        colunas = list(pesos) + COLUNAS_CONTEXTO.get(sheet_name, [])
+        for linha, pontuacao in encontrados:
+            resultados.append((sheet_name, _resumo(df.iloc[linha], colunas), pontuacao))
+    
+    resultados.sort(key=lambda resultado: -resultado[2])
+    return pd.DataFrame(resultados[:limite], columns=["Planilha", "Resultado", "Pontuação"])
+
+def busca_global():
+    """
+    Caixa de busca global na barra lateral; os resultados aparecem no topo da página atual.
+    """
+    consulta = st.sidebar.text_input("🔎 Buscar em tudo", key="busca_global", placeholder="Projeto, cliente, descrição...")
+    if not consulta.strip():
+        return
+    
+    inicio = time.perf_counter()
+    resultados = buscar_em_tudo(consulta)
+    duracao = (time.perf_counter() - inicio) * 1000
+    
+    with st.expander(f"Resultados para \"{consulta}\" ({len(resultados)})", expanded=True):
+        if resultados.empty:
+            st.info("Nenhum resultado encontrado.")
+        else:
+            st.dataframe(
+                resultados,
+                use_container_width=True,
+                hide_index=True,
+                column_config={"Pontuação": st.column_config.NumberColumn("Pontuação", format="%.2f")}
+            )
+        st.caption(f"Busca concluída em {duracao:.1f} ms")
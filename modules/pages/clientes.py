@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-from modules.data.sheets import carregar_dados_sob_demanda, salvar_dados_sheets, adicionar_linha_sheets
+from modules.data.sheets import carregar_dados_identificados, adicionar_linha_sheets, sincronizar_edicoes
 
 def registrar_cliente():
     """
@@ -10,7 +10,7 @@ def registrar_cliente():
     
     # Carregar dados existentes
     try:
-        df_clientes = carregar_dados_sob_demanda("Clientes")
+        df_clientes = carregar_dados_identificados("Clientes")
         
         # Verificar se o DataFrame está vazio ou não existe
         if df_clientes.empty:
@@ -63,7 +63,7 @@ def registrar_cliente():
         with tabs[1]:
             st.markdown("### Clientes Cadastrados")
             if novo_cliente_adicionado:
-                df_clientes = carregar_dados_sob_demanda("Clientes", force_reload=True)
+                df_clientes = carregar_dados_identificados("Clientes")
             column_config = {
                 "Nome": st.column_config.TextColumn("Nome/Razão Social"),
                 "CPF": st.column_config.TextColumn("CPF/CNPJ"),
@@ -86,7 +86,8 @@ def registrar_cliente():
                 if st.form_submit_button("Salvar Alterações", use_container_width=True):
                     with st.spinner("Salvando dados..."):
                         try:
-                            if salvar_dados_sheets(edited_df, "Clientes"):
+                            # Grava só as linhas excluídas, alteradas ou novas
+                            if sincronizar_edicoes(df_clientes, edited_df, "Clientes"):
                                 st.success("Dados salvos com sucesso!")
                                 st.session_state.local_data["clientes"] = pd.DataFrame()
                                 st.rerun()
@@ -105,7 +106,7 @@ def clientes():
     st.title("👥 Clientes")
     
     # Carregar dados dos clientes
-    df_clientes = carregar_dados_sob_demanda("Clientes")
+    df_clientes = carregar_dados_identificados("Clientes")
     
     # Exibir a tabela de clientes
     st.write("### Lista de Clientes")
@@ -153,24 +154,9 @@ def clientes():
             if st.form_submit_button("Salvar Alterações", use_container_width=True):
                 with st.spinner("Salvando dados..."):
                     try:
-                        # Recarregar os dados mais recentes do Google Sheets
-                        df_completo = carregar_dados_sob_demanda("Clientes")
-                        
-                        # Remover os registros que foram editados para evitar duplicações
-                        if filtro:
-                            # Se há filtro, manter os registros que não foram filtrados
-                            mask = ~(df_completo["Nome"].str.contains(filtro, case=False, na=False) | 
-                                   df_completo["CPF"].str.contains(filtro, case=False, na=False))
-                            df_completo = df_completo[mask]
-                        else:
-                            # Se não há filtro, substituir completamente os dados
-                            df_completo = pd.DataFrame(columns=df_clientes.columns)
-                        
-                        # Combinar os dados originais com os editados
-                        df_final = pd.concat([df_completo, edited_df], ignore_index=True)
-                        
-                        # Atualizar os dados no Google Sheets
-                        if salvar_dados_sheets(df_final, "Clientes"):
+                        # Grava por identificador só as linhas filtradas que foram excluídas, alteradas ou adicionadas;
+                        # os registros fora do filtro não são tocados
+                        if sincronizar_edicoes(df_filtrado, edited_df, "Clientes"):
                             st.success("Dados salvos com sucesso!")
                             # Limpar o cache para forçar recarregar os dados
                             st.session_state.local_data["clientes"] = pd.DataFrame()
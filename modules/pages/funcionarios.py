@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from modules.data.sheets import carregar_dados_sob_demanda, salvar_dados_sheets, adicionar_linha_sheets
-from utils.config import FUNCIONARIOS
+from modules.data.sheets import carregar_dados_sob_demanda, carregar_derivado, salvar_dados_sheets, adicionar_linha_sheets
+from modules.data.produtividade import construir_matriz_produtividade, consultar_produtividade
+from utils.data_utils import normalizar_datas
 
 def registrar_funcionario():
     """
@@ -127,21 +128,13 @@ def calcular_produtividade(df_projetos, mes, ano):
     Returns:
         dict: Dicionário com a produtividade de cada funcionário
     """
-    # Filtra os projetos pelo mês e ano
-    df_projetos["DataInicio"] = pd.to_datetime(df_projetos["DataInicio"], dayfirst=True, errors='coerce')
-    df_projetos_filtrados = df_projetos[
-        (df_projetos["DataInicio"].dt.month == mes) & (df_projetos["DataInicio"].dt.year == ano)
-    ]
-
-    # Calcula a produtividade de cada funcionário
-    produtividade = {funcionario: 0 for funcionario in FUNCIONARIOS}
-    for _, row in df_projetos_filtrados.iterrows():
-        if row["ResponsávelModelagem"] in FUNCIONARIOS:
-            produtividade[row["ResponsávelModelagem"]] += row["m2"]
-        if row["ResponsávelDetalhamento"] in FUNCIONARIOS:
-            produtividade[row["ResponsávelDetalhamento"]] += row["m2"]
-
-    return produtividade
+    # Converte uma cópia das datas se o DataFrame recebido não estiver tipado
+    if not pd.api.types.is_datetime64_any_dtype(df_projetos["DataInicio"]):
+        df_projetos = df_projetos.assign(DataInicio=normalizar_datas(df_projetos["DataInicio"]))
+    
+    mes_ano = pd.Timestamp(year=ano, month=mes, day=1)
+    totais = consultar_produtividade(construir_matriz_produtividade(df_projetos), mes_ano, mes_ano)
+    return dict(zip(totais["Funcionário"], totais["m2"]))
 
 def funcionarios():
     """
@@ -149,21 +142,26 @@ def funcionarios():
     """
     st.title("👥 Funcionários")
 
-    # Carrega os projetos
-    df_projetos = carregar_dados_sob_demanda("Projetos")
+    # Matriz pré-calculada (funcionário x mês x disciplina) dos projetos
+    matriz = carregar_derivado("matriz", "Projetos")
 
-    # Selecionar mês e ano para análise
-    mes = st.selectbox("Selecione o mês", range(1, 13), index=0)
-    ano = st.selectbox("Selecione o ano", range(2020, 2031), index=3)
+    # Selecionar o intervalo de meses para análise
+    meses = pd.period_range("2020-01", "2030-12", freq="M")
+    inicio, fim = st.select_slider(
+        "Selecione o período",
+        options=meses,
+        value=(pd.Period("2023-01", freq="M"), pd.Period("2023-01", freq="M")),
+        format_func=lambda periodo: periodo.strftime("%m/%Y")
+    )
 
-    # Calcula a produtividade
-    produtividade = calcular_produtividade(df_projetos, mes, ano)
+    # Consulta a matriz no intervalo selecionado
+    totais = consultar_produtividade(matriz, inicio.to_timestamp(), fim.to_timestamp())
 
     # Cria um DataFrame para exibição
     df_produtividade = pd.DataFrame({
-        "Funcionário": list(produtividade.keys()),
-        "m² Projetado": list(produtividade.values()),
-        "Valor a Receber (R$)": [produtividade[func] * FUNCIONARIOS[func] for func in produtividade]
+        "Funcionário": totais["Funcionário"],
+        "m² Projetado": totais["m2"],
+        "Valor a Receber (R$)": totais["Valor"]
     })
 
     # Exibe o DataFrame
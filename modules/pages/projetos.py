@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from modules.data.sheets import carregar_dados_sob_demanda, salvar_dados_sheets
+from utils.data_utils import formatar_colunas_data
 
 
 def format_date_columns(df):
@@ -13,26 +14,7 @@ def format_date_columns(df):
     Returns:
         pandas.DataFrame: DataFrame com as colunas de data formatadas
     """
-    if df.empty:
-        return df
-    
-    df_formatted = df.copy()
-    
-    # Identifica colunas que podem conter datas
-    date_columns = [col for col in df.columns if "Data" in col]
-    
-    for col in date_columns:
-        try:
-            # Tenta converter para datetime
-            df_formatted[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
-            # Formata para DD/MM/YYYY
-            df_formatted[col] = df_formatted[col].dt.strftime('%d/%m/%Y')
-        except:
-            # Se falhar, garante que a coluna seja do tipo string
-            if col in df_formatted.columns:
-                df_formatted[col] = df_formatted[col].astype(str)
-    
-    return df_formatted
+    return formatar_colunas_data(df)
 
 def carregar_projetos():
     """
@@ -160,13 +142,7 @@ def registrar_projeto():
                         df_projetos[col] = df_projetos[col].astype(str)
     with tabs[1]:
         st.markdown("### Projetos Cadastrados")
-        for col in df_projetos.columns:
-            if "Data" in col:
-                try:
-                    df_projetos[col] = pd.to_datetime(df_projetos[col], errors='coerce', dayfirst=True)
-                    df_projetos[col] = df_projetos[col].dt.strftime('%d/%m/%Y')
-                except:
-                    df_projetos[col] = df_projetos[col].astype(str)
+        df_projetos = format_date_columns(df_projetos)
         column_config = {
             "Projeto": st.column_config.TextColumn("Projeto"),
             "Cliente": st.column_config.TextColumn("Cliente"),
@@ -248,16 +224,7 @@ def projetos():
     # Exibe os projetos filtrados
     if not df_filtrado.empty:
         # Formatar colunas de data
-        for col in df_filtrado.columns:
-            if "Data" in col:
-                try:
-                    # Tenta converter para datetime
-                    df_filtrado[col] = pd.to_datetime(df_filtrado[col], errors='coerce', dayfirst=True)
-                    # Formata para DD/MM/YYYY
-                    df_filtrado[col] = df_filtrado[col].dt.strftime('%d/%m/%Y')
-                except:
-                    # Se falhar, garante que a coluna seja do tipo string
-                    df_filtrado[col] = df_filtrado[col].astype(str)
+        df_filtrado = format_date_columns(df_filtrado)
         
         # Colunas a serem exibidas e sua ordem
         colunas_exibir = ["Projeto", "Cliente", "Status", "Tipo", "m2", "ValorTotal", "DataInicio", "DataFinal"]
@@ -3,9 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import base64
-import io
-from modules.data.sheets import carregar_dados_sob_demanda
+from modules.data.sheets import carregar_varias_planilhas, carregar_dados_tipados, carregar_derivado
+from modules.data.cubo import total_periodo
+from modules.data.exportacao import FORMATOS_EXPORTACAO, exportar_excel, exportar_dataframe
+from modules.ui.layout import create_file_download_button
 
 def gerar_relatorio_excel(df_receitas, df_despesas, periodo=None):
     """
@@ -17,25 +18,18 @@ def gerar_relatorio_excel(df_receitas, df_despesas, periodo=None):
         periodo: Período para filtrar os dados (mês/ano)
     
     Returns:
-        bytes: Arquivo Excel em formato de bytes
+        str: Caminho do arquivo Excel temporário gerado
     """
-    # Criar um buffer para o arquivo Excel
-    output = io.BytesIO()
-    
-    # Criar um escritor Excel
-    writer = pd.ExcelWriter(output, engine='xlsxwriter')
-    
     # Filtrar dados por período se especificado
     if periodo:
         mes, ano = periodo
         try:
-            df_receitas["DataRecebimento"] = pd.to_datetime(df_receitas["DataRecebimento"], dayfirst=True, errors='coerce')
+            # As colunas de data já chegam convertidas dos DataFrames tipados
             df_receitas = df_receitas[
                 (df_receitas["DataRecebimento"].dt.month == mes) & 
                 (df_receitas["DataRecebimento"].dt.year == ano)
             ]
             
-            df_despesas["DataPagamento"] = pd.to_datetime(df_despesas["DataPagamento"], dayfirst=True, errors='coerce')
             df_despesas = df_despesas[
                 (df_despesas["DataPagamento"].dt.month == mes) & 
                 (df_despesas["DataPagamento"].dt.year == ano)
@@ -43,10 +37,6 @@ def gerar_relatorio_excel(df_receitas, df_despesas, periodo=None):
         except:
             pass
     
-    # Escrever DataFrames em planilhas separadas
-    df_receitas.to_excel(writer, sheet_name='Receitas', index=False)
-    df_despesas.to_excel(writer, sheet_name='Despesas', index=False)
-    
     # Criar uma planilha de resumo
     resumo = pd.DataFrame({
         'Métrica': ['Receita Total', 'Despesa Total', 'Saldo'],
@@ -56,14 +46,24 @@ def gerar_relatorio_excel(df_receitas, df_despesas, periodo=None):
             df_receitas['ValorTotal'].astype(float).sum() - df_despesas['ValorTotal'].astype(float).sum()
         ]
     })
-    resumo.to_excel(writer, sheet_name='Resumo', index=False)
     
-    # Salvar o arquivo Excel
-    writer.close()
+    # Gravar as planilhas em disco, linha a linha (sem montar o arquivo em memória)
+    return exportar_excel({'Receitas': df_receitas, 'Despesas': df_despesas, 'Resumo': resumo})
+
+def oferecer_download(df, formato, nome_aba, nome_arquivo, key):
+    """
+    Exporta um DataFrame no formato escolhido e exibe o botão de download do arquivo.
     
-    # Retornar o buffer como bytes
-    output.seek(0)
-    return output.getvalue()
+    Args:
+        df: DataFrame com os dados
+        formato: Chave de FORMATOS_EXPORTACAO ("Excel", "CSV" ou "Parquet")
+        nome_aba: Nome da aba (apenas para Excel)
+        nome_arquivo: Nome do arquivo para download, sem extensão
+        key: Chave do botão de download
+    """
+    extensao, mime = FORMATOS_EXPORTACAO[formato]
+    caminho = exportar_dataframe(df, formato, nome_aba)
+    create_file_download_button(caminho, f"{nome_arquivo}{extensao}", "Clique aqui para baixar o relatório", mime, key=key)
 
 def relatorios():
     """
@@ -71,10 +71,13 @@ def relatorios():
     """
     st.title("📊 Relatórios")
     
-    # Carregar dados
-    df_receitas = carregar_dados_sob_demanda("Receitas")
-    df_despesas = carregar_dados_sob_demanda("Despesas")
-    df_projetos = carregar_dados_sob_demanda("Projetos")
+    # Carregar dados (uma única requisição para as planilhas que não estão em cache)
+    carregar_varias_planilhas(["Receitas", "Despesas", "Projetos"])
+    
+    # Usar as versões tipadas (datas e valores já convertidos no carregamento)
+    df_receitas = carregar_dados_tipados("Receitas")
+    df_despesas = carregar_dados_tipados("Despesas")
+    df_projetos = carregar_dados_tipados("Projetos")
     
     # Verificar se os dados foram carregados corretamente
     if df_receitas.empty or df_despesas.empty:
@@ -95,13 +98,6 @@ def relatorios():
         with col2:
             ano = st.selectbox("Ano", range(2020, 2031), index=datetime.now().year - 2020, key="ano_financeiro")
         
-        # Converter colunas de data
-        try:
-            df_receitas["DataRecebimento"] = pd.to_datetime(df_receitas["DataRecebimento"], dayfirst=True, errors='coerce')
-            df_despesas["DataPagamento"] = pd.to_datetime(df_despesas["DataPagamento"], dayfirst=True, errors='coerce')
-        except:
-            pass
-        
         # Filtrar dados por período
         try:
             df_receitas_filtrado = df_receitas[
@@ -117,9 +113,9 @@ def relatorios():
             df_receitas_filtrado = df_receitas
             df_despesas_filtrado = df_despesas
         
-        # Calcular métricas financeiras
-        receita_total = df_receitas_filtrado["ValorTotal"].astype(float).sum()
-        despesa_total = df_despesas_filtrado["ValorTotal"].astype(float).sum()
+        # Calcular métricas financeiras a partir dos cubos mensais
+        receita_total = total_periodo(carregar_derivado("cubo", "Receitas"), mes, ano)
+        despesa_total = total_periodo(carregar_derivado("cubo", "Despesas"), mes, ano)
         saldo = receita_total - despesa_total
         
         # Exibir métricas financeiras
@@ -153,12 +149,26 @@ def relatorios():
         st.write("### Despesas")
         st.dataframe(df_despesas_filtrado, use_container_width=True)
         
+        # Exportação das transações do período
+        formato = st.radio("Formato das transações", list(FORMATOS_EXPORTACAO), horizontal=True, key="formato_financeiro")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button(f"Exportar Receitas ({formato})"):
+                oferecer_download(df_receitas_filtrado, formato, "Receitas", f"receitas_{mes}_{ano}", key="download_receitas")
+        with col2:
+            if st.button(f"Exportar Despesas ({formato})"):
+                oferecer_download(df_despesas_filtrado, formato, "Despesas", f"despesas_{mes}_{ano}", key="download_despesas")
+        
         # Botão para download do relatório em Excel
         if st.button("Baixar Relatório Financeiro (Excel)"):
-            excel_data = gerar_relatorio_excel(df_receitas, df_despesas, periodo=(mes, ano))
-            b64 = base64.b64encode(excel_data).decode()
-            href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="relatorio_financeiro_{mes}_{ano}.xlsx">Clique aqui para baixar o relatório</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            caminho = gerar_relatorio_excel(df_receitas, df_despesas, periodo=(mes, ano))
+            create_file_download_button(
+                caminho,
+                f"relatorio_financeiro_{mes}_{ano}.xlsx",
+                "Clique aqui para baixar o relatório",
+                FORMATOS_EXPORTACAO["Excel"][1],
+                key="download_financeiro"
+            )
     
     # Conteúdo da aba Relatório de Projetos
     with tabs[1]:
@@ -194,7 +204,8 @@ def relatorios():
         
         # Gráfico de projetos por status
         st.write("### Projetos por Status")
-        status_counts = df_projetos["Status"].value_counts().reset_index()
+        status_counts = df_projetos["Status"].value_counts()
+        status_counts = status_counts[status_counts > 0].reset_index()
         status_counts.columns = ["Status", "Quantidade"]
         
         fig = px.pie(
@@ -219,15 +230,7 @@ def relatorios():
         
         # Botão para download do relatório em Excel
         if st.button("Baixar Relatório de Projetos (Excel)"):
-            output = io.BytesIO()
-            writer = pd.ExcelWriter(output, engine='xlsxwriter')
-            df_projetos_filtrado.to_excel(writer, sheet_name='Projetos', index=False)
-            writer.close()
-            output.seek(0)
-            
-            b64 = base64.b64encode(output.getvalue()).decode()
-            href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="relatorio_projetos.xlsx">Clique aqui para baixar o relatório</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            oferecer_download(df_projetos_filtrado, "Excel", "Projetos", "relatorio_projetos", key="download_projetos")
     
     # Conteúdo da aba Relatório Personalizado
     with tabs[2]:
@@ -250,12 +253,6 @@ def relatorios():
             df = df_projetos
             data_col = "DataInicio"
         
-        # Converter coluna de data
-        try:
-            df[data_col] = pd.to_datetime(df[data_col], dayfirst=True, errors='coerce')
-        except:
-            pass
-        
         # Filtros de período
         col1, col2 = st.columns(2)
         with col1:
@@ -282,17 +279,10 @@ def relatorios():
                 st.write(f"### Dados de {tipo_dados}")
                 st.dataframe(df_filtrado[colunas], use_container_width=True)
                 
-                # Botão para download do relatório em Excel
-                if st.button("Baixar Relatório Personalizado (Excel)"):
-                    output = io.BytesIO()
-                    writer = pd.ExcelWriter(output, engine='xlsxwriter')
-                    df_filtrado[colunas].to_excel(writer, sheet_name=tipo_dados, index=False)
-                    writer.close()
-                    output.seek(0)
-                    
-                    b64 = base64.b64encode(output.getvalue()).decode()
-                    href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="relatorio_personalizado.xlsx">Clique aqui para baixar o relatório</a>'
-                    st.markdown(href, unsafe_allow_html=True)
+                # Botão para download do relatório no formato escolhido
+                formato = st.radio("Formato", list(FORMATOS_EXPORTACAO), horizontal=True, key="formato_personalizado")
+                if st.button(f"Baixar Relatório Personalizado ({formato})"):
+                    oferecer_download(df_filtrado[colunas], formato, tipo_dados, "relatorio_personalizado", key="download_personalizado")
             else:
                 st.warning("Selecione pelo menos uma coluna para exibir.")
         else:
@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-from modules.data.sheets import carregar_dados_sob_demanda, adicionar_linha_sheets, salvar_dados_sheets
+from modules.data.sheets import carregar_dados_sob_demanda, carregar_varias_planilhas, adicionar_linha_sheets, adicionar_linhas_sheets, salvar_dados_sheets
+from utils.data_utils import formatar_colunas_data
 
 def salvar_dados(df, sheet_name):
     """
@@ -21,22 +22,14 @@ def registrar_receita():
     """
     st.subheader("📈 Receita")
     
-    # Carregar dados necessários
-    df_categorias_receitas = carregar_dados_sob_demanda("Categorias_Receitas")
-    df_projetos = carregar_dados_sob_demanda("Projetos")
-    df_receitas = carregar_dados_sob_demanda("Receitas")
+    # Carregar dados necessários (uma única requisição para as planilhas que não estão em cache)
+    dados = carregar_varias_planilhas(["Categorias_Receitas", "Projetos", "Receitas"])
+    df_categorias_receitas = dados["Categorias_Receitas"]
+    df_projetos = dados["Projetos"]
+    df_receitas = dados["Receitas"]
     
     # Formatar colunas de data
-    for col in df_receitas.columns:
-        if "Data" in col:
-            try:
-                # Tenta converter para datetime com formato específico
-                df_receitas[col] = pd.to_datetime(df_receitas[col], errors='coerce', format="%d/%m/%Y")
-                # Formata para DD/MM/YYYY
-                df_receitas[col] = df_receitas[col].dt.strftime('%d/%m/%Y')
-            except:
-                # Se falhar, garante que a coluna seja do tipo string
-                df_receitas[col] = df_receitas[col].astype(str)
+    df_receitas = formatar_colunas_data(df_receitas)
     
     # Verificar se os dados foram carregados corretamente
     if df_categorias_receitas.empty or "Categoria" not in df_categorias_receitas.columns:
@@ -119,20 +112,15 @@ def registrar_despesa():
     """
     Formulário para registrar uma nova despesa.
     """
-    # Carregar dados necessários
-    df_categorias_despesas = carregar_dados_sob_demanda("Categorias_Despesas")
-    df_fornecedor_despesas = carregar_dados_sob_demanda("Fornecedor_Despesas")
-    df_projetos = carregar_dados_sob_demanda("Projetos")
-    df_despesas = carregar_dados_sob_demanda("Despesas")
+    # Carregar dados necessários (uma única requisição para as planilhas que não estão em cache)
+    dados = carregar_varias_planilhas(["Categorias_Despesas", "Fornecedor_Despesas", "Projetos", "Despesas"])
+    df_categorias_despesas = dados["Categorias_Despesas"]
+    df_fornecedor_despesas = dados["Fornecedor_Despesas"]
+    df_projetos = dados["Projetos"]
+    df_despesas = dados["Despesas"]
     
     # Formatar colunas de data
-    for col in df_despesas.columns:
-        if "Data" in col:
-            try:
-                df_despesas[col] = pd.to_datetime(df_despesas[col], errors='coerce', format="%d/%m/%Y")
-                df_despesas[col] = df_despesas[col].dt.strftime('%d/%m/%Y')
-            except:
-                df_despesas[col] = df_despesas[col].astype(str)
+    df_despesas = formatar_colunas_data(df_despesas)
     st.subheader("📤 Despesa")
     abas_despesas = st.tabs(["Registrar Despesa", "Despesas Cadastradas"])
     with abas_despesas[0]:
@@ -177,15 +165,10 @@ def registrar_despesa():
                             "NF": nf
                         }
                         lista_parcelas.append(parcela_info)
-                    sucesso = True
-                    for parcela in lista_parcelas:
-                        if not adicionar_linha_sheets(parcela, "Despesas"):
-                            sucesso = False
-                            break
-                    if sucesso:
+                    if adicionar_linhas_sheets(lista_parcelas, "Despesas"):
                         st.success(f"Despesa registrada com sucesso! {parcelas} parcela(s) criada(s).")
                         st.session_state.local_data["despesas"] = pd.DataFrame()
-                        df_despesas = carregar_dados_sob_demanda("Despesas", force_reload=True)
+                        df_despesas = carregar_dados_sob_demanda("Despesas")
                     else:
                         st.error("Erro ao registrar despesa.")
     with abas_despesas[1]:
@@ -231,6 +214,12 @@ def registrar():
     """
     st.title("📝 Registrar")
     
+    # Todas as abas são renderizadas de uma vez: busca as planilhas que elas usam em uma única requisição
+    carregar_varias_planilhas([
+        "Receitas", "Despesas", "Projetos", "Clientes", "Funcionarios",
+        "Categorias_Receitas", "Categorias_Despesas", "Fornecedor_Despesas"
+    ])
+    
     # Criar abas para os diferentes tipos de registro
     tabs = st.tabs(["Receita", "Despesa", "Projeto", "Cliente", "Funcionário", "Categoria", "Fornecedor"])
     
@@ -341,3 +341,76 @@ def create_form_section(fields, key_prefix="form", submit_label="Enviar"):
                     break
         
         return submitted, values
+
+# Estilo dos cards clicáveis: um botão transparente posicionado sobre cada card
+CARD_GRID_CSS = """
+<style>
+div.stButton > button {
+    position: relative;
+    top: -150px;  /* Ajustado para o tamanho do card */
+    background-color: transparent;
+    color: transparent;
+    border: none;
+    width: 100%;
+    height: 130px;
+    cursor: pointer;
+    z-index: 1;
+    margin-bottom: -150px;  /* Compensar o deslocamento top */
+}
+div.stButton > button:hover {
+    background-color: transparent;
+    color: transparent;
+    border: none;
+}
+</style>
+"""
+
+def create_card_grid(df, render_card, on_select, key, per_page=12, num_columns=3):
+    """
+    Exibe uma grade paginada de cards clicáveis, renderizando apenas os cards da página atual.
+    
+    O CSS dos cards é injetado uma única vez por execução, e não a cada card.
+    
+    Args:
+        df: DataFrame com uma linha por card
+        render_card: Função que recebe a linha (pandas.Series) e retorna o HTML do card
+        on_select: Função chamada com o dicionário da linha quando o card é clicado
+        key: Prefixo das chaves dos widgets
+        per_page: Número de cards por página
+        num_columns: Número de colunas da grade
+    
+    Returns:
+        pandas.DataFrame: Linhas exibidas na página atual
+    """
+    total_pages = max(1, -(-len(df) // per_page))
+    page_key = f"{key}_pagina"
+    
+    # Os filtros podem reduzir o número de páginas entre uma execução e outra
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+    
+    if total_pages > 1:
+        page = st.number_input(
+            f"Página (de {total_pages}, {len(df)} itens)",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key=page_key
+        )
+    else:
+        page = 1
+    
+    start = (int(page) - 1) * per_page
+    df_page = df.iloc[start:start + per_page]
+    
+    st.markdown(CARD_GRID_CSS, unsafe_allow_html=True)
+    columns = st.columns(num_columns)
+    for position, (index, row) in enumerate(df_page.iterrows()):
+        container = columns[position % num_columns].container()
+        container.markdown(render_card(row), unsafe_allow_html=True)
+        
+        # Valores ausentes (NaN/NaT) viram None no dicionário entregue ao callback
+        row_dict = {column: (None if pd.isna(value) else value) for column, value in row.items()}
+        container.button("", key=f"{key}_{index}", on_click=on_select, args=(row_dict,))
+    
+    return df_page
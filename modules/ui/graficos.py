@@ -0,0 +1,78 @@
+"""
+Cache de figuras do Plotly.
+
+Cada figura é identificada por uma impressão digital dos dados agregados que
+a alimentam e dos parâmetros de estilo. Enquanto ambos forem iguais, a figura
+já construída é reaproveitada em vez de passar de novo pelo plotly express,
+inclusive entre sessões.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+import plotly.express as px
+from utils.config import MAX_FIGURAS_CACHE
+
+# Figuras compartilhadas entre as sessões do processo
+_lock = threading.Lock()
+_figuras = OrderedDict()
+
+# Construtores disponíveis
+_TIPOS = {"bar": px.bar, "pie": px.pie}
+
+def impressao_digital(df, *parametros):
+    """
+    Calcula a impressão digital de um DataFrame agregado e dos parâmetros do gráfico.
+    
+    Args:
+        df: DataFrame com os dados do gráfico
+        *parametros: Parâmetros de construção e estilo (precisam ter repr estável)
+    
+    Returns:
+        str: Impressão digital em hexadecimal
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(repr([(str(coluna), str(tipo)) for coluna, tipo in df.dtypes.items()]).encode())
+    resumo.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    resumo.update(repr(parametros).encode())
+    return resumo.hexdigest()
+
+def grafico(tipo, df, ajustes=None, **parametros):
+    """
+    Retorna a figura do plotly express para os dados e parâmetros informados,
+    reaproveitando a figura já construída com a mesma impressão digital.
+    
+    A figura retornada é compartilhada e não deve ser modificada.
+    
+    Args:
+        tipo: "bar" ou "pie"
+        df: DataFrame com os dados agregados
+        ajustes: Dicionário opcional com atualizações aplicadas após a construção
+                 ({"traces": {...}, "xaxes": {...}, "yaxes": {...}})
+        **parametros: Parâmetros repassados ao plotly express
+    
+    Returns:
+        plotly.graph_objects.Figure: Figura pronta para st.plotly_chart
+    """
+    ajustes = ajustes or {}
+    chave = (tipo, impressao_digital(df, sorted(parametros.items()), sorted(ajustes.items())))
+    with _lock:
+        figura = _figuras.get(chave)
+        if figura is not None:
+            _figuras.move_to_end(chave)
+            return figura
+    
+    figura = _TIPOS[tipo](df, **parametros)
+    if "traces" in ajustes:
+        figura.update_traces(**ajustes["traces"])
+    if "xaxes" in ajustes:
+        figura.update_xaxes(**ajustes["xaxes"])
+    if "yaxes" in ajustes:
+        figura.update_yaxes(**ajustes["yaxes"])
+    
+    with _lock:
+        _figuras[chave] = figura
+        # Descarta as figuras usadas há mais tempo
+        while len(_figuras) > MAX_FIGURAS_CACHE:
+            _figuras.popitem(last=False)
+    return figura
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 
 def create_sidebar():
@@ -175,3 +176,29 @@ def create_download_button(data, file_name, button_text="Download", mime_type=No
         file_name=file_name,
         mime=mime_type
     )
+
+def create_file_download_button(file_path, file_name, button_text="Download", mime_type=None, key=None):
+    """
+    Cria um botão de download a partir de um arquivo em disco e remove o arquivo em seguida.
+    
+    O arquivo é entregue ao Streamlit pelo handle, sem cópias intermediárias
+    em memória (bytes ou base64).
+    
+    Args:
+        file_path: Caminho do arquivo gerado
+        file_name: Nome do arquivo para download
+        button_text: Texto do botão
+        mime_type: Tipo MIME do arquivo
+        key: Chave do componente
+    """
+    try:
+        with open(file_path, "rb") as arquivo:
+            st.download_button(
+                label=button_text,
+                data=arquivo,
+                file_name=file_name,
+                mime=mime_type,
+                key=key
+            )
+    finally:
+        os.remove(file_path)
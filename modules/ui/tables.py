@@ -5,6 +5,7 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from modules.data.sheets import salvar_dados_sheets, carregar_dados_sob_demanda
+from utils.data_utils import formatar_colunas_data
 
 def create_editable_table_with_delete_button(df, sheet_name, key_prefix="table", columns=None, hide_index=True):
     """
@@ -126,26 +127,7 @@ def format_date_columns(df):
     Returns:
         pandas.DataFrame: DataFrame com as colunas de data formatadas
     """
-    if df.empty:
-        return df
-    
-    df_formatted = df.copy()
-    
-    # Identifica colunas que podem conter datas
-    date_columns = [col for col in df.columns if "Data" in col]
-    
-    for col in date_columns:
-        try:
-            # Tenta converter para datetime com formato específico
-            df_formatted[col] = pd.to_datetime(df[col], errors='coerce', format="%d/%m/%Y")
-            # Formata para DD/MM/YYYY
-            df_formatted[col] = df_formatted[col].dt.strftime('%d/%m/%Y')
-        except:
-            # Se falhar, garante que a coluna seja do tipo string
-            if col in df_formatted.columns:
-                df_formatted[col] = df_formatted[col].astype(str)
-    
-    return df_formatted
+    return formatar_colunas_data(df)
 
 
 def convert_date_for_sorting(date_str):
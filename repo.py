@@ -2,7 +2,6 @@ import os
 import ssl
 import time
 from datetime import datetime, timedelta
-from random import uniform
 
 import streamlit as st
 import pandas as pd
@@ -10,7 +9,6 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from google.oauth2 import service_account
 import streamlit.components.v1 as components
 import json
@@ -24,6 +22,12 @@ import requests
 import certifi
 import functools
 import threading
+from modules.data.conexao import obter_cliente, obter_planilha, descartar_conexoes
+from modules.data.gravacao import gravar_valores
+from utils.data_utils import dataframe_para_valores_sheets, formatar_colunas_data
+from utils.config import PROJETOS_POR_PAGINA
+from modules.data.busca import obter_indice_busca, buscar
+from modules.ui.components import create_card_grid
 
 # Monkey patch SSL para resolver problemas de certificado
 # Esta é uma solução mais robusta para o problema de SSL
@@ -189,48 +193,26 @@ def conectar_sheets(force_reconnect=False):
                 # Se não conseguir carregar de secrets, usar valores padrão para desenvolvimento
                 return None
             
-            # Criar uma sessão personalizada com SSL desativado
-            session = requests.Session()
-            session.verify = False
-            
-            # Desativar avisos de SSL
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            # Criar credenciais
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-            
-            # Adicionar a sessão personalizada às credenciais
-            creds.session = session
+            # Criar credenciais (o token é renovado antes de expirar pelo cliente compartilhado)
+            creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=scope)
         except Exception as e:
             return None
         
-        # Conectar ao Google Sheets com retry
-        max_retries = 2  # Reduzido para 2 tentativas para acelerar
-        retry_count = 0
+        # Uma reconexão forçada também descarta o cliente e os metadados compartilhados
+        if force_reconnect:
+            descartar_conexoes()
+            st.session_state.worksheets_cache = {}
         
-        while retry_count < max_retries:
-            try:
-                client = gspread.authorize(creds)
-                st.session_state.sheets_client = client
-                break
-            except Exception as e:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    return None
-                time.sleep(0.5)  # Reduzido para 0.5 segundo
-        
-        # Abrir a planilha pelo ID com retry
-        retry_count = 0
-        while retry_count < max_retries:
-            try:
-                spreadsheet = client.open_by_key(SHEET_ID)
-                st.session_state.spreadsheet = spreadsheet
-                return spreadsheet
-            except Exception as e:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    return None
-                time.sleep(0.5)  # Reduzido para 0.5 segundo
+        # Conectar ao Google Sheets com o cliente do processo (pool de conexões mantidas
+        # abertas; cotas e novas tentativas ficam a cargo do agendador)
+        try:
+            st.session_state.sheets_client = obter_cliente(creds)
+            
+            spreadsheet = obter_planilha(creds, SHEET_ID)
+            st.session_state.spreadsheet = spreadsheet
+            return spreadsheet
+        except Exception as e:
+            return None
     except Exception as e:
         return None
 
@@ -434,52 +416,16 @@ def salvar_dados_sheets(df, sheet_name):
                 st.error(f"Erro ao acessar a planilha {sheet_name}: {str(e)}")
                 return False
         
-        # Limpar a planilha, mas manter o cabeçalho
-        try:
-            # Obter o número de linhas na planilha
-            all_values = worksheet.get_all_values()
-            if len(all_values) > 1:  # Se tiver mais que o cabeçalho
-                # Limpar todas as linhas exceto o cabeçalho
-                worksheet.delete_rows(2, len(all_values))
-        except Exception as e:
-            st.error(f"Erro ao limpar a planilha {sheet_name}: {str(e)}")
-            # Continuar mesmo com erro, pois pode ser que a planilha esteja vazia
-        
-        # Verificar se o DataFrame está vazio
-        if df.empty:
-            # Atualizar o cache local
-            st.session_state.local_data[sheet_name.lower()] = df
-            return True
-        
-        # Preparar os dados para salvar
-        # Primeiro, converter o DataFrame para uma lista de listas
-        # A primeira lista contém os nomes das colunas
-        header = df.columns.tolist()
-        
-        # Verificar se o cabeçalho atual da planilha corresponde ao do DataFrame
+        # Gravar cabeçalho e linhas em blocos de intervalos (e limpar as linhas antigas que sobrarem)
         try:
-            current_header = worksheet.row_values(1)
-            if current_header != header:
-                # Se o cabeçalho for diferente, atualizar o cabeçalho
-                worksheet.update('A1', [header])
+            if df.empty:
+                # Sem dados: mantém o cabeçalho atual e limpa as demais linhas
+                gravar_valores(worksheet, [], linha_inicial=2)
+            else:
+                gravar_valores(worksheet, dataframe_para_valores_sheets(df))
         except Exception as e:
-            # Se não conseguir obter o cabeçalho atual, apenas atualiza
-            worksheet.update('A1', [header])
-        
-        # Converter os valores do DataFrame para lista de listas
-        values = df.values.tolist()
-        
-        # Adicionar os dados à planilha
-        if values:  # Verificar se há valores para adicionar
-            try:
-                # Adicionar linha por linha para evitar problemas com tipos de dados
-                for i, row in enumerate(values, start=2):  # Começar da linha 2 (após o cabeçalho)
-                    # Converter valores para string para evitar problemas de tipo
-                    row_str = [str(val) if val is not None else "" for val in row]
-                    worksheet.update(f'A{i}', [row_str])
-            except Exception as e:
-                st.error(f"Erro ao adicionar dados à planilha {sheet_name}: {str(e)}")
-                return False
+            st.error(f"Erro ao adicionar dados à planilha {sheet_name}: {str(e)}")
+            return False
         
         # Atualizar o cache local
         st.session_state.local_data[sheet_name.lower()] = df
@@ -1986,24 +1932,9 @@ def projetos():
     # Carrega os projetos do Google Sheets
     df_projetos = carregar_projetos()
     
-    # Converter datas para formato consistente
+    # Converter datas para formato consistente (DD/MM/AAAA ou ISO na planilha -> AAAA-MM-DD)
     if not df_projetos.empty:
-        # Garantir que as colunas de data existam
-        if "DataInicio" in df_projetos.columns and "DataFinal" in df_projetos.columns:
-            # Converter para datetime e depois para string no formato padrão
-            try:
-                # Tentar converter datas que estão em diferentes formatos
-                for idx, row in df_projetos.iterrows():
-                    for date_col in ["DataInicio", "DataFinal"]:
-                        try:
-                            # Tentar formato ISO
-                            date_val = pd.to_datetime(row[date_col])
-                            df_projetos.at[idx, date_col] = date_val.strftime("%Y-%m-%d")
-                        except:
-                            # Se falhar, manter o valor original
-                            pass
-            except Exception as e:
-                st.warning(f"Aviso: Alguns formatos de data podem estar inconsistentes. {str(e)}")
+        df_projetos = formatar_colunas_data(df_projetos, ["DataInicio", "DataFinal"], formato="%Y-%m-%d")
     
     # Inicializar o estado para controlar quando um card é clicado
     if "card_clicado" not in st.session_state:
@@ -2130,45 +2061,28 @@ def projetos():
     # Barra de separação
     st.markdown("<hr style='margin: 15px 0;'>", unsafe_allow_html=True)
     
-    # Filtro de projetos
-    filtro_dropdown = st.selectbox(
-        "🔍 Selecione um projeto",
-        options=[""] + list(df_projetos["Projeto"].unique()),  # Dropdown inclui opção vazia
-        index=0
-    )
-
-    # Filtrar os projetos
+    # Filtros de projetos
+    col_filtro, col_busca = st.columns(2)
+    with col_filtro:
+        filtro_dropdown = st.selectbox(
+            "🔍 Selecione um projeto",
+            options=[""] + list(df_projetos["Projeto"].unique()),  # Dropdown inclui opção vazia
+            index=0
+        )
+    with col_busca:
+        filtro_texto = st.text_input("Buscar por Projeto, Cliente ou Localização")
+
+    # Filtrar os projetos (a busca vem antes, sobre a lista completa, para que o índice
+    # seja o mesmo em todas as execuções e não seja reconstruído a cada filtro)
+    if filtro_texto:
+        indice_busca = obter_indice_busca("Projetos", df_projetos, ["Projeto", "Cliente", "Localizacao"])
+        df_projetos = df_projetos[buscar(indice_busca, filtro_texto)]
     if filtro_dropdown:
         df_projetos = df_projetos[df_projetos["Projeto"] == filtro_dropdown]
-    
-    # Divide a tela em 3 colunas
-    col1, col2, col3 = st.columns(3)
-
-    # Função para selecionar um projeto quando o card é clicado
-    def selecionar_projeto(projeto_dict):
-        st.session_state["projeto_selecionado"] = projeto_dict
-        st.session_state.card_clicado = True
 
-    # Distribuir os cards nas colunas
-    for i, row in df_projetos.iterrows():
-        # Criar um dicionário com os dados do projeto, convertendo valores NaT para None
-        projeto_dict = {}
-        for key, value in row.items():
-            if pd.isna(value):
-                projeto_dict[key] = None
-            else:
-                projeto_dict[key] = value
-        
-        # Criar um card clicável usando um container
-        if i % 3 == 0:
-            container = col1.container()
-        elif i % 3 == 1:
-            container = col2.container()
-        else:
-            container = col3.container()
-            
-        # Estilizar o container como um card
-        container.markdown(f"""
+    # Conteúdo de cada card
+    def html_card(row):
+        return f"""
         <div style="
             background-color: #ffffff;
             padding: 10px;
@@ -2189,35 +2103,10 @@ def projetos():
             📍 Localização: {row['Localizacao']}<br>
             📏 Área: {row['m2']} m²
         </div>
-        """, unsafe_allow_html=True)
-        
-        # Botão invisível que cobre o card para torná-lo clicável
-        # Usamos um truque CSS para posicionar o botão sobre o card
-        container.markdown("""
-        <style>
-        div.stButton > button {
-            position: relative;
-            top: -150px;  /* Ajustado para o novo tamanho do card */
-            background-color: transparent;
-            color: transparent;
-            border: none;
-            width: 100%;
-            height: 130px;
-            cursor: pointer;
-            z-index: 1;
-            margin-bottom: -150px;  /* Compensar o deslocamento top */
-        }
-        div.stButton > button:hover {
-            background-color: transparent;
-            color: transparent;
-            border: none;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Botão invisível que cobre o card
-        if container.button("", key=f"card_{i}"):
-            selecionar_projeto(projeto_dict)
+        """
+
+    # Grade paginada: só os cards da página atual são renderizados
+    create_card_grid(df_projetos, html_card, selecionar_projeto, key="card", per_page=PROJETOS_POR_PAGINA)
 
     # Verificar se um projeto foi selecionado
     if "projeto_selecionado" in st.session_state:
@@ -0,0 +1,30 @@
+"""
+Testes do balde de tokens do agendador: nenhuma janela de um minuto passa da cota.
+"""
+from types import SimpleNamespace
+import pytest
+from modules.data import agendador
+
+@pytest.fixture
+def relogio(monkeypatch):
+    estado = SimpleNamespace(agora=0.0)
+    def dormir(segundos):
+        estado.agora += segundos
+    monkeypatch.setattr(agendador, "time", SimpleNamespace(monotonic=lambda: estado.agora, sleep=dormir))
+    return estado
+
+@pytest.mark.parametrize("por_minuto, rajada", [(60, 10), (60, 60), (300, 10)])
+def test_primeiro_minuto_respeita_a_cota(relogio, por_minuto, rajada):
+    balde = agendador.BaldeTokens(por_minuto, rajada)
+    liberadas = 0
+    while True:
+        balde.consumir()
+        if relogio.agora >= 60:
+            break
+        liberadas += 1
+    assert liberadas <= por_minuto
+
+def test_rajada_sai_sem_espera(relogio):
+    balde = agendador.BaldeTokens(60, 10)
+    assert [balde.consumir() for _ in range(10)] == [0.0] * 10
+    assert balde.consumir() > 0
@@ -0,0 +1,35 @@
+"""
+Testes da conversão vetorizada de textos numéricos.
+"""
+import pandas as pd
+import pytest
+from utils.data_utils import converter_serie_para_numero, dataframe_para_valores_sheets
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("R$ 1.234,56", 1234.56),
+    ("1.234,56", 1234.56),
+    ("-1.234,5", -1234.5),
+    ("12,5", 12.5),
+    ("12.345.678", 12345678.0),
+    ("1234.56", 1234.56),
+    ("12.345", 12.345),
+    ("1.5", 1.5),
+    ("1e-05", 1e-05),
+    ("", 0.0),
+])
+def test_formatos_aceitos(texto, esperado):
+    numeros, erros = converter_serie_para_numero(pd.Series([texto]))
+    assert numeros[0] == pytest.approx(esperado)
+    assert not erros[0]
+
+def test_textos_invalidos_sao_marcados():
+    numeros, erros = converter_serie_para_numero(pd.Series(["abc", "1,2,3", ""]))
+    assert list(numeros) == [0.0, 0.0, 0.0]
+    assert list(erros) == [True, True, False]
+
+def test_valores_gravados_pela_aplicacao_voltam_iguais():
+    valores = [12.345, 1.234, 1234.56, 0.1, 100.0, -3.5, 1234567.891, 1e-05, 1e20, 999.999]
+    gravados = dataframe_para_valores_sheets(pd.DataFrame({"ValorTotal": valores}))
+    numeros, erros = converter_serie_para_numero(pd.Series([linha[0] for linha in gravados[1:]]))
+    assert list(numeros) == valores
+    assert not erros.any()
@@ -0,0 +1,85 @@
+"""
+Testes da fila de gravações: erros que devem ser repetidos, junção de lotes e adições repetidas.
+"""
+import json
+from types import SimpleNamespace
+import pytest
+import requests
+from gspread.exceptions import APIError
+from modules.data import fila
+
+def _resposta(codigo):
+    resposta = requests.Response()
+    resposta.status_code = codigo
+    resposta._content = json.dumps({"error": {"code": codigo, "message": "erro", "status": "ERRO"}}).encode()
+    return resposta
+
+@pytest.fixture
+def diario(tmp_path, monkeypatch):
+    monkeypatch.setattr(fila, "_arquivo_fila", lambda: str(tmp_path / "fila.sqlite3"))
+    return SimpleNamespace(title="Receitas", id=1)
+
+@pytest.mark.parametrize("erro", [
+    requests.exceptions.ConnectionError("queda"),
+    requests.exceptions.Timeout("tempo"),
+    requests.exceptions.ReadTimeout("leitura"),
+    requests.exceptions.ChunkedEncodingError("corte"),
+    requests.exceptions.HTTPError(response=_resposta(503)),
+    APIError(_resposta(429)),
+    APIError(_resposta(500)),
+    ConnectionError("nativa"),
+])
+def test_erros_temporarios_sao_repetidos(erro):
+    assert fila._erro_temporario(erro)
+
+@pytest.mark.parametrize("erro", [
+    APIError(_resposta(400)),
+    APIError(_resposta(403)),
+    requests.exceptions.HTTPError(response=_resposta(404)),
+    ValueError("dados"),
+])
+def test_erros_definitivos_nao_sao_repetidos(erro):
+    assert not fila._erro_temporario(erro)
+
+def test_substituicoes_com_a_mesma_base_nao_sao_juntadas(diario):
+    base = [["A"], ["1"]]
+    fila.enfileirar_substituicao("Receitas", diario, base, [["A"], ["2"]])
+    fila.enfileirar_substituicao("Receitas", diario, base, [["A"], ["3"]])
+    assert len(fila._proximo_lote()) == 1
+
+def test_substituicoes_encadeadas_sao_juntadas(diario):
+    fila.enfileirar_substituicao("Receitas", diario, [["A"], ["1"]], [["A"], ["2"]])
+    fila.enfileirar_substituicao("Receitas", diario, [["A"], ["2"]], [["A"], ["3"]])
+    assert len(fila._proximo_lote()) == 2
+
+def test_nova_tentativa_reenvia_so_o_lote_que_falhou(diario):
+    fila.enfileirar_anexacao("Receitas", diario, [["1"]])
+    fila._executar("UPDATE gravacoes SET tentativas = 1")
+    fila.enfileirar_anexacao("Receitas", diario, [["2"]])
+    assert [json.loads(gravacao["dados"])["linhas"] for gravacao in fila._proximo_lote()] == [[["1"]]]
+
+class _Planilha:
+    def __init__(self, valores):
+        self.valores = valores
+        self.adicoes = 0
+
+    def values_get(self, intervalo):
+        return {"values": [list(linha) for linha in self.valores]}
+
+    def values_append(self, intervalo, params=None, body=None):
+        self.adicoes += 1
+        self.valores.extend(body["values"])
+
+def test_adicao_ja_gravada_nao_e_repetida(diario):
+    fila.enfileirar_anexacao("Receitas", diario, [["x", "1", ""]])
+    fila._executar("UPDATE gravacoes SET tentativas = 1")
+    planilha = _Planilha([["A", "B", "C"], ["x", "1"]])
+    fila._enviar_lote(planilha, fila._proximo_lote())
+    assert planilha.adicoes == 0 and len(planilha.valores) == 2
+
+def test_adicao_que_nao_chegou_e_repetida(diario):
+    fila.enfileirar_anexacao("Receitas", diario, [["x", "1", ""]])
+    fila._executar("UPDATE gravacoes SET tentativas = 1")
+    planilha = _Planilha([["A", "B", "C"]])
+    fila._enviar_lote(planilha, fila._proximo_lote())
+    assert planilha.adicoes == 1
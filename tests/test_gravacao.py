@@ -0,0 +1,39 @@
+"""
+Testes da gravação em massa: a limpeza usa o tamanho atual da grade, não o da aba em cache.
+"""
+from types import SimpleNamespace
+from modules.data import gravacao
+
+class _Planilha:
+    def __init__(self, linhas, colunas):
+        self.grade = {"rowCount": linhas, "columnCount": colunas}
+        self.gravados = []
+        self.limpos = []
+
+    def fetch_sheet_metadata(self, params=None):
+        return {"sheets": [{"properties": {"sheetId": 7, "gridProperties": dict(self.grade)}}]}
+
+    def values_update(self, intervalo, params=None, body=None):
+        self.gravados.append(intervalo)
+
+    def values_batch_clear(self, body=None):
+        self.limpos.extend(body["ranges"])
+
+def _aba(planilha, linhas, colunas):
+    def add_rows(quantidade):
+        planilha.grade["rowCount"] += quantidade
+    return SimpleNamespace(spreadsheet=planilha, id=7, title="Receitas", row_count=linhas, col_count=colunas, add_rows=add_rows)
+
+def test_limpeza_usa_a_grade_atual():
+    # A aba foi aberta com 3 linhas e 2 colunas; desde então a grade cresceu
+    planilha = _Planilha(linhas=50, colunas=6)
+    aba = _aba(planilha, linhas=3, colunas=2)
+    gravacao.gravar_valores(aba, [["A", "B"], ["1", "2"]])
+    assert planilha.limpos == ["'Receitas'!A3:F50", "'Receitas'!C1:F2"]
+
+def test_grade_menor_que_os_valores_e_estendida():
+    planilha = _Planilha(linhas=2, colunas=2)
+    aba = _aba(planilha, linhas=100, colunas=2)
+    gravacao.gravar_valores(aba, [["A", "B"], ["1", "2"], ["3", "4"]])
+    assert planilha.grade["rowCount"] == 3
+    assert planilha.limpos == []
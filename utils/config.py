@@ -32,9 +32,124 @@ COLUNAS_ESPERADAS = {
     "Fornecedor_Despesas": ["Fornecedor"]
 }
 
+# Coluna oculta com o identificador estável (UUID) de cada linha, mantida após as colunas esperadas
+COLUNA_ID = "_id"
+
+# Tipos das colunas usados na conversão dos dados carregados
+# ("data": DD/MM/YYYY, "moeda"/"numero": formato brasileiro, "categoria": poucos valores distintos)
+TIPOS_COLUNAS = {
+    "Receitas": {
+        "DataRecebimento": "data",
+        "ValorTotal": "moeda",
+        "Categoria": "categoria",
+        "Projeto": "categoria",
+        "FormaPagamento": "categoria",
+        "NF": "categoria"
+    },
+    "Despesas": {
+        "DataPagamento": "data",
+        "ValorTotal": "moeda",
+        "Categoria": "categoria",
+        "Projeto": "categoria",
+        "Responsável": "categoria",
+        "Fornecedor": "categoria",
+        "FormaPagamento": "categoria",
+        "NF": "categoria"
+    },
+    "Projetos": {
+        "DataInicio": "data",
+        "DataFinal": "data",
+        "m2": "numero",
+        "Parcelas": "numero",
+        "ValorTotal": "moeda",
+        "Placa": "categoria",
+        "Post": "categoria",
+        "Contrato": "categoria",
+        "Status": "categoria",
+        "Briefing": "categoria",
+        "Tipo": "categoria",
+        "Pacote": "categoria",
+        "Arquiteto": "categoria",
+        "ResponsávelElétrico": "categoria",
+        "ResponsávelHidráulico": "categoria",
+        "ResponsávelModelagem": "categoria",
+        "ResponsávelDetalhamento": "categoria"
+    },
+    "Clientes": {
+        "TipoNF": "categoria"
+    }
+}
+
+# Dimensões do cubo mensal pré-agregado de receitas e despesas
+DIMENSOES_CUBO = {
+    "Receitas": ["Categoria", "Projeto", "FormaPagamento"],
+    "Despesas": ["Categoria", "Projeto", "FormaPagamento", "Responsável", "Fornecedor"]
+}
+
 # Configurações para funcionários
 FUNCIONARIOS = {
     "Bruno": 0.50,  # R$ por m²
     "Victor": 0.50,  # R$ por m²
     "Matheus": 0.50  # R$ por m²
 }
+
+# Disciplinas dos projetos remuneradas pelas taxas acima
+DISCIPLINAS_REMUNERADAS = ["Modelagem", "Detalhamento"]
+
+# Tempo de vida (em segundos) do cache compartilhado entre sessões
+CACHE_TTL_PADRAO = 300
+CACHE_TTL = {
+    "Receitas": 120,
+    "Despesas": 120,
+    "Projetos": 180,
+    "Categorias_Receitas": 600,
+    "Categorias_Despesas": 600,
+    "Fornecedor_Despesas": 600
+}
+
+# Número máximo de planilhas carregadas simultaneamente
+MAX_THREADS_CARREGAMENTO = 4
+
+# Espelho local (SQLite) das planilhas: leituras a frio sem ir ao Google Sheets
+ESPELHO_ATIVO = True
+ESPELHO_IDADE_MAXIMA = 24 * 60 * 60  # Espelhos mais antigos que isso não são usados
+
+# Cotas da API do Google Sheets (requisições por minuto) e novas tentativas do agendador
+COTA_LEITURAS_POR_MINUTO = 60
+COTA_ESCRITAS_POR_MINUTO = 60
+AGENDADOR_RAJADA = 10  # Requisições que podem sair de uma vez, descontadas da reposição
+AGENDADOR_MAX_TENTATIVAS = 6
+AGENDADOR_ESPERA_INICIAL = 1.0
+AGENDADOR_ESPERA_MAXIMA = 32.0
+
+# Pool de conexões HTTP do cliente compartilhado e renovação antecipada do token (em segundos)
+POOL_CONEXOES = 4
+POOL_TAMANHO_MAXIMO = 16
+RENOVACAO_TOKEN_ANTECEDENCIA = 300
+
+# Fila de gravações em segundo plano: novas tentativas com espera exponencial (em segundos)
+FILA_MAX_TENTATIVAS = 8
+FILA_ESPERA_INICIAL = 1.0
+FILA_ESPERA_MAXIMA = 64.0
+
+# Gravação em massa: tamanho máximo (em caracteres) de cada bloco de linhas e blocos enviados em paralelo
+GRAVACAO_MAX_CARACTERES_POR_BLOCO = 1_000_000
+MAX_THREADS_GRAVACAO = 4
+
+# Exportação de relatórios: linhas convertidas por bloco ao gravar os arquivos
+EXPORTACAO_LINHAS_POR_BLOCO = 5_000
+
+# Número máximo de combinações de filtros memorizadas pelo dashboard
+MAX_AGREGACOES_CACHE = 64
+
+# Número máximo de figuras do Plotly mantidas em cache
+MAX_FIGURAS_CACHE = 256
+
+# Número máximo de colunas de datas interpretadas mantidas em cache
+MAX_DATAS_CACHE = 128
+
+# Cards de projetos exibidos por página
+PROJETOS_POR_PAGINA = 12
+
+# Número máximo de resultados exibidos pela busca global
+BUSCA_MAX_RESULTADOS = 50
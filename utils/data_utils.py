@@ -1,8 +1,15 @@
 """
 Utilitários para manipulação de dados.
 """
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from datetime import datetime
+import pyarrow as pa
+import pyarrow.compute as pc
+from utils.config import MAX_DATAS_CACHE
 
 def converter_para_string_segura(valor):
     """
@@ -43,9 +50,9 @@ def preparar_dados_para_sheets(dados, is_dataframe=False):
             if pd.api.types.is_datetime64_any_dtype(df[col]):
                 df[col] = df[col].dt.strftime("%d/%m/%Y")
         
-        # Converte valores numéricos para string
+        # Converte valores numéricos para string (valores ausentes ficam vazios, não "nan")
         for col in df.select_dtypes(include=['int64', 'float64']).columns:
-            df[col] = df[col].astype(str)
+            df[col] = df[col].astype(str).where(df[col].notna(), "")
         
         # Substitui valores NaN por string vazia
         df = df.fillna("")
@@ -59,6 +66,168 @@ def preparar_dados_para_sheets(dados, is_dataframe=False):
         
         return resultado
 
+def _formatar_datas(serie, formato="%d/%m/%Y"):
+    """
+    Formata uma coluna de datas, formatando cada data distinta uma única vez.
+    
+    Args:
+        serie: pandas.Series do tipo datetime64
+        formato: Formato de saída (strftime)
+    
+    Returns:
+        pandas.Series: Série de strings (datas ausentes viram "")
+    """
+    codigos, unicas = pd.factorize(serie)
+    textos = np.append(pd.DatetimeIndex(unicas).strftime(formato).to_numpy(dtype=object), "")
+    # O código -1 (data ausente) aponta para o "" acrescentado no final
+    return pd.Series(textos[codigos], index=serie.index)
+
+# Datas já interpretadas, por conteúdo da coluna: impressão digital -> valores datetime64
+_lock_datas = threading.Lock()
+_datas = OrderedDict()
+
+def _interpretar_datas(textos):
+    """
+    Interpreta textos de data: primeiro como DD/MM/AAAA e, para os que falharem, como ISO (AAAA-MM-DD).
+    
+    Args:
+        textos: pandas.Series de strings (sem repetições)
+    
+    Returns:
+        pandas.Series: Série datetime64 (textos vazios ou inválidos viram NaT)
+    """
+    textos = textos.str.strip()
+    datas = pd.to_datetime(textos, format="%d/%m/%Y", exact=False, errors="coerce")
+    restantes = datas.isna() & textos.ne("")
+    if restantes.any():
+        iso = pd.to_datetime(textos[restantes], format="ISO8601", errors="coerce", utc=True).dt.tz_localize(None)
+        datas[restantes] = iso.astype(datas.dtype)
+    return datas
+
+def normalizar_datas(serie):
+    """
+    Converte uma coluna de datas em texto (DD/MM/AAAA ou ISO, misturados) para datetime64.
+    
+    Cada valor distinto é interpretado uma única vez, e o resultado é memorizado
+    pelo conteúdo da coluna: enquanto a coluna não mudar, as próximas chamadas
+    não interpretam nada.
+    
+    Args:
+        serie: pandas.Series com as datas
+    
+    Returns:
+        pandas.Series: Série datetime64 com o mesmo índice (valores inválidos viram NaT)
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    
+    serie_texto = serie.astype(object)
+    digital = hashlib.blake2b(pd.util.hash_pandas_object(serie_texto, index=False).values.tobytes(), digest_size=16).hexdigest()
+    with _lock_datas:
+        valores = _datas.get(digital)
+        if valores is not None:
+            _datas.move_to_end(digital)
+    
+    if valores is None:
+        codigos, unicas = pd.factorize(serie_texto)
+        datas_unicas = _interpretar_datas(pd.Series(unicas, dtype=object).astype(str)).to_numpy()
+        # O código -1 (valor ausente) aponta para o NaT acrescentado no final
+        valores = np.append(datas_unicas, np.datetime64("NaT", "ns"))[codigos]
+        with _lock_datas:
+            _datas[digital] = valores
+            while len(_datas) > MAX_DATAS_CACHE:
+                _datas.popitem(last=False)
+    
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+def formatar_colunas_data(df, colunas=None, formato="%d/%m/%Y"):
+    """
+    Gera uma cópia do DataFrame com as colunas de data normalizadas e formatadas como texto.
+    
+    Textos que não puderem ser interpretados como data são mantidos como estão.
+    
+    Args:
+        df: DataFrame com os dados
+        colunas: Colunas de data (padrão: as que têm "Data" no nome)
+        formato: Formato de saída (strftime)
+    
+    Returns:
+        pandas.DataFrame: Cópia do DataFrame com as colunas formatadas
+    """
+    if df.empty:
+        return df
+    
+    df_formatado = df.copy()
+    if colunas is None:
+        colunas = [coluna for coluna in df.columns if "Data" in coluna]
+    
+    for coluna in colunas:
+        if coluna not in df.columns:
+            continue
+        datas = normalizar_datas(df[coluna])
+        textos = _formatar_datas(datas, formato)
+        invalidos = datas.isna() & df[coluna].notna()
+        if invalidos.any():
+            textos[invalidos] = df[coluna][invalidos].astype(str)
+        df_formatado[coluna] = textos
+    
+    return df_formatado
+
+def serie_para_strings_sheets(serie):
+    """
+    Converte uma coluna para strings com as mesmas regras de converter_para_string_segura,
+    operando sobre a coluna inteira.
+    
+    Args:
+        serie: pandas.Series com os valores
+    
+    Returns:
+        pandas.Series: Série de strings (valores ausentes viram "")
+    """
+    vazios = serie.isna()
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie_para_strings_sheets(serie.astype(object))
+    
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        textos = _formatar_datas(serie)
+    elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+        tipo = pd.api.types.infer_dtype(serie, skipna=True)
+        if tipo in ("string", "empty"):
+            textos = serie
+        elif tipo in ("date", "datetime"):
+            textos = _formatar_datas(pd.to_datetime(serie))
+        elif tipo == "mixed":
+            # Datas misturadas com outros tipos: conversão valor a valor só nesta coluna
+            return serie.map(converter_para_string_segura)
+        else:
+            textos = serie.astype(str)
+    else:
+        # Números e booleanos: mesma representação de str(valor)
+        textos = serie.astype(str)
+    
+    return textos.where(~vazios, "")
+
+def dataframe_para_valores_sheets(df):
+    """
+    Converte um DataFrame na lista de listas (cabeçalho + linhas) gravada no Google Sheets.
+    
+    A conversão é feita coluna a coluna (datas com dt.strftime, números com
+    astype(str) e valores ausentes mascarados como ""), sem percorrer as linhas,
+    e produz o mesmo resultado de aplicar converter_para_string_segura a cada célula.
+    
+    Args:
+        df: DataFrame com os dados
+    
+    Returns:
+        list: Lista de listas de strings, começando pelo cabeçalho
+    """
+    cabecalho = [str(coluna) for coluna in df.columns]
+    if not cabecalho:
+        return [cabecalho] + [[] for _ in range(len(df))]
+    
+    colunas = [serie_para_strings_sheets(df.iloc[:, i]).to_numpy(dtype=object) for i in range(df.shape[1])]
+    return [cabecalho] + np.column_stack(colunas).tolist()
+
 def formatar_valor_moeda(valor):
     """
     Formata um valor numérico como moeda brasileira (R$).
@@ -129,3 +298,42 @@ def converter_string_para_numero(valor_str):
             return valor
     except:
         return 0
+
+def converter_serie_para_numero(serie):
+    """
+    Converte uma Series inteira de textos numéricos para float64 de forma vetorizada.
+    
+    Aceita valores como "R$ 1.234,56", "1.234,56", "1234.56", "12.345.678" e "".
+    Quando há vírgula, ela é o separador decimal e os pontos são de milhar; sem
+    vírgula, os pontos só são de milhar se houver mais de um grupo
+    ("12.345.678"). Um único ponto é o separador decimal, como nos valores
+    gravados pela própria aplicação (floats convertidos com str, inclusive em
+    notação científica): "12.345" é 12.345.
+    
+    Args:
+        serie: pandas.Series com os valores a serem convertidos
+    
+    Returns:
+        tuple: (pandas.Series float64 com vazios e inválidos como 0,
+                pandas.Series bool marcando os valores não vazios que não puderam ser convertidos)
+    """
+    # pyarrow (dependência do Streamlit) executa as operações de texto em código nativo
+    texto = pa.array(serie.astype("string[pyarrow]").array).fill_null("")
+    texto = pc.replace_substring_regex(texto, r"R\$|\s", "")
+    vazio = pc.equal(texto, "")
+    
+    # Identifica os valores em formato brasileiro e normaliza para ponto decimal
+    formato_br = pc.or_(
+        pc.match_substring(texto, ","),
+        pc.match_substring_regex(texto, r"^-?\d{1,3}(\.\d{3}){2,}$"),
+    )
+    sem_milhar = pc.replace_substring(pc.replace_substring(texto, ".", ""), ",", ".")
+    normalizado = pc.if_else(formato_br, sem_milhar, texto)
+    
+    # Apenas textos numéricos válidos são convertidos; os demais viram nulos
+    valido = pc.match_substring_regex(normalizado, r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+    numeros = pc.cast(pc.if_else(valido, normalizado, None), pa.float64())
+    
+    erros = pd.Series(pc.and_not(pc.invert(valido), vazio).to_numpy(zero_copy_only=False), index=serie.index)
+    numeros = pd.Series(numeros.fill_null(0.0).to_numpy(zero_copy_only=False), index=serie.index, name=serie.name)
+    return numeros, erros